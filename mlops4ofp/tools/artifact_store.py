@@ -0,0 +1,189 @@
+# mlops4ofp/tools/artifact_store.py
+"""
+Almacén de artefactos direccionado por contenido.
+
+Los ficheros se guardan una sola vez en <store>/<sha256[:2]>/<sha256> y las
+variantes los referencian mediante hardlink (o reflink si el filesystem lo
+permite). Si el enlace no es posible (p.ej. otro filesystem) se copia.
+
+Los hashes se calculan por bloques y se cachean por (path, size, mtime),
+de modo que re-empaquetar artefactos sin cambios solo cuesta metadata.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+FICLONE = 0x40049409  # ioctl Linux para reflinks (btrfs, xfs, ...)
+
+
+# ============================================================
+# Hashing por bloques con caché (path, size, mtime)
+# ============================================================
+
+def sha256_file(path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    """SHA-256 de un fichero leído en streaming."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class HashCache:
+    """
+    Caché persistente de hashes indexada por path absoluto.
+    Una entrada solo es válida si size y mtime_ns coinciden.
+    """
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self._entries = {}
+        self._dirty = False
+        if self.cache_path.exists():
+            try:
+                self._entries = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def sha256(self, path: Path) -> str:
+        path = Path(path).resolve()
+        st = path.stat()
+        key = str(path)
+
+        entry = self._entries.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+
+        digest = sha256_file(path)
+        self._entries[key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": digest,
+        }
+        self._dirty = True
+        return digest
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._entries, indent=2), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+
+# ============================================================
+# Enlaces: hardlink → reflink → copia (o symlink)
+# ============================================================
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as fs, open(dst, "wb") as fd:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def link_or_copy(src: Path, dst: Path, allow_hardlink: bool = True,
+                 fallback: str = "copy") -> str:
+    """
+    Materializa src en dst sin duplicar datos cuando sea posible.
+    Si no cabe hardlink ni reflink se usa fallback ("copy" | "symlink").
+    Devuelve el mecanismo usado: "hardlink" | "reflink" | "symlink" | "copy".
+    """
+    src, dst = Path(src), Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+
+    if allow_hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+
+    if _reflink(src, dst):
+        return "reflink"
+
+    if fallback == "symlink":
+        os.symlink(src.resolve(), dst)
+        return "symlink"
+
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+# ============================================================
+# Store
+# ============================================================
+
+class ArtifactStore:
+    """
+    Store de blobs inmutables (solo lectura) en <root>/<xx>/<sha256>.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hashes = HashCache(self.root / "hash_cache.json")
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, src: Path) -> str:
+        """
+        Ingresa src en el store (si no estaba) y devuelve su sha256.
+        La ingesta nunca usa hardlink: el origen puede reescribirse in-place.
+        """
+        digest = self.hashes.sha256(src)
+        blob = self.blob_path(digest)
+
+        # Un blob existente solo se reutiliza si su contenido sigue siendo
+        # el de su nombre: una escritura a través de un hardlink (p.ej.
+        # copyfile sobre un dst materializado) lo modifica in-place. La
+        # comprobación va por HashCache: sin cambios (size, mtime) es gratis.
+        if blob.exists() and self.hashes.sha256(blob) != digest:
+            print(f"[WARN] Blob corrupto en el store ({digest[:12]}); se reingresa")
+            blob.unlink()
+
+        if not blob.exists():
+            tmp = blob.with_name(blob.name + ".tmp")
+            link_or_copy(src, tmp, allow_hardlink=False)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, blob)
+
+        return digest
+
+    def materialize(self, src: Path, dst: Path) -> dict:
+        """Coloca en dst el contenido de src enlazado desde el store."""
+        digest = self.put(src)
+        mode = link_or_copy(self.blob_path(digest), dst)
+        return {"path": str(dst), "sha256": digest, "link": mode}
+
+    def materialize_tree(self, src_dir: Path, dst_dir: Path) -> list:
+        """Equivalente a copytree, fichero a fichero a través del store."""
+        src_dir, dst_dir = Path(src_dir), Path(dst_dir)
+        if dst_dir.exists():
+            shutil.rmtree(dst_dir)
+
+        entries = []
+        for src in sorted(p for p in src_dir.rglob("*") if p.is_file()):
+            dst = dst_dir / src.relative_to(src_dir)
+            entries.append(self.materialize(src, dst))
+        return entries
+
+    def save(self) -> None:
+        self.hashes.save()
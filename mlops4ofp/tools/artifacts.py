@@ -13,14 +13,39 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+WRITE_CHUNK_ROWS = 1_000_000
+
+# Modo compacto (opt-in) del dataset numérico. Ver compact_numeric_columns.
+DEFAULT_STORAGE = {
+    "compact": False,
+    "float32_tolerance": 1e-6,   # error relativo máximo al pasar a float32
+    "compression": "zstd",
+    "row_group_size": 262_144,
+}
+DICTIONARY_MAX_RATIO = 0.1       # nunique / filas por debajo del cual se usa diccionario
+
+
 def save_numeric_dataset(
     df: pd.DataFrame,
     output_path: Path,
     index_name: str = "segs",
     drop_columns: list | None = None,
+    chunk_rows: int = WRITE_CHUNK_ROWS,
+    storage: dict | None = None,
+    dtypes: dict | None = None,
 ) -> list[str]:
     """
     Guarda un dataset parquet con solo columnas numéricas (+ index si aplica).
+    Se escribe por trozos de chunk_rows filas con un ParquetWriter, sin
+    convertir el DataFrame entero a Arrow de una vez.
+
+    storage (opcional, ver DEFAULT_STORAGE): con compact=True las medidas
+    se reducen de tipo cuando no hay pérdida apreciable y se usan
+    codificaciones por columna + zstd.
+
+    dtypes (opcional): columnas y tipos finales impuestos (p.ej. los del
+    fichero base al añadir una parte); sustituye a la reducción de tipos.
+
     Devuelve la lista final de columnas.
     """
     df_out = df.copy()
@@ -36,12 +61,93 @@ def save_numeric_dataset(
     if index_name not in numeric_cols and index_name in df_out.columns:
         numeric_cols = [index_name] + [c for c in numeric_cols if c != index_name]
 
-    df_out = df_out[numeric_cols]
-    df_out.to_parquet(output_path)
+    if dtypes is not None:
+        numeric_cols = list(dtypes)
+        df_out = df_out.reindex(columns=numeric_cols).astype(dtypes)
+    else:
+        df_out = df_out[numeric_cols]
+
+    storage = {**DEFAULT_STORAGE, **(storage or {})}
+    if storage["compact"]:
+        if dtypes is None:
+            df_out = compact_numeric_columns(df_out, storage["float32_tolerance"], skip=[index_name])
+        write_parquet_chunked(
+            df_out,
+            output_path,
+            int(storage["row_group_size"]),
+            compression=storage["compression"],
+            **compact_parquet_encodings(df_out, index_name),
+        )
+    else:
+        write_parquet_chunked(df_out, output_path, chunk_rows)
 
     return numeric_cols, df_out
 
 
+def compact_numeric_columns(df: pd.DataFrame, tolerance: float, skip=()) -> pd.DataFrame:
+    """
+    float64 → float32 si |x32 - x| <= tolerance·|x| para todo valor (NaN se
+    conserva, fuera de rango da inf y no pasa). Enteros → el menor entero
+    que cubra [min, max]. Las columnas de skip (p.ej. segs) no se tocan.
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col in skip:
+            out[col] = values
+        elif values.dtype == np.float64:
+            v32 = values.astype(np.float32)
+            with np.errstate(over="ignore", invalid="ignore"):
+                err = np.abs(v32.astype(np.float64) - values)
+                ok = (err <= tolerance * np.abs(values)) | np.isnan(values)
+            out[col] = v32 if bool(ok.all()) else values
+        elif np.issubdtype(values.dtype, np.integer) and len(values):
+            out[col] = pd.to_numeric(values, downcast="integer")
+        else:
+            out[col] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def compact_parquet_encodings(df: pd.DataFrame, index_name: str = "segs") -> dict:
+    """
+    Codificación por columna para el modo compacto:
+      - index_name (monótono)   → DELTA_BINARY_PACKED
+      - baja cardinalidad       → diccionario
+      - resto de reales         → BYTE_STREAM_SPLIT (mejora zstd en floats)
+    """
+    use_dictionary = []
+    column_encoding = {}
+    n = max(len(df), 1)
+    for col in df.columns:
+        dtype = df[col].dtype
+        if col == index_name and np.issubdtype(dtype, np.integer):
+            column_encoding[col] = "DELTA_BINARY_PACKED"
+        elif df[col].nunique(dropna=True) <= DICTIONARY_MAX_RATIO * n:
+            use_dictionary.append(col)
+        elif np.issubdtype(dtype, np.floating):
+            column_encoding[col] = "BYTE_STREAM_SPLIT"
+        else:
+            use_dictionary.append(col)
+    return {"use_dictionary": use_dictionary, "column_encoding": column_encoding}
+
+
+def write_parquet_chunked(df: pd.DataFrame, output_path: Path,
+                          chunk_rows: int = WRITE_CHUNK_ROWS, **writer_options) -> None:
+    """
+    DataFrame → parquet, un row group por trozo de chunk_rows filas.
+    writer_options se pasan a ParquetWriter (compression, column_encoding...).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(output_path, schema, **writer_options) as writer:
+        for i in range(0, max(len(df), 1), chunk_rows):
+            writer.write_table(
+                pa.Table.from_pandas(df.iloc[i:i + chunk_rows], schema=schema, preserve_index=False)
+            )
+
+
 import json
 from datetime import datetime
 from pathlib import Path
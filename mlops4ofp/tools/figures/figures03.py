@@ -116,7 +116,8 @@ def plot_events_frequency_eda_reports_fast(
 def plot_empty_rate_from_totals(totals: dict, *, title: str = ""):
     counts = [totals["n_empty"], totals["n_non_empty"]]
     total = sum(counts)
-    percentages = [c / total * 100 for c in counts]
+    # Sin ventanas (p.ej. todas descartadas por NaN): 0% en vez de dividir por 0
+    percentages = [c / total * 100 if total else 0.0 for c in counts]
     labels = [f"Empty\n({percentages[0]:.1f}%)", f"Non-empty\n({percentages[1]:.1f}%)"]
     colors = ["#FF6B6B", "#51CF66"]
     plt.bar(labels, counts, color=colors)
@@ -159,7 +160,7 @@ def plot_windows_empty_and_overlap_reports(
     
     counts = [both_nonempty, ow_only, pw_only, both_empty]
     total = sum(counts)
-    percentages = [c / total * 100 for c in counts]
+    percentages = [c / total * 100 if total else 0.0 for c in counts]
     labels = [f"both non-empty\n({percentages[0]:.1f}%)", 
               f"OW only\n({percentages[1]:.1f}%)", 
               f"PW only\n({percentages[2]:.1f}%)", 
@@ -22,7 +22,10 @@ from mlops4ofp.tools.html_reports.html import (
 )
 import importlib
 importlib.reload(explore_figures)
+import mlops4ofp.tools.figures.figures_general as figures_general
 from mlops4ofp.tools.figures.figures_general import ensure_datetime_index_from_segs, save_figure
+from mlops4ofp.tools.memo import FigureMemo, data_digest
+from mlops4ofp.tools.time_axis import DiffHistogram, iter_diffs
 
 
 
@@ -155,6 +158,7 @@ def prepare_dataset_explore_fast(
     report_preclean: dict | None = None,
     exclude_cols: set[str] = DEFAULT_EXCLUDE,
     build_measure_cache: bool = True,
+    time_stats: DiffHistogram | None = None,
 ):
     """
     Prepara un cache dict con TODO lo que el informe/figuras necesita.
@@ -222,7 +226,8 @@ def prepare_dataset_explore_fast(
         t,
         expected_period=Tu_value,
         tz="UTC",            # o "Europe/Madrid"
-        threshold_factor=1.0 # para clavar tu lógica original
+        threshold_factor=1.0, # para clavar tu lógica original
+        diff_stats=time_stats, # histograma de F01: evita np.diff completo
     )
 
     global_stats["gaps"] = {"df": gaps_df, "summary": gaps_summary}
@@ -552,12 +557,16 @@ def compute_time_gaps_from_t_fast(
     expected_period: float,
     tz: str = "UTC",            # tu versión usa UTC; si quieres local, pon "Europe/Madrid"
     threshold_factor: float = 1.0,  # 1.0 = tu lógica original (delta > period)
+    diff_stats: DiffHistogram | None = None,
 ) -> tuple[pd.DataFrame | None, dict]:
     """
     Detecta huecos temporales a partir del vector de tiempos t (segs).
     No toca df. Muy rápido.
 
     t: np.ndarray float (segs), idealmente ordenado asc.
+    diff_stats: histograma de diferencias de prepare_time_axis (F01). Si se
+    da, el resumen sale del histograma y t solo se recorre (por bloques)
+    cuando hay huecos que listar.
     """
 
     period_sec = float(expected_period) if expected_period is not None else None
@@ -581,22 +590,33 @@ def compute_time_gaps_from_t_fast(
                 "max_gap_seconds": 0.0,
             }
 
-    dt = np.diff(t)
     thr = period_sec * float(threshold_factor)
-    gap_mask = dt > thr
 
-    if not gap_mask.any():
-        return None, {
-            "n_gaps": 0,
-            "missing_samples_total": 0,
-            "expected_period_seconds": period_sec,
-            "max_gap_seconds": 0.0,
-        }
+    if diff_stats is not None:
+        summary = diff_stats.gap_summary(period_sec, threshold_factor)
+        if summary["n_gaps"] == 0:
+            return None, summary
+        idx = np.concatenate([
+            start + np.flatnonzero(dt > thr) for start, dt in iter_diffs(t)
+        ])
+        gap_seconds = t[idx + 1] - t[idx]
+    else:
+        dt = np.diff(t)
+        gap_mask = dt > thr
+
+        if not gap_mask.any():
+            return None, {
+                "n_gaps": 0,
+                "missing_samples_total": 0,
+                "expected_period_seconds": period_sec,
+                "max_gap_seconds": 0.0,
+            }
+
+        idx = np.flatnonzero(gap_mask)  # posiciones en dt
+        gap_seconds = dt[idx]
 
-    idx = np.flatnonzero(gap_mask)  # posiciones en dt
     prev_segs = t[idx]
     curr_segs = t[idx + 1]
-    gap_seconds = dt[idx]
 
     missing_samples = np.clip(np.rint(gap_seconds / period_sec - 1.0).astype(np.int64), 0, None)
 
@@ -648,15 +668,23 @@ def generate_figures_and_report(
     numeric_cols: list[str],
     Tu_value: float,
     report_preclean: dict | None = None,
+    time_stats: DiffHistogram | None = None,
 ) -> None:
     print("[explore] Generando informe HTML final...")
 
     figures_dir: Path = ctx["figures_dir"]
     figures_dir.mkdir(parents=True, exist_ok=True)
 
+    # Cada figura se redibuja solo si cambian sus datos o el código del informe
+    memo = FigureMemo(
+        figures_dir,
+        [__file__, explore_figures.__file__, figures_general.__file__],
+        force=ctx.get("force", False),
+    )
+
     report_path = ctx["outputs"]["report"]
     
-    prep= prepare_dataset_explore_fast(df=df_out, Tu_value=Tu_value, report_preclean=report_preclean, exclude_cols=DEFAULT_EXCLUDE, build_measure_cache=True, )
+    prep= prepare_dataset_explore_fast(df=df_out, Tu_value=Tu_value, report_preclean=report_preclean, exclude_cols=DEFAULT_EXCLUDE, build_measure_cache=True, time_stats=time_stats, )
 
     rep = HtmlReport(
         title=f"Exploration Report — Variante {variant}",
@@ -713,11 +741,11 @@ def generate_figures_and_report(
         ))
 
         fig_bad_col = figures_dir / "bad_cells_per_column.png"
-        save_figure(
+        memo.figure(fig_bad_col, (bad_per_col,), lambda: save_figure(
             fig_bad_col,
             plot_fn=lambda: explore_figures.plot_bad_cells_per_column_bar(bad_per_col, top_n=18),
             figsize=(10, 6),
-        )
+        ))
         # figura dentro de una card
         rep.add(card(render_figure_card("NaNs por columna (top 18)", fig_bad_col.name, max_width="100%")))
 
@@ -754,10 +782,12 @@ def generate_figures_and_report(
         rep.add(table_card(intervals_df.head(10), title="Detalle (10 primeros intervalos)", index=False))
 
         fig_int_1 = figures_dir / "bad_intervals_duration_hist.png"
-        save_figure(fig_int_1, plot_fn=lambda: explore_figures.plot_bad_intervals_duration_hist(intervals_df), figsize=(12, 5))
+        memo.figure(fig_int_1, (intervals_df,), lambda: save_figure(
+            fig_int_1, plot_fn=lambda: explore_figures.plot_bad_intervals_duration_hist(intervals_df), figsize=(12, 5)))
 
         fig_int_2 = figures_dir / "bad_intervals_scatter.png"
-        save_figure(fig_int_2, plot_fn=lambda: explore_figures.plot_bad_intervals_scatter(intervals_df), figsize=(12, 5))
+        memo.figure(fig_int_2, (intervals_df,), lambda: save_figure(
+            fig_int_2, plot_fn=lambda: explore_figures.plot_bad_intervals_scatter(intervals_df), figsize=(12, 5)))
 
         rep.add(open_grid(cols=2, gap_rem=1.0))
         rep.add(render_figure_card("Histograma de duración de intervalos con NaNs", fig_int_1.name, max_width="100%"))
@@ -810,7 +840,7 @@ def generate_figures_and_report(
     mean_series = prep["global"]["mean_series"]
 
     fig_mean = figures_dir / "mean_by_variable.png"
-    save_figure(
+    memo.figure(fig_mean, (mean_series,), lambda: save_figure(
         fig_mean,
         plot_fn=lambda: (
             mean_series.plot(kind="barh", title="Media por variable numérica"),
@@ -819,7 +849,7 @@ def generate_figures_and_report(
             plt.tight_layout(),
         ),
         figsize=(12, 8),
-    )
+    ))
 
     rep.add(card(render_figure_card("Media por variable numérica", fig_mean.name, max_width="100%")))
     rep.add(table_card(desc_fmt, title="Tabla de estadísticos (formateada)", index=True))
@@ -836,11 +866,11 @@ def generate_figures_and_report(
     dist = prep["global"]["pct_dist"]
 
     fig_dist = figures_dir / "percentage_distribution.png"
-    save_figure(
+    memo.figure(fig_dist, (dist,), lambda: save_figure(
         fig_dist,
         plot_fn=lambda: explore_figures.plot_percentage_distribution(dist),
         figsize=(12, max(4, 0.4 * (len(dist) if dist is not None else 5))),
-    )
+    ))
     rep.add(card(render_figure_card("Distribución porcentual (min–max)", fig_dist.name, max_width="100%")))
 
     # ------------------------------------------------------------
@@ -857,11 +887,11 @@ def generate_figures_and_report(
     corr = prep["global"]["corr"]
 
     corr_path = figures_dir / "corr_heatmap.png"
-    save_figure(
+    memo.figure(corr_path, (corr,), lambda: save_figure(
         corr_path,
         plot_fn=lambda: explore_figures.plot_correlation_heatmap(corr),
         figsize=(12, 10),
-    )
+    ))
     rep.add(card(render_figure_card("Heatmap de correlación", corr_path.name, max_width="100%")))
 
     # ------------------------------------------------------------
@@ -884,16 +914,21 @@ def generate_figures_and_report(
     time_keys = prepare_time_keys_fast(df_out, time_col="segs", tz="Europe/Madrid")
     numeric_cols = [c for c in df_out.columns if c not in DEFAULT_EXCLUDE and pd.api.types.is_numeric_dtype(df_out[c])]
     cache = prepare_measure_cache_fast(df_out, numeric_cols)
+    time_digest = data_digest(time_keys["segs"], time_keys["tz"])
 
 
     for measure in numeric_cols:
         rep.add(subsection(measure, center=True))
-        figs = explore_figures.plot_measure_summary_fast(
-            measure=measure,
-            cache_item=cache[measure],
-            time_keys=time_keys,
-            output_dir=figures_dir,
-            max_points_plot=50_000,
+        figs = memo.figures(
+            f"measure:{measure}",
+            (measure, time_digest, cache[measure]["x"]),
+            lambda: explore_figures.plot_measure_summary_fast(
+                measure=measure,
+                cache_item=cache[measure],
+                time_keys=time_keys,
+                output_dir=figures_dir,
+                max_points_plot=50_000,
+            ),
         )
         rep.add(figures_grid(figs, cols=2, max_width="100%"))
 
@@ -907,6 +942,7 @@ def generate_figures_and_report(
 
 
     df_dt = ensure_datetime_index_from_segs(df_out, time_col="segs", tz="Europe/Madrid")
+    df_digest = data_digest(df_out)
 
 
     extra_blocks = [
@@ -918,9 +954,13 @@ def generate_figures_and_report(
 
     for title, fn in extra_blocks:
         rep.add(subsection(title))
-        figs = fn(df=df_dt, reports_path=figures_dir, time_col="segs")
+        figs = memo.figures(
+            f"extra:{title}", (df_digest,),
+            lambda: fn(df=df_dt, reports_path=figures_dir, time_col="segs"),
+        )
         rep.add(figures_grid(figs, cols=2, max_width="100%"))
 
+    memo.save()
     rep.write(report_path)
     print(f"[OK] Informe HTML generado en {report_path}")
     print(f"[OK] Figuras generadas en: {figures_dir}")
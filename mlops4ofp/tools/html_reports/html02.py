@@ -1,8 +1,11 @@
 import pandas as pd
 import mlops4ofp.tools.figures.figures02 as figures
+import mlops4ofp.tools.figures.figures_general as figures_general
 import re
 import numpy as np
 
+from mlops4ofp.tools.memo import FigureMemo
+
 from mlops4ofp.tools.html_reports.html import (
     HtmlReport,
     events_card,
@@ -347,6 +350,13 @@ def generate_figures_and_report(
 
     report_path = ctx["outputs"]["report"]
 
+    # Cada figura se redibuja solo si cambian sus datos o el código del informe
+    memo = FigureMemo(
+        ctx["figures_dir"],
+        [__file__, figures.__file__, figures_general.__file__],
+        force=ctx.get("force", False),
+    )
+
     rep = HtmlReport(
         title=f"PrepareEventsDS Report — Variante {variant}",
         ctx=ctx,
@@ -404,9 +414,12 @@ def generate_figures_and_report(
             .reset_index(drop=True)
         )
 
-        saved_levels_general = figures.plot_general_levels_eda_reports(
-            levels_by_measure=levels_by_measure,
-            reports_path=ctx["figures_dir"],
+        saved_levels_general = memo.figures(
+            "levels:general", (levels_by_measure,),
+            lambda: figures.plot_general_levels_eda_reports(
+                levels_by_measure=levels_by_measure,
+                reports_path=ctx["figures_dir"],
+            ),
         )
         if saved_levels_general:
             rep.add(figures_grid(saved_levels_general, cols=2, max_width="100%"))
@@ -415,10 +428,14 @@ def generate_figures_and_report(
 
         for measure in measures_levels:
             rep.add(subsection(measure, center=True))
-            fig_by_measure = figures.plot_measure_levels_eda_reports(
-                levels_by_measure=levels_by_measure,
-                reports_path=ctx["figures_dir"],
-                measure=measure,
+            fig_by_measure = memo.figures(
+                f"levels:{measure}",
+                (measure, levels_by_measure[levels_by_measure["measure"] == measure]),
+                lambda: figures.plot_measure_levels_eda_reports(
+                    levels_by_measure=levels_by_measure,
+                    reports_path=ctx["figures_dir"],
+                    measure=measure,
+                ),
             )
             rep.add(figures_grid(fig_by_measure, cols=2, max_width="100%"))
             
@@ -429,9 +446,12 @@ def generate_figures_and_report(
     if event_strategy in ("transitions", "both") and not events_by_measure_jump.empty:
         rep.add(section("Figuras de transiciones"))
 
-        general_transition_figures = figures.plot_general_events_eda_reports(
-            dt_summary=dt_summary_transitions,
-            reports_path=ctx["figures_dir"],
+        general_transition_figures = memo.figures(
+            "transitions:general", (dt_summary_transitions,),
+            lambda: figures.plot_general_events_eda_reports(
+                dt_summary=dt_summary_transitions,
+                reports_path=ctx["figures_dir"],
+            ),
         )
         rep.add(subsection("Transiciones generales", center=True))
         if general_transition_figures:
@@ -444,12 +464,21 @@ def generate_figures_and_report(
 
         for measure in measures_with_transitions:
             rep.add(subsection(measure, center=True))
-            fig_by_measure = figures.plot_measure_events_eda_reports(
-            events_by_measure_jump=events_by_measure_jump,
-            dt_summary=dt_summary_transitions,
-            reports_path=ctx["figures_dir"],
-            measure=measure,
-            precomputed_dt_jumps_by_measure=precomputed_dt_jumps_by_measure,
+            fig_by_measure = memo.figures(
+                f"transitions:{measure}",
+                (
+                    measure,
+                    events_by_measure_jump[events_by_measure_jump["measure"] == measure],
+                    dt_summary_transitions,
+                    precomputed_dt_jumps_by_measure.get(measure),
+                ),
+                lambda: figures.plot_measure_events_eda_reports(
+                    events_by_measure_jump=events_by_measure_jump,
+                    dt_summary=dt_summary_transitions,
+                    reports_path=ctx["figures_dir"],
+                    measure=measure,
+                    precomputed_dt_jumps_by_measure=precomputed_dt_jumps_by_measure,
+                ),
             )
             rep.add(figures_grid(fig_by_measure, cols=2, max_width="100%"))
 
@@ -465,6 +494,7 @@ def generate_figures_and_report(
         index=False,
     ))
 
+    memo.save()
     rep.write(report_path)
     print(f"[OK] Informe HTML generado en {report_path}")
 
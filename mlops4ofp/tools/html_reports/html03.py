@@ -2,6 +2,8 @@
 #  Informe HTML final (Fase 03)
 # ============================================================
 from mlops4ofp.tools.figures import figures03 as figures
+from mlops4ofp.tools.figures import figures_general
+from mlops4ofp.tools.memo import FigureMemo
 from datetime import datetime
 import pandas as pd
 from mlops4ofp.tools.html_reports.html import HtmlReport, close_div, open_grid, kpi_card, kpi_grid, render_figure_card, smart_fmt, render_header, render_footer, html_escape, table_card, subsection, section
@@ -374,6 +376,13 @@ def generate_html_report(ctx: dict, df_windows: pd.DataFrame, catalog: dict ) ->
     figures_dir = ctx["figures_dir"]
     active_variant = ctx["variant"]
 
+    # Cada figura se redibuja solo si cambian sus datos o el código del informe
+    memo = FigureMemo(
+        figures_dir,
+        [__file__, figures.__file__, figures_general.__file__],
+        force=ctx.get("force", False),
+    )
+
 
     # Report: start() ya mete:
     # - header + css fijo
@@ -404,12 +413,15 @@ def generate_html_report(ctx: dict, df_windows: pd.DataFrame, catalog: dict ) ->
     ))
 
 
-    windows_hist_figs = figures.plot_windows_hist_reports(
-        reports_path=figures_dir,
-        ow=ow_stats,
-        pw=pw_stats,
-        max_len=20,
-        top_k=30,
+    windows_hist_figs = memo.figures(
+        "plot_windows_hist_reports", (ow_stats, pw_stats),
+        lambda: figures.plot_windows_hist_reports(
+            reports_path=figures_dir,
+            ow=ow_stats,
+            pw=pw_stats,
+            max_len=20,
+            top_k=30,
+        ),
     )
     rep.add(open_grid(cols=2, gap_rem=1.0))
     for fig_title, fig_path in windows_hist_figs:
@@ -431,12 +443,15 @@ def generate_html_report(ctx: dict, df_windows: pd.DataFrame, catalog: dict ) ->
     ))
 
     
-    events_frequency_figs = figures.plot_events_frequency_eda_reports_fast(
-        reports_path=figures_dir,
-        ow=ow_stats,
-        pw=pw_stats,
-        max_len=20,
-        top_k=30,
+    events_frequency_figs = memo.figures(
+        "plot_events_frequency_eda_reports_fast", (ow_stats, pw_stats),
+        lambda: figures.plot_events_frequency_eda_reports_fast(
+            reports_path=figures_dir,
+            ow=ow_stats,
+            pw=pw_stats,
+            max_len=20,
+            top_k=30,
+        ),
     )
     rep.add(open_grid(cols=2, gap_rem=1.0))
     for fig_title, fig_path in events_frequency_figs:
@@ -462,12 +477,15 @@ def generate_html_report(ctx: dict, df_windows: pd.DataFrame, catalog: dict ) ->
     ))
 
 
-    windows_empty_and_overlap_figs = figures.plot_windows_empty_and_overlap_reports(
-        reports_path=figures_dir,
-        ow=ow_stats,
-        pw=pw_stats,
-        max_len=20,
-        top_k=30,
+    windows_empty_and_overlap_figs = memo.figures(
+        "plot_windows_empty_and_overlap_reports", (ow_stats, pw_stats),
+        lambda: figures.plot_windows_empty_and_overlap_reports(
+            reports_path=figures_dir,
+            ow=ow_stats,
+            pw=pw_stats,
+            max_len=20,
+            top_k=30,
+        ),
     )
 
     rep.add(open_grid(cols=2, gap_rem=1.0))
@@ -479,6 +497,7 @@ def generate_html_report(ctx: dict, df_windows: pd.DataFrame, catalog: dict ) ->
 
 
     # Guardar
+    memo.save()
     rep.write(report_path)
 
     print(f"[OK] Informe HTML generado en {report_path}")
\ No newline at end of file
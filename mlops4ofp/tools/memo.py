@@ -0,0 +1,235 @@
+# mlops4ofp/tools/memo.py
+"""
+Memoización por contenido de las fases y de las figuras de los informes.
+
+Huella (fingerprint) de una ejecución de fase:
+  inputs → sha256 de los artefactos de entrada (dataset padre + partes,
+           catálogos, raw...)
+  params → sha256 del params.yaml de la variante
+  code   → sha256 del script de fase + mlops4ofp/tools/**/*.py
+
+Se guarda en <phase>_metadata.json["fingerprint"]. Al relanzar la fase, si
+la huella coincide y los outputs existen, termina con "cache hit" sin tocar
+nada. --force (FORCE=1 en make) ejecuta igualmente.
+
+    fp = phase_fingerprint(SCRIPT_PATH, params, inputs, project_root)
+    if memo_hit(PHASE, outputs["metadata"], fp, [outputs["dataset"], ...], args.force):
+        return
+    ...
+    record_fingerprint(outputs["metadata"], fp)   # tras escribir metadata
+
+Con --append no se comprueba la huella y se invalida (None): los modos
+incrementales evitan a propósito releer las entradas completas.
+
+Los hashes de ficheros se cachean por (path, size, mtime) en
+executions/.hash_cache.json: comprobar un dataset sin cambios no lo relee.
+
+Las figuras de los informes se memoizan una a una con FigureMemo: huella
+de los datos que dibujan + código del informe, en <figures>/.figure_memo.json.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mlops4ofp.tools.artifact_store import HashCache
+
+FINGERPRINT_KEY = "fingerprint"
+TOOLS_DIR = Path(__file__).resolve().parent
+FIGURE_MEMO_FILE = ".figure_memo.json"
+
+
+# ============================================================
+# Huellas
+# ============================================================
+
+def code_version(paths) -> str:
+    """sha256 del contenido de los ficheros (y de sus nombres)."""
+    h = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def tools_files() -> list:
+    return sorted(TOOLS_DIR.rglob("*.py"))
+
+
+def params_digest(params: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(params, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def data_digest(*objs) -> str:
+    """sha256 de datos en memoria (DataFrame, Series, arrays, dict, escalares)."""
+    h = hashlib.sha256()
+
+    def feed(obj):
+        if obj is None:
+            h.update(b"\x00none")
+        elif isinstance(obj, (pd.DataFrame, pd.Series)):
+            h.update(repr(obj.dtypes if isinstance(obj, pd.DataFrame) else (obj.name, obj.dtype)).encode())
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+            if isinstance(obj, pd.DataFrame):
+                h.update(repr(list(obj.columns)).encode())
+        elif isinstance(obj, pd.Index):
+            h.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+        elif isinstance(obj, np.ndarray):
+            h.update(f"{obj.dtype}{obj.shape}".encode())
+            if obj.dtype == object:
+                h.update(repr(obj.tolist()).encode())
+            else:
+                h.update(np.ascontiguousarray(obj).tobytes())
+        elif isinstance(obj, dict):
+            for k in sorted(obj, key=str):
+                h.update(repr(k).encode())
+                feed(obj[k])
+        elif isinstance(obj, (list, tuple)):
+            h.update(f"[{len(obj)}".encode())
+            for item in obj:
+                feed(item)
+        else:
+            h.update(repr(obj).encode())
+
+    for obj in objs:
+        feed(obj)
+    return h.hexdigest()
+
+
+def _rel(path: Path, project_root: Path) -> str:
+    try:
+        return str(Path(path).resolve().relative_to(project_root.resolve()))
+    except ValueError:
+        return str(path)
+
+
+def phase_fingerprint(script_path: Path, params: dict, inputs, project_root: Path) -> dict:
+    """Huella de entradas + params + código de la fase."""
+    project_root = Path(project_root)
+    hashes = HashCache(project_root / "executions" / ".hash_cache.json")
+    input_hashes = {_rel(p, project_root): hashes.sha256(p) for p in inputs}
+    hashes.save()
+
+    fingerprint = {
+        "inputs": input_hashes,
+        "params": params_digest(params),
+        "code": code_version([script_path] + tools_files()),
+    }
+    fingerprint["key"] = params_digest(fingerprint)
+    return fingerprint
+
+
+# ============================================================
+# Consulta / registro en <phase>_metadata.json
+# ============================================================
+
+def memo_hit(phase: str, metadata_path: Path, fingerprint: dict, outputs, force: bool = False) -> bool:
+    """True si la ejecución anterior tiene la misma huella y sus outputs existen."""
+    metadata_path = Path(metadata_path)
+    if force:
+        print(f"[INFO] {phase}: --force, se ignora la huella guardada")
+        return False
+    if not metadata_path.exists():
+        return False
+
+    stored = json.loads(metadata_path.read_text(encoding="utf-8")).get(FINGERPRINT_KEY) or {}
+    if stored.get("key") != fingerprint["key"]:
+        if stored:
+            changed = [k for k in ("inputs", "params", "code") if stored.get(k) != fingerprint[k]]
+            print(f"[INFO] {phase}: huella distinta ({', '.join(changed)}), se recalcula")
+        return False
+
+    missing = [str(p) for p in outputs if not Path(p).exists()]
+    if missing:
+        print(f"[INFO] {phase}: huella igual pero faltan outputs ({missing[0]}), se recalcula")
+        return False
+
+    print(f"[OK] {phase}: cache hit (huella {fingerprint['key'][:12]}); outputs sin cambios. "
+          "Usa --force para recalcular")
+    return True
+
+
+def record_fingerprint(metadata_path: Path, fingerprint: dict | None) -> None:
+    """
+    Añade la huella a <phase>_metadata.json (escritura atómica). Con None
+    la invalida (p.ej. tras --append, que no recalcula hashes).
+    """
+    metadata_path = Path(metadata_path)
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    metadata[FINGERPRINT_KEY] = fingerprint
+    tmp = metadata_path.with_name(metadata_path.name + ".tmp")
+    tmp.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    os.replace(tmp, metadata_path)
+
+
+# ============================================================
+# Figuras
+# ============================================================
+
+class FigureMemo:
+    """
+    Memo de figuras de un informe. Cada entrada (una figura o un grupo de
+    figuras generado por una sola función) guarda la huella de sus datos y
+    los ficheros producidos; si la huella coincide y los ficheros existen,
+    no se vuelve a dibujar.
+
+        memo = FigureMemo(figures_dir, [__file__, figures01.__file__], force=ctx.get("force"))
+        figs = memo.figures("measure:" + m, (cache[m], time_keys), lambda: plot(...))
+        memo.figure(fig_path, (corr,), lambda: save_figure(fig_path, ...))
+        memo.save()
+    """
+
+    def __init__(self, figures_dir: Path, code_files, force: bool = False):
+        self.figures_dir = Path(figures_dir)
+        self.path = self.figures_dir / FIGURE_MEMO_FILE
+        self.code = code_version(code_files)
+        self.force = bool(force)
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        if self.path.exists() and not self.force:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def figures(self, name: str, data, build) -> list:
+        """
+        Lista [(título, path)] de build() o, si la huella de data no ha
+        cambiado, la guardada sin volver a dibujar.
+        """
+        key = data_digest(self.code, data)
+        entry = self._entries.get(name)
+        if entry and entry["key"] == key:
+            figs = [(title, self.figures_dir / fname) for title, fname in entry["figures"]]
+            if all(p.exists() for _, p in figs):
+                self.hits += 1
+                return figs
+
+        self.misses += 1
+        figs = list(build() or [])
+        self._entries[name] = {
+            "key": key,
+            "figures": [[title, Path(p).name] for title, p in figs],
+        }
+        return figs
+
+    def figure(self, fig_path: Path, data, build) -> Path:
+        """Una sola figura: build() debe escribir fig_path."""
+        fig_path = Path(fig_path)
+        self.figures(fig_path.name, data, lambda: (build(), [("", fig_path)])[1])
+        return fig_path
+
+    def save(self) -> None:
+        self.figures_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self._entries, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+        print(f"[INFO] Figuras memoizadas: {self.hits} reutilizadas, {self.misses} generadas")
@@ -0,0 +1,164 @@
+# mlops4ofp/tools/microbatch.py
+"""
+Micro-batching dinámico para el servidor de inferencia (F07).
+
+Las peticiones concurrentes se encolan y un hilo las agrupa hasta
+max_batch_size ventanas o max_wait_ms desde la primera en cola; se ejecuta
+una sola vectorización + predict por modelo y los resultados se reparten
+de vuelta a cada petición.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class _Pending:
+    __slots__ = ("flat", "lengths", "counts", "future", "t_enqueue")
+
+    def __init__(self, flat, lengths, counts=None):
+        self.flat = flat
+        self.lengths = lengths
+        self.counts = counts
+        self.future = Future()
+        self.t_enqueue = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Las ventanas viajan aplanadas (flat, lengths), igual que en
+    vectorization.flatten_windows, de modo que agrupar es concatenar.
+    Una petición puede traer además counts (ventanas como bolsa código →
+    conteo, ver OnlineWindow.bag); una lista de eventos equivale a una
+    bolsa con conteos 1, así que ambas formas se agrupan en el mismo lote.
+
+    run_batch(flat, lengths, counts) -> (
+        {prediction_name: np.ndarray (len(lengths),)},
+        timing (dict con tiempos del lote),
+    )
+
+    submit(flat, lengths, counts=None) bloquea hasta tener (preds, timing) de esas
+    ventanas; timing añade queue_ms (espera en cola) y batch_windows.
+    """
+
+    def __init__(self, run_batch, max_batch_size: int = 512, max_wait_ms: float = 5.0,
+                 stats_window: int = 1000):
+        self.run_batch = run_batch
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = float(max_wait_ms) / 1000.0
+
+        self._queue = queue.Queue()
+        self._carry = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._windows = 0
+        self._fill = deque(maxlen=stats_window)
+        self._wait_ms = deque(maxlen=stats_window)
+
+        self._thread = threading.Thread(target=self._loop, name="microbatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, flat, lengths, counts=None):
+        pending = _Pending(flat, lengths, counts)
+        self._queue.put(pending)
+        return pending.future.result()
+
+    # --------------------------------------------------------
+    # Bucle de agrupación
+    # --------------------------------------------------------
+
+    def _next(self, timeout=None):
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        return self._queue.get(timeout=timeout)
+
+    def _collect(self):
+        first = self._next()
+        batch = [first]
+        size = len(first.lengths)
+        deadline = first.t_enqueue + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._next(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(item.lengths) > self.max_batch_size:
+                # No cabe: abre el siguiente lote
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item.lengths)
+
+        return batch, size
+
+    def _loop(self):
+        while True:
+            batch, size = self._collect()
+            t_start = time.perf_counter()
+
+            flat = np.concatenate([p.flat for p in batch])
+            lengths = np.concatenate([p.lengths for p in batch])
+            counts = None
+            if any(p.counts is not None for p in batch):
+                counts = np.concatenate([
+                    p.counts if p.counts is not None else np.ones(len(p.flat), dtype=np.int64)
+                    for p in batch
+                ])
+
+            try:
+                results, timing = self.run_batch(flat, lengths, counts)
+            except Exception as e:
+                for p in batch:
+                    p.future.set_exception(e)
+                continue
+
+            offset = 0
+            for p in batch:
+                n = len(p.lengths)
+                p.future.set_result((
+                    {name: preds[offset:offset + n] for name, preds in results.items()},
+                    {
+                        **timing,
+                        "queue_ms": (t_start - p.t_enqueue) * 1000.0,
+                        "batch_windows": size,
+                    },
+                ))
+                offset += n
+
+            with self._lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._windows += size
+                self._fill.append(size / self.max_batch_size)
+                self._wait_ms.extend((t_start - p.t_enqueue) * 1000.0 for p in batch)
+
+    # --------------------------------------------------------
+    # Métricas
+    # --------------------------------------------------------
+
+    def stats(self) -> dict:
+        with self._lock:
+            fill = np.array(self._fill, dtype=np.float64)
+            wait = np.array(self._wait_ms, dtype=np.float64)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "requests": self._requests,
+                "windows": self._windows,
+                "queue_depth": self._queue.qsize(),
+                "fill_ratio_mean": float(fill.mean()) if len(fill) else None,
+                "queue_wait_ms_mean": float(wait.mean()) if len(wait) else None,
+                "queue_wait_ms_p95": float(np.percentile(wait, 95)) if len(wait) else None,
+                "queue_wait_ms_max": float(wait.max()) if len(wait) else None,
+            }
@@ -0,0 +1,213 @@
+# mlops4ofp/tools/online_windows.py
+"""
+Construcción online de ventanas OW (F07 replay / runtime).
+
+La geometría es la de F03 (OW, LT, PW en múltiplos de Tu). La ventana
+actual se mantiene en un buffer circular de eventos: cada tick inserta los
+eventos nuevos y expulsa los caducados, con coste amortizado O(1) por
+evento e independiente de la longitud de la ventana. Además se mantiene
+un conteo acumulado por código de evento (bag-of-words) y de eventos NaN:
+bag() da la ventana como (código, conteo) sin recorrer sus eventos.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# ============================================================
+# Geometría (F03)
+# ============================================================
+
+@dataclass(frozen=True)
+class WindowGeometry:
+    OW: int
+    LT: int
+    PW: int
+    Tu: float
+    window_strategy: str = "synchro"
+    nan_strategy: str = "discard"
+
+    @classmethod
+    def from_params(cls, params: dict, Tu: float) -> "WindowGeometry":
+        """params = params.yaml de una variante F03 (Tu ya resuelto)."""
+        return cls(
+            OW=int(params["OW"]),
+            LT=int(params["LT"]),
+            PW=int(params["PW"]),
+            Tu=float(Tu),
+            window_strategy=params.get("window_strategy", "synchro"),
+            nan_strategy=params.get("nan_strategy", "discard"),
+        )
+
+    @property
+    def ow_span(self) -> float:
+        return self.OW * self.Tu
+
+    @property
+    def pw_start(self) -> float:
+        return (self.OW + self.LT) * self.Tu
+
+    @property
+    def pw_span(self) -> float:
+        return self.PW * self.Tu
+
+    @property
+    def total_span(self) -> float:
+        return self.pw_start + self.pw_span
+
+
+# ============================================================
+# Ventana online
+# ============================================================
+
+class OnlineWindow:
+    """
+    Ventana OW deslizante [t - OW·Tu, t) sobre un buffer circular.
+
+    push(times, codes) añade eventos (tiempos no decrecientes);
+    advance(t) fija el fin de la ventana en t y expulsa lo caducado.
+    """
+
+    def __init__(self, geometry: WindowGeometry, nan_codes=(), capacity: int = 1024):
+        self.geometry = geometry
+        self.span = geometry.ow_span
+
+        capacity = max(16, int(capacity))
+        self._codes = np.empty(capacity, dtype=np.int64)
+        self._times = np.empty(capacity, dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+        nan_codes = np.asarray(list(nan_codes), dtype=np.int64)
+        self._is_nan = np.zeros(int(nan_codes.max()) + 1 if len(nan_codes) else 0, dtype=bool)
+        self._is_nan[nan_codes] = True
+
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.nan_count = 0
+        self.start = -np.inf
+
+    def __len__(self) -> int:
+        return self._size
+
+    # --------------------------------------------------------
+    # Buffer circular
+    # --------------------------------------------------------
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._codes)
+        while capacity < needed:
+            capacity *= 2
+        codes, times = self.events(), self._ordered_times()
+        self._codes = np.empty(capacity, dtype=np.int64)
+        self._times = np.empty(capacity, dtype=np.float64)
+        self._codes[:self._size] = codes
+        self._times[:self._size] = times
+        self._head = 0
+
+    def _segments(self):
+        """Contenido como (a, b) rangos físicos en orden lógico."""
+        capacity = len(self._codes)
+        end = self._head + self._size
+        if end <= capacity:
+            return (self._head, end), (0, 0)
+        return (self._head, capacity), (0, end - capacity)
+
+    def _ordered_times(self) -> np.ndarray:
+        (a0, a1), (b0, b1) = self._segments()
+        return np.concatenate([self._times[a0:a1], self._times[b0:b1]])
+
+    def _count(self, codes: np.ndarray, sign: int) -> None:
+        if not len(codes):
+            return
+        top = int(codes.max()) + 1
+        if top > len(self.counts):
+            self.counts = np.concatenate([
+                self.counts, np.zeros(top - len(self.counts), dtype=np.int64)
+            ])
+        np.add.at(self.counts, codes, sign)
+        inside = codes[codes < len(self._is_nan)]
+        self.nan_count += sign * int(self._is_nan[inside].sum())
+
+    # --------------------------------------------------------
+    # Actualización por tick
+    # --------------------------------------------------------
+
+    def push(self, times, codes) -> None:
+        codes = np.asarray(codes, dtype=np.int64)
+        times = np.broadcast_to(np.asarray(times, dtype=np.float64), codes.shape)
+        n = len(codes)
+        if n == 0:
+            return
+        if self._size + n > len(self._codes):
+            self._grow(self._size + n)
+
+        capacity = len(self._codes)
+        pos = (self._head + self._size) % capacity
+        first = min(n, capacity - pos)
+        self._codes[pos:pos + first] = codes[:first]
+        self._times[pos:pos + first] = times[:first]
+        self._codes[:n - first] = codes[first:]
+        self._times[:n - first] = times[first:]
+        self._size += n
+
+        self._count(codes, +1)
+
+    def advance(self, t: float) -> None:
+        """Ventana = [t - OW·Tu, t); expulsa los eventos anteriores."""
+        self.start = t - self.span
+        (a0, a1), (b0, b1) = self._segments()
+
+        k = int(np.searchsorted(self._times[a0:a1], self.start, side="left"))
+        if k == a1 - a0:
+            k += int(np.searchsorted(self._times[b0:b1], self.start, side="left"))
+        if k == 0:
+            return
+
+        capacity = len(self._codes)
+        if self._head + k <= capacity:
+            evicted = self._codes[self._head:self._head + k]
+        else:
+            evicted = np.concatenate([self._codes[self._head:], self._codes[:self._head + k - capacity]])
+        self._count(evicted, -1)
+
+        self._head = (self._head + k) % capacity
+        self._size -= k
+
+    # --------------------------------------------------------
+    # Consulta
+    # --------------------------------------------------------
+
+    def events(self) -> np.ndarray:
+        """Eventos de la ventana en orden temporal (copia contigua)."""
+        (a0, a1), (b0, b1) = self._segments()
+        return np.concatenate([self._codes[a0:a1], self._codes[b0:b1]])
+
+    def emittable(self) -> bool:
+        """
+        Criterios de F03 evaluables online (la PW es futura):
+          - OW no vacía
+          - asynOW  → eventos en el primer Tu de la OW
+          - discard → sin eventos NaN en la OW
+        """
+        if self._size == 0:
+            return False
+        if self.geometry.window_strategy == "asynOW":
+            if self._times[self._head] >= self.start + self.geometry.Tu:
+                return False
+        if self.geometry.nan_strategy == "discard" and self.nan_count:
+            return False
+        return True
+
+    def bag(self):
+        """
+        Ventana como bolsa de eventos: (códigos, conteos) del conteo
+        acumulado, O(catálogo) e independiente de OW. Si la ventana tiene
+        menos eventos que códigos el catálogo, la lista de eventos es más
+        barata: devuelve (eventos, None). Es lo que envía el replay a
+        modelos dense_bow (CompiledVectorizer.from_flat(counts=)).
+        """
+        if self._size <= len(self.counts):
+            return self.events(), None
+        codes = np.flatnonzero(self.counts)
+        return codes, self.counts[codes]
@@ -1,5 +1,6 @@
 import json
 import yaml
+import glob
 import hashlib
 import shutil
 import re
@@ -214,7 +215,8 @@ def validate_params(phase: str, params: dict, project_root: Path):
     # -------------------------------
     if phase == "01_explore" and "raw_dataset_path" in params:
         raw_path = (project_root / params["raw_dataset_path"]).expanduser()
-        if not raw_path.exists():
+        # Admite también un glob (varios ficheros raw)
+        if not raw_path.exists() and not glob.glob(str(raw_path), recursive=True):
             raise ValueError(
                 f"raw_dataset_path apunta a un fichero inexistente: {raw_path}"
             )
@@ -314,7 +316,8 @@ def validate_params(phase: str, params: dict, project_root: Path):
     # -------------------------------
     if phase == "01_explore" and "raw_dataset_path" in params:
         raw_path = (project_root / params["raw_dataset_path"]).expanduser()
-        if not raw_path.exists():
+        # Admite también un glob (varios ficheros raw)
+        if not raw_path.exists() and not glob.glob(str(raw_path), recursive=True):
             raise ValueError(
                 f"raw_dataset_path apunta a un fichero inexistente: {raw_path}"
             )
@@ -0,0 +1,68 @@
+# mlops4ofp/tools/parquet_parts.py
+"""
+Datasets de fase como fichero base + partes añadidas (modo --append).
+
+  <phase>_dataset.parquet                 ← ejecución completa
+  <phase>_dataset.parts/part-00001.parquet ← filas añadidas después
+  <phase>_dataset.parts/part-00002.parquet
+  ...
+
+Todas las partes comparten el esquema del fichero base. Los lectores de
+fases hijas usan read_dataset_table() para ver el dataset completo; con
+filters (p.ej. segs > último procesado) pyarrow poda row groups y partes
+por estadísticas, de modo que leer solo lo nuevo no cuesta leer todo.
+"""
+
+import shutil
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def parts_dir(dataset_path: Path) -> Path:
+    dataset_path = Path(dataset_path)
+    return dataset_path.with_name(dataset_path.stem + ".parts")
+
+
+def dataset_files(dataset_path: Path) -> list:
+    """Fichero base + partes en orden de adición."""
+    dataset_path = Path(dataset_path)
+    return [dataset_path] + sorted(parts_dir(dataset_path).glob("part-*.parquet"))
+
+
+def next_part_path(dataset_path: Path) -> Path:
+    d = parts_dir(dataset_path)
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"part-{len(list(d.glob('part-*.parquet'))) + 1:05d}.parquet"
+
+
+def clear_parts(dataset_path: Path) -> None:
+    """Una ejecución completa reescribe el base: las partes dejan de valer."""
+    d = parts_dir(dataset_path)
+    if d.exists():
+        shutil.rmtree(d)
+
+
+def read_dataset_table(dataset_path: Path, columns=None, filters=None) -> pa.Table:
+    """Base + partes como una sola tabla (esquema del fichero base)."""
+    files = dataset_files(dataset_path)
+    schema = pq.read_schema(files[0])
+    if columns is not None:
+        schema = pa.schema([schema.field(c) for c in columns])
+    tables = [
+        pq.read_table(f, columns=columns, filters=filters).cast(schema)
+        for f in files
+    ]
+    return pa.concat_tables(tables)
+
+
+def write_part(table: pa.Table, dataset_path: Path, **writer_options) -> Path:
+    """Escribe table como nueva parte, con el esquema del fichero base."""
+    schema = pq.read_schema(dataset_path)
+    table = table.select(schema.names).cast(schema)
+    path = next_part_path(dataset_path)
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp, **writer_options)
+    tmp.replace(path)
+    return path
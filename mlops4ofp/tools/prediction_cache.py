@@ -0,0 +1,172 @@
+# mlops4ofp/tools/prediction_cache.py
+"""
+Caché LRU de predicciones para el servidor de inferencia (F07).
+
+La clave es (model_id, hash de 64 bits de la fila ya vectorizada), de modo
+que dos ventanas con la misma entrada al modelo comparten entrada aunque
+difieran en el orden de eventos (dense_bow). model_id incluye el hash del
+modelo serializado: si el modelo cambia, las entradas antiguas no se usan.
+
+Se guarda la probabilidad (no la clase), así el umbral sigue aplicándose
+fuera de la caché. Opcionalmente se persiste a disco (.npz) entre
+ejecuciones. Con varios workers (gunicorn) cada proceso guarda al salir:
+save() fusiona, bajo un lock de fichero, lo que ya hay en disco con sus
+entradas, de modo que ningún worker pisa las de otro.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin gunicorn, un único proceso
+    fcntl = None
+
+
+def hash_rows(X: np.ndarray) -> np.ndarray:
+    """blake2b de 64 bits por fila de X (uint64)."""
+    X = np.ascontiguousarray(X)
+    n = len(X)
+    if n == 0:
+        return np.zeros(0, dtype=np.uint64)
+    step = X.nbytes // n
+    buf = memoryview(X.reshape(n, -1)).cast("B")
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(buf[i * step:(i + 1) * step], digest_size=8).digest(), "little")
+            for i in range(n)
+        ),
+        dtype=np.uint64,
+        count=n,
+    )
+
+
+class PredictionCache:
+    """
+    LRU acotada a max_entries. Segura entre hilos (un lock global; las
+    operaciones son por lote, no por ventana).
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = int(max_entries)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def lookup(self, model_id: str, keys: np.ndarray):
+        """
+        Devuelve (probs float32 con NaN en los fallos, máscara de aciertos).
+        """
+        probs = np.full(len(keys), np.nan, dtype=np.float32)
+        hit = np.zeros(len(keys), dtype=bool)
+        with self._lock:
+            for i, k in enumerate(keys.tolist()):
+                v = self._data.get((model_id, k))
+                if v is not None:
+                    self._data.move_to_end((model_id, k))
+                    probs[i] = v
+                    hit[i] = True
+            n_hit = int(hit.sum())
+            self._hits += n_hit
+            self._misses += len(keys) - n_hit
+        return probs, hit
+
+    def store(self, model_id: str, keys: np.ndarray, probs: np.ndarray) -> None:
+        with self._lock:
+            for k, v in zip(keys.tolist(), np.asarray(probs, dtype=np.float32).tolist()):
+                self._data[(model_id, k)] = v
+                self._data.move_to_end((model_id, k))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "max_entries": self.max_entries,
+                "entries": len(self._data),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / total if total else None,
+                "evictions": self._evictions,
+            }
+
+    # --------------------------------------------------------
+    # Persistencia
+    # --------------------------------------------------------
+
+    @staticmethod
+    @contextmanager
+    def _file_lock(path: Path):
+        """Lock exclusivo entre procesos sobre <path>.lock (POSIX)."""
+        if fcntl is None:
+            yield
+            return
+        with open(path.with_name(path.name + ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read(path: Path) -> list:
+        """[((model_id, key), prob)] de path en orden LRU ([] si no existe)."""
+        if not path.exists():
+            return []
+        with np.load(path) as data:
+            return list(zip(
+                zip(data["model_ids"].tolist(), data["keys"].tolist()),
+                data["probs"].tolist(),
+            ))
+
+    def save(self, path: Path) -> None:
+        """
+        Fusiona con lo que haya en disco (p.ej. guardado por otro worker) y
+        escribe. Las entradas propias quedan como las más recientes. El
+        temporal es por proceso y el lock serializa leer-fusionar-escribir.
+        """
+        path = Path(path)
+        with self._lock:
+            items = list(self._data.items())
+
+        with self._file_lock(path):
+            merged = OrderedDict(self._read(path))
+            for key, v in items:
+                merged[key] = v
+                merged.move_to_end(key)
+            while len(merged) > self.max_entries:
+                merged.popitem(last=False)
+
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+            np.savez(
+                tmp,
+                model_ids=np.array([m for (m, _) in merged], dtype=str),
+                keys=np.array([k for (_, k) in merged], dtype=np.uint64),
+                probs=np.array(list(merged.values()), dtype=np.float32),
+            )
+            os.replace(tmp, path)
+
+    def load(self, path: Path) -> int:
+        """Añade las entradas de path (orden LRU conservado). Devuelve cuántas."""
+        path = Path(path)
+        with self._file_lock(path):
+            items = self._read(path)
+        with self._lock:
+            for key, v in items:
+                self._data[key] = v
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return len(items)
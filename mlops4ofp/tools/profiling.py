@@ -0,0 +1,141 @@
+# mlops4ofp/tools/profiling.py
+"""
+Perfilado ligero de las fases: tiempo de pared, CPU y pico de RSS por
+etapa (load, transform, write, report...).
+
+    prof = PhaseProfiler(PHASE)
+
+    with prof.stage("load"):
+        ...
+
+    @prof.stage("report")
+    def build_report(...):
+        ...
+
+    prof.begin("transform")   # scripts sin main() (p.ej. F02): la etapa
+    ...                       # dura hasta el siguiente begin() / end()
+
+    prof.write(metadata_path) # bloque "profile" en <phase>_metadata.json
+
+Las etapas no se anidan: abrir una cierra la anterior. Si una etapa se
+repite, se acumulan tiempo y llamadas.
+
+Con MLOPS4OFP_PROFILE=cprofile se activa además cProfile durante las
+etapas y se vuelca <phase>_profile.prof (formato pstats: snakeviz,
+gprof2dot, python -m pstats). Para un perfil muestreado sin
+instrumentar, py-spy se lanza desde fuera:
+    py-spy record -f speedscope -o perfil.json -- python scripts/0N_*.py ...
+"""
+
+import cProfile
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter, process_time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = "MLOPS4OFP_PROFILE"
+
+
+def peak_rss_mb() -> float | None:
+    """Pico de memoria residente del proceso hasta ahora (MB)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB; macOS: bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class PhaseProfiler:
+    def __init__(self, phase: str, cprofile: bool | None = None):
+        if cprofile is None:
+            cprofile = os.environ.get(PROFILE_ENV, "").lower() == "cprofile"
+        self.phase = phase
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._t0 = perf_counter()
+        self._stages = {}
+        self._current = None
+
+    # --------------------------------------------------------
+    # Etapas
+    # --------------------------------------------------------
+
+    def begin(self, name: str) -> None:
+        self.end()
+        self._current = (name, perf_counter(), process_time())
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def end(self) -> None:
+        if self._current is None:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        name, t0, c0 = self._current
+        self._current = None
+
+        s = self._stages.setdefault(name, {"seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+        s["seconds"] += perf_counter() - t0
+        s["cpu_seconds"] += process_time() - c0
+        s["calls"] += 1
+        s["peak_rss_mb"] = peak_rss_mb()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager (y decorador) que mide una etapa."""
+        self.begin(name)
+        try:
+            yield self
+        finally:
+            self.end()
+
+    # --------------------------------------------------------
+    # Resultados
+    # --------------------------------------------------------
+
+    def summary(self) -> dict:
+        self.end()
+        rss = peak_rss_mb()
+        return {
+            "total_seconds": round(perf_counter() - self._t0, 3),
+            "peak_rss_mb": round(rss, 1) if rss is not None else None,
+            "stages": {
+                name: {
+                    "seconds": round(s["seconds"], 3),
+                    "cpu_seconds": round(s["cpu_seconds"], 3),
+                    "calls": s["calls"],
+                    "peak_rss_mb": round(s["peak_rss_mb"], 1) if s["peak_rss_mb"] is not None else None,
+                }
+                for name, s in self._stages.items()
+            },
+        }
+
+    def write(self, metadata_path: Path) -> dict:
+        """
+        Añade el bloque "profile" a <phase>_metadata.json (que ya debe
+        existir) y, con cProfile activo, vuelca <phase>_profile.prof al lado.
+        """
+        metadata_path = Path(metadata_path)
+        profile = self.summary()
+
+        if self._cprofile is not None:
+            prof_path = metadata_path.with_name(f"{self.phase}_profile.prof")
+            self._cprofile.dump_stats(prof_path)
+            profile["cprofile"] = str(prof_path)
+
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+        metadata["profile"] = profile
+        tmp = metadata_path.with_name(metadata_path.name + ".tmp")
+        tmp.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        os.replace(tmp, metadata_path)
+
+        stages = ", ".join(f"{n}={s['seconds']:.2f}s" for n, s in profile["stages"].items())
+        rss = f", pico RSS {profile['peak_rss_mb']:.0f} MB" if profile["peak_rss_mb"] is not None else ""
+        print(f"[INFO] Perfil {self.phase}: {profile['total_seconds']:.2f}s ({stages}){rss}")
+        return profile
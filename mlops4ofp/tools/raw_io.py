@@ -0,0 +1,617 @@
+# mlops4ofp/tools/raw_io.py
+"""
+Lectura y registro del dataset raw (F01).
+
+first_line / max_lines y la lista de columnas se aplican durante la
+lectura, no después:
+  - CSV     → pyarrow.csv.open_csv en streaming: las filas anteriores a
+              first_line se saltan sin convertir y se deja de leer al
+              alcanzar max_lines.
+  - Parquet → solo se leen los row groups que solapan el tramo, y solo
+              las columnas pedidas.
+
+Así memoria y tiempo dependen del tramo, no del tamaño del fichero.
+stream_raw_slice entrega el tramo lote a lote (F01 limpia y escribe cada
+lote sin materializar la tabla).
+
+El raw no se copia a data/01-raw/: se registra por contenido (sha256 con
+caché por size+mtime) y se enlaza (hardlink → reflink → symlink).
+Opcionalmente se convierte una sola vez a un parquet canónico, reutilizado
+por todas las variantes F01 del mismo raw.
+
+raw_dataset_path puede ser también un directorio o un glob (un fichero por
+día y planta): se lee como pyarrow.dataset, con los ficheros escaneados en
+paralelo, y las filas se unen por tiempo con un merge k-way de ficheros ya
+ordenados en lugar de concatenar y ordenar.
+"""
+
+import csv
+import glob
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from mlops4ofp.tools.artifact_store import HashCache, link_or_copy
+
+CSV_BLOCK_SIZE = 16 << 20      # bytes por bloque de open_csv
+CANONICAL_ROW_GROUP = 131_072  # filas por row group del parquet canónico
+FRAGMENT_READAHEAD = 8         # ficheros leídos en paralelo (entrada múltiple)
+
+GLOB_CHARS = "*?["
+RAW_SUFFIXES = (".csv", ".parquet")
+
+CSV_COLUMN_ERROR_RE = re.compile(r"CSV column #(\d+)")
+
+TIME_KEYWORDS = ("time", "timestamp", "fecha", "date")
+
+
+def detect_time_column(columns) -> str | None:
+    """Columna temporal de F01: 'Timestamp' o la primera que lo parezca."""
+    columns = list(columns)
+    if "Timestamp" in columns:
+        return "Timestamp"
+    for c in columns:
+        if any(k in c.lower() for k in TIME_KEYWORDS):
+            return c
+    return None
+
+
+def segs_from_time(values) -> np.ndarray:
+    """Columna temporal (texto o datetime) → segundos desde 1970 (eje segs)."""
+    ts = pd.to_datetime(pd.Series(values))
+    return ((ts - pd.Timestamp("1970-01-01")) // pd.Timedelta("1s")).to_numpy()
+
+
+def _slice_bounds(first_line, max_lines):
+    """first_line es 1-based (como en params.yaml). Devuelve (start, stop|None)."""
+    start = max(int(first_line or 1) - 1, 0)
+    stop = start + int(max_lines) if max_lines is not None else None
+    return start, stop
+
+
+def _select_columns(names: list, columns) -> list | None:
+    """
+    Allow-list en el orden del fichero. La columna temporal (y 'segs') se
+    conserva siempre: F01 la necesita para construir el eje de tiempo.
+    """
+    if not columns:
+        return None
+    missing = [c for c in columns if c not in names]
+    if missing:
+        raise ValueError(f"Columnas inexistentes en el dataset raw: {missing}")
+    keep = set(columns)
+    time_col = detect_time_column(names)
+    if time_col:
+        keep.add(time_col)
+    if "segs" in names:
+        keep.add("segs")
+    return [c for c in names if c in keep]
+
+
+# ============================================================
+# CSV
+# ============================================================
+
+def _csv_header(path: Path) -> list:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f))
+
+
+def _open_csv(path, start, include, column_types, block_size):
+    return pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=block_size, skip_rows_after_names=start),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=include or [],
+            column_types=column_types,
+        ),
+    )
+
+
+def _failed_int_column(error, names: list, include, column_types: dict) -> str | None:
+    """
+    Columna que open_csv no pudo convertir a entero ("CSV column #i").
+    El índice es la posición en el fichero (cabecera completa), no en
+    include_columns.
+    """
+    m = CSV_COLUMN_ERROR_RE.search(str(error))
+    if not m or "int" not in str(error):
+        return None
+    i = int(m.group(1))
+    if i >= len(names):
+        return None
+    name = names[i]
+    if include is not None and name not in include:
+        return None
+    return None if name in column_types else name
+
+
+def _csv_pass(path: Path, consume, start: int = 0, include=None,
+              block_size: int = CSV_BLOCK_SIZE):
+    """
+    Devuelve consume(reader) sobre open_csv.
+
+    La columna temporal se lee como texto (se parsea luego con
+    pd.to_datetime, igual que antes). open_csv infiere los tipos con el
+    primer bloque; si un bloque posterior no encaja (p.ej. entero → real),
+    se repite la pasada con esa columna como float64.
+    """
+    names = _csv_header(path)
+    column_types = {}
+    time_col = detect_time_column(names)
+    if time_col:
+        column_types[time_col] = pa.string()
+
+    while True:
+        try:
+            return consume(_open_csv(path, start, include, column_types, block_size))
+        except pa.ArrowInvalid as e:
+            name = _failed_int_column(e, names, include, column_types)
+            if name is None:
+                raise
+            print(f"[WARN] Tipos inconsistentes entre bloques CSV; releyendo '{name}' como float64")
+            column_types[name] = pa.float64()
+
+
+def _limit_batches(batches, n_rows):
+    """Deja pasar lotes hasta sumar n_rows filas (None = todos)."""
+    n = 0
+    for batch in batches:
+        if n_rows is not None and n + batch.num_rows >= n_rows:
+            yield batch.slice(0, n_rows - n)
+            return
+        n += batch.num_rows
+        yield batch
+
+
+def read_csv_slice(path: Path, first_line=None, max_lines=None, columns=None,
+                   block_size: int = CSV_BLOCK_SIZE):
+    """CSV → pa.Table con las filas [first_line, first_line + max_lines)."""
+    path = Path(path)
+    include = _select_columns(_csv_header(path), columns)
+    start, stop = _slice_bounds(first_line, max_lines)
+    n_rows = stop - start if stop is not None else None
+
+    def consume(reader):
+        batches = list(_limit_batches(reader, n_rows))
+        return pa.Table.from_batches(batches, schema=reader.schema), len(batches)
+
+    table, blocks = _csv_pass(path, consume, start, include, block_size)
+
+    info = {
+        "format": "csv",
+        "first_row": start,
+        "rows_read": table.num_rows,
+        "columns_read": table.num_columns,
+        "blocks_read": blocks,
+    }
+    return table, info
+
+
+def csv_to_parquet(csv_path: Path, parquet_path: Path,
+                   row_group_size: int = CANONICAL_ROW_GROUP,
+                   compression: str = "zstd") -> int:
+    """
+    CSV → parquet tipado y comprimido, bloque a bloque (sin cargar el CSV).
+    Row groups pequeños para que las lecturas por tramo puedan podar.
+    Devuelve el número de filas.
+    """
+    parquet_path = Path(parquet_path)
+    tmp = parquet_path.with_name(parquet_path.name + ".tmp")
+
+    def consume(reader):
+        n = 0
+        with pq.ParquetWriter(tmp, reader.schema, compression=compression) as writer:
+            for batch in reader:
+                writer.write_batch(batch, row_group_size=row_group_size)
+                n += batch.num_rows
+        return n
+
+    try:
+        n_rows = _csv_pass(Path(csv_path), consume)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, parquet_path)
+    return n_rows
+
+
+# ============================================================
+# Parquet
+# ============================================================
+
+def read_parquet_slice(path: Path, first_line=None, max_lines=None, columns=None):
+    """
+    Parquet → pa.Table del tramo, leyendo solo los row groups que lo
+    solapan (según los metadatos) y solo las columnas pedidas.
+    """
+    pf = pq.ParquetFile(path)
+    names = pf.schema_arrow.names
+    include = _select_columns(names, columns)
+    start, stop = _slice_bounds(first_line, max_lines)
+    total = pf.metadata.num_rows
+    stop = total if stop is None else min(stop, total)
+
+    groups = []
+    group_start = None
+    offset = 0
+    for i in range(pf.metadata.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if offset < stop and offset + n > start:
+            if group_start is None:
+                group_start = offset
+            groups.append(i)
+        offset += n
+
+    if groups:
+        table = pf.read_row_groups(groups, columns=include)
+        table = table.slice(start - group_start, stop - start)
+    else:
+        table = pf.schema_arrow.empty_table()
+        if include is not None:
+            table = table.select(include)
+
+    info = {
+        "format": "parquet",
+        "first_row": start,
+        "rows_read": table.num_rows,
+        "columns_read": table.num_columns,
+        "row_groups_read": len(groups),
+        "row_groups_total": pf.metadata.num_row_groups,
+    }
+    return table, info
+
+
+def read_raw_slice(path: Path, first_line=None, max_lines=None, columns=None):
+    """Despacha por extensión. Devuelve (pa.Table, info de lectura)."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        return read_csv_slice(path, first_line, max_lines, columns)
+    return read_parquet_slice(path, first_line, max_lines, columns)
+
+
+# ============================================================
+# Streaming (lote a lote)
+# ============================================================
+
+def _parquet_slice_batches(pf, first_line, max_lines, include):
+    """Lotes del tramo leyendo solo los row groups que lo solapan."""
+    start, stop = _slice_bounds(first_line, max_lines)
+    total = pf.metadata.num_rows
+    stop = total if stop is None else min(stop, total)
+
+    groups = []
+    offset = 0
+    group_start = None
+    for i in range(pf.metadata.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if offset < stop and offset + n > start:
+            if group_start is None:
+                group_start = offset
+            groups.append(i)
+        offset += n
+
+    info = {"row_groups_read": len(groups), "row_groups_total": pf.metadata.num_row_groups}
+    if not groups:
+        return iter(()), info
+
+    def batches():
+        offset = group_start
+        for batch in pf.iter_batches(row_groups=groups, columns=include):
+            a = max(start - offset, 0)
+            b = min(stop - offset, batch.num_rows)
+            offset += batch.num_rows
+            if b > a:
+                yield batch.slice(a, b - a)
+            if offset >= stop:
+                return
+
+    return batches(), info
+
+
+def stream_raw_slice(path: Path, consume, first_line=None, max_lines=None, columns=None,
+                     block_size: int = CSV_BLOCK_SIZE):
+    """
+    Como read_raw_slice pero sin materializar la tabla: llama a
+    consume(schema, lotes) con un iterador de pa.RecordBatch del tramo y
+    devuelve (resultado de consume, info de lectura).
+
+    En CSV consume puede llamarse más de una vez: si un bloque posterior no
+    encaja con el tipo inferido (entero → real) se repite la pasada con esa
+    columna como float64. consume no debe conservar estado entre llamadas.
+    """
+    path = Path(path)
+    start, stop = _slice_bounds(first_line, max_lines)
+    info = {"format": "csv" if path.suffix.lower() == ".csv" else "parquet", "first_row": start}
+    counted = {}
+
+    def counting(batches):
+        counted.update(rows=0, blocks=0)
+        for batch in batches:
+            counted["rows"] += batch.num_rows
+            counted["blocks"] += 1
+            yield batch
+
+    if info["format"] == "csv":
+        include = _select_columns(_csv_header(path), columns)
+        n_rows = stop - start if stop is not None else None
+
+        def run(reader):
+            return consume(reader.schema, counting(_limit_batches(reader, n_rows)))
+
+        result = _csv_pass(path, run, start, include, block_size)
+        schema_names = include or _csv_header(path)
+        info["blocks_read"] = counted.get("blocks", 0)
+    else:
+        pf = pq.ParquetFile(path)
+        include = _select_columns(pf.schema_arrow.names, columns)
+        schema = pf.schema_arrow if include is None else pa.schema(
+            [pf.schema_arrow.field(c) for c in include]
+        )
+        batches, pinfo = _parquet_slice_batches(pf, first_line, max_lines, include)
+        result = consume(schema, counting(batches))
+        schema_names = schema.names
+        info.update(pinfo)
+
+    info["rows_read"] = counted.get("rows", 0)
+    info["columns_read"] = len(schema_names)
+    return result, info
+
+
+# ============================================================
+# Varias entradas (directorio o glob)
+# ============================================================
+
+def is_multi_raw(path) -> bool:
+    return any(c in str(path) for c in GLOB_CHARS) or Path(path).is_dir()
+
+
+def expand_raw_inputs(path) -> list:
+    """
+    raw_dataset_path → lista ordenada de ficheros: el propio fichero, todos
+    los .csv/.parquet bajo un directorio (recursivo) o los que casan con un
+    glob (admite **).
+    """
+    if not is_multi_raw(path):
+        return [Path(path)]
+    if Path(path).is_dir():
+        files = [p for p in Path(path).rglob("*") if p.suffix.lower() in RAW_SUFFIXES]
+    else:
+        files = [Path(p) for p in glob.glob(str(path), recursive=True)]
+    files = sorted(p for p in files if p.is_file())
+    if not files:
+        raise FileNotFoundError(f"raw_dataset_path no contiene ficheros raw: {path}")
+    return files
+
+
+def _raw_format(paths: list) -> str:
+    suffixes = {p.suffix.lower() for p in paths}
+    if len(suffixes) != 1 or not suffixes <= set(RAW_SUFFIXES):
+        raise ValueError(
+            f"Las entradas raw deben ser todas .csv o todas .parquet (hay {sorted(suffixes)})"
+        )
+    return suffixes.pop().lstrip(".")
+
+
+def _merge_two(a, b):
+    """Merge de dos tramos ordenados (claves, índices); estable: a antes que b."""
+    (ka, ia), (kb, ib) = a, b
+    pos_b = np.searchsorted(ka, kb, side="right") + np.arange(len(kb))
+    from_b = np.zeros(len(ka) + len(kb), dtype=bool)
+    from_b[pos_b] = True
+    keys = np.empty(len(from_b), dtype=np.result_type(ka, kb))
+    idx = np.empty(len(from_b), dtype=np.int64)
+    keys[from_b], keys[~from_b] = kb, ka
+    idx[from_b], idx[~from_b] = ib, ia
+    return keys, idx
+
+
+def merge_sorted_runs(keys: list) -> np.ndarray:
+    """
+    Merge k-way (por parejas, log2(k) niveles lineales) de k tramos ya
+    ordenados. Devuelve la permutación de las filas concatenadas; a igualdad
+    de clave se respeta el orden de los tramos.
+    """
+    runs = []
+    offset = 0
+    for k in keys:
+        runs.append((np.asarray(k), np.arange(offset, offset + len(k))))
+        offset += len(k)
+    if not runs:
+        return np.zeros(0, dtype=np.int64)
+    while len(runs) > 1:
+        merged = [_merge_two(runs[i], runs[i + 1]) for i in range(0, len(runs) - 1, 2)]
+        if len(runs) % 2:
+            merged.append(runs[-1])
+        runs = merged
+    return runs[0][1]
+
+
+def _dataset_format(fmt: str, time_col):
+    if fmt == "parquet":
+        return ds.ParquetFileFormat()
+    return ds.CsvFileFormat(
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(
+            column_types={time_col: pa.string()} if time_col else {}
+        ),
+    )
+
+
+def _scan_by_file(paths: list, schema: pa.Schema, file_format, include) -> list:
+    """Escanea todos los ficheros en paralelo; devuelve una tabla por fichero."""
+    dataset = ds.dataset([str(p) for p in paths], schema=schema, format=file_format)
+    scanner = dataset.scanner(
+        columns=include, use_threads=True, fragment_readahead=FRAGMENT_READAHEAD
+    )
+    batches = {str(p): [] for p in paths}
+    for tagged in scanner.scan_batches():
+        batches[tagged.fragment.path].append(tagged.record_batch)
+    return [
+        pa.Table.from_batches(batches[str(p)], schema=scanner.projected_schema)
+        for p in paths
+    ]
+
+
+def read_raw_inputs(paths: list, first_line=None, max_lines=None, columns=None):
+    """
+    Varios ficheros raw → (pa.Table ordenada por tiempo, segs | None, info).
+
+    Los esquemas se unifican (un entero en un fichero y real en otro pasa
+    a real; columnas ausentes quedan a null). Si cada fichero está
+    ordenado por tiempo:
+      - sin solape entre ficheros → concatenación en orden de tiempo
+      - con solape                → merge k-way de los ficheros
+    Si alguno no lo está se concatenan y prepare_time_axis ordena.
+    first_line / max_lines se aplican sobre el resultado unido.
+    """
+    paths = [Path(p) for p in paths]
+    fmt = _raw_format(paths)
+    headers = (
+        [_csv_header(p) for p in paths] if fmt == "csv"
+        else [pq.read_schema(p).names for p in paths]
+    )
+    time_col = detect_time_column(headers[0])
+    file_format = _dataset_format(fmt, time_col)
+    schema = pa.unify_schemas(
+        [ds.dataset(str(p), format=file_format).schema for p in paths],
+        promote_options="permissive",
+    )
+    include = _select_columns(schema.names, columns)
+
+    while True:
+        try:
+            tables = _scan_by_file(paths, schema, file_format, include)
+            break
+        except pa.ArrowInvalid as e:
+            # Igual que _csv_pass: entero inferido que luego no encaja.
+            # El índice es del fichero que falló, que el error no indica.
+            m = CSV_COLUMN_ERROR_RE.search(str(e))
+            if fmt != "csv" or not m or "int" not in str(e):
+                raise
+            i = int(m.group(1))
+            names = {h[i] for h in headers if i < len(h)}
+            names = [n for n in names if pa.types.is_integer(schema.field(n).type)]
+            if not names:
+                raise
+            print(f"[WARN] Tipos inconsistentes entre bloques CSV; releyendo {names} como float64")
+            for n in names:
+                schema = schema.set(schema.get_field_index(n), pa.field(n, pa.float64()))
+
+    key_col = time_col or ("segs" if "segs" in schema.names else None)
+    keys = []
+    for t in tables:
+        if key_col is None:
+            break
+        values = t[key_col].to_numpy() if key_col == "segs" else segs_from_time(t[key_col].to_pandas())
+        keys.append(values)
+
+    if keys and all(len(k) == 0 or np.all(np.diff(k) >= 0) for k in keys):
+        order = sorted((i for i in range(len(tables)) if len(keys[i])), key=lambda i: keys[i][0])
+        if order:
+            tables = [tables[i] for i in order]
+            keys = [keys[i] for i in order]
+        disjoint = not order or all(keys[i][-1] <= keys[i + 1][0] for i in range(len(keys) - 1))
+        table = pa.concat_tables(tables)
+        segs = np.concatenate(keys)
+        if disjoint:
+            merge = "concat"
+        else:
+            perm = merge_sorted_runs(keys)
+            table, segs = table.take(perm), segs[perm]
+            merge = "kway"
+    else:
+        print("[WARN] Entradas raw sin orden temporal: se concatenan y se ordena después")
+        table = pa.concat_tables(tables)
+        segs = None
+        merge = "unsorted"
+
+    start, stop = _slice_bounds(first_line, max_lines)
+    stop = table.num_rows if stop is None else min(stop, table.num_rows)
+    start = min(start, table.num_rows)
+    table = table.slice(start, stop - start)
+    if segs is not None:
+        segs = segs[start:stop]
+
+    info = {
+        "format": fmt,
+        "files": len(paths),
+        "merge": merge,
+        "first_row": start,
+        "rows_read": table.num_rows,
+        "columns_read": table.num_columns,
+    }
+    return table, segs, info
+
+
+# ============================================================
+# Registro del raw (sin copia)
+# ============================================================
+
+def register_raw(src: Path, dst: Path, hashes: HashCache, link: str = "auto") -> dict:
+    """
+    Deja en dst el raw src sin duplicar datos.
+
+    link = "auto" → hardlink, reflink o symlink (lo que admita el
+    filesystem); "copy" → copia física (comportamiento anterior).
+    Si dst ya existe con el mismo contenido se conserva tal cual.
+    """
+    src, dst = Path(src).resolve(), Path(dst)
+    digest = hashes.sha256(src)
+
+    if dst.exists():
+        if dst.is_symlink() and os.path.samefile(src, dst):
+            mode = "symlink"
+        elif os.path.samefile(src, dst):
+            mode = "hardlink"
+        elif hashes.sha256(dst) == digest:
+            mode = "existing"
+        else:
+            mode = None
+        if mode:
+            return {"source": str(src), "path": str(dst), "sha256": digest, "link": mode}
+
+    if link == "copy":
+        mode = link_or_copy(src, dst, allow_hardlink=False)
+    else:
+        mode = link_or_copy(src, dst, fallback="symlink")
+    return {"source": str(src), "path": str(dst), "sha256": digest, "link": mode}
+
+
+def register_raw_inputs(paths: list, inputs_dir: Path, hashes: HashCache,
+                        link: str = "auto") -> list:
+    """
+    Registra cada entrada bajo inputs_dir/<sha256[:16]><ext>: el nombre es
+    el contenido, así que ficheros repetidos entre variantes (o entre
+    globs que se solapan) se enlazan una sola vez.
+    """
+    inputs_dir = Path(inputs_dir)
+    inputs_dir.mkdir(parents=True, exist_ok=True)
+    out = []
+    for p in paths:
+        digest = hashes.sha256(Path(p).resolve())
+        out.append(register_raw(p, inputs_dir / f"{digest[:16]}{Path(p).suffix.lower()}", hashes, link))
+    return out
+
+
+def canonical_parquet(raw_path: Path, digest: str, canonical_dir: Path) -> tuple:
+    """
+    Parquet canónico de un raw CSV, identificado por su sha256: se genera
+    la primera vez y las siguientes variantes lo reutilizan.
+    Devuelve (path, reutilizado).
+    """
+    canonical_dir = Path(canonical_dir)
+    canonical_dir.mkdir(parents=True, exist_ok=True)
+    path = canonical_dir / f"{digest[:16]}.parquet"
+    if path.exists():
+        return path, True
+    n_rows = csv_to_parquet(raw_path, path)
+    print(f"[OK] Parquet canónico generado ({n_rows} filas): {path}")
+    return path, False
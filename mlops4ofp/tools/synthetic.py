@@ -0,0 +1,122 @@
+# mlops4ofp/tools/synthetic.py
+"""
+Generador determinista de series sintéticas tipo BEMS (raw de F01).
+
+Misma semilla y mismos parámetros → mismo fichero, byte a byte. Sirve
+para benchmarks y pruebas de extremo a extremo sin datos reales:
+
+    df = make_bems_frame(rows=200_000, measures=8, nan_rate=0.01,
+                         gap_rate=0.001, tu=1, seed=42)
+    write_bems_raw("raw.csv", rows=200_000)
+
+  Timestamp  → "YYYY-MM-DD HH:MM:SS", paso tu segundos; con probabilidad
+               gap_rate por fila se salta un hueco de 1..max_gap muestras
+  medidas    → paseos aleatorios (potencias, tensiones, temperaturas) y
+               consignas escalonadas, redondeadas a 1-2 decimales
+  NaN        → codificados como NAN_CODE (-999999.0), como en el BEMS
+               real; F01 los convierte con cleaning_strategy=basic
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+NAN_CODE = -999999.0
+MAX_GAP = 60  # muestras máximas perdidas por hueco
+
+BEMS_MEASURES = [
+    "Battery_Active_Power",
+    "Battery_Active_Power_Set_Response",
+    "PVPCS_Active_Power",
+    "GE_Body_Active_Power",
+    "GE_Active_Power",
+    "FC_Active_Power",
+    "FC_Active_Power_FC_end_Set_Response",
+    "MG-LV-MSB_AC_Voltage",
+    "MG-LV-MSB_Frequency",
+    "Inlet_Temperature_of_Chilled_Water",
+    "Outlet_Temperature",
+    "Receiving_Point_AC_Voltage",
+]
+
+
+def measure_names(measures: int) -> list:
+    """Nombres BEMS reales y, a partir del duodécimo, Measure_NN."""
+    names = BEMS_MEASURES[:measures]
+    names += [f"Measure_{j:02d}" for j in range(len(names), measures)]
+    return names
+
+
+def make_time_axis(rows: int, tu: int, gap_rate: float, rng, start: str) -> np.ndarray:
+    """Instantes datetime64[s] a paso tu con huecos aleatorios."""
+    step = np.full(rows, int(tu), dtype=np.int64)
+    step[0] = 0
+    if gap_rate > 0:
+        gaps = rng.random(rows) < gap_rate
+        gaps[0] = False
+        step[gaps] += int(tu) * rng.integers(1, MAX_GAP + 1, int(gaps.sum()))
+    return np.datetime64(pd.Timestamp(start), "s") + np.cumsum(step).astype("timedelta64[s]")
+
+
+def make_measure(j: int, rows: int, rng) -> np.ndarray:
+    """Medida j: paseo aleatorio o consigna escalonada (cada tercera)."""
+    if j % 3 == 2:
+        # consigna: niveles constantes que cambian de vez en cuando
+        changes = rng.random(rows) < 0.002
+        levels = rng.choice([-200.0, 0.0, 100.0, 250.0, 400.0], int(changes.sum()) + 1)
+        values = levels[np.cumsum(changes)]
+    else:
+        level = rng.uniform(-500, 500)
+        values = level + np.cumsum(rng.normal(0, 0.5, rows))
+    return np.round(values, 1 + j % 2)
+
+
+def make_bems_frame(
+    rows: int,
+    measures: int = 8,
+    nan_rate: float = 0.01,
+    gap_rate: float = 0.001,
+    tu: int = 1,
+    seed: int = 42,
+    start: str = "2024-01-01",
+) -> pd.DataFrame:
+    """DataFrame raw (Timestamp + medidas) de rows filas."""
+    rng = np.random.default_rng(seed)
+    data = {"Timestamp": make_time_axis(rows, tu, gap_rate, rng, start)}
+    for j, name in enumerate(measure_names(measures)):
+        values = make_measure(j, rows, rng)
+        if nan_rate > 0:
+            values[rng.random(rows) < nan_rate] = NAN_CODE
+        data[name] = values
+    return pd.DataFrame(data)
+
+
+def write_bems_raw(path: Path, rows: int, **kwargs) -> dict:
+    """
+    Escribe el raw sintético en CSV o parquet (según la extensión) y
+    devuelve un resumen con los parámetros de generación.
+    """
+    path = Path(path)
+    df = make_bems_frame(rows, **kwargs)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".parquet":
+        pq.write_table(table, path)
+    else:
+        # pyarrow escribe timestamp[s] como "YYYY-MM-DD HH:MM:SS"
+        pacsv.write_csv(table, path)
+
+    t = df["Timestamp"].to_numpy()
+    return {
+        "path": str(path),
+        "rows": int(rows),
+        "measures": int(df.shape[1] - 1),
+        "tu": int(kwargs.get("tu", 1)),
+        "span_seconds": int((t[-1] - t[0]) / np.timedelta64(1, "s")) if rows else 0,
+        "bytes": path.stat().st_size,
+    }
@@ -0,0 +1,167 @@
+# mlops4ofp/tools/system_bundle.py
+"""
+Bundle de sistema de un solo fichero (F06 → F07).
+
+Contiene, por modelo, el vocabulario, la tabla de lookup de vectorización
+y el modelo serializado (.h5). El índice es binario de tamaño fijo y las
+secciones están alineadas a página, de modo que el lector hace mmap y
+obtiene vistas NumPy sin copiar ni parsear JSON.
+
+Layout:
+  [HEADER 64 B] [ENTRY x n_models] [secciones alineadas a ALIGN ...]
+"""
+
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from mlops4ofp.tools.vectorization import build_lookup, lookup_offset
+
+MAGIC = b"OFPBNDL\0"
+VERSION = 1
+ALIGN = 4096
+
+# magic, version, n_models, entries_offset
+HEADER = struct.Struct("<8sIIQ40x")
+# name, kind, threshold, input_dim, max_len,
+# vocab(off, n), lookup(off, n), model(off, nbytes)
+ENTRY = struct.Struct("<96sB7xdII6Q")
+
+KINDS = {"dense_bow": 0, "sequence": 1}
+KIND_NAMES = {v: k for k, v in KINDS.items()}
+
+
+@dataclass
+class BundleModel:
+    prediction_name: str
+    vectorization: str
+    threshold: float
+    input_dim: int
+    max_len: int
+    vocab: np.ndarray          # int32, vista sobre el mmap
+    lookup: np.ndarray         # int32, vista sobre el mmap
+    model_bytes: memoryview    # .h5 serializado
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+# ============================================================
+# Escritura (F06)
+# ============================================================
+
+def write_bundle(path: Path, models: list) -> dict:
+    """
+    models: lista de dicts con
+      - prediction_name
+      - vectorization  (dict de model_summary.json: vocab, max_len, ...)
+      - threshold
+      - model_path     (.h5)
+
+    Devuelve un resumen {n_models, bytes} para metadata.
+    """
+    path = Path(path)
+    sections = []   # (vocab, lookup, model_bytes)
+    for m in models:
+        vec = m["vectorization"]
+        kind = vec["vectorization"]
+        vocab = np.asarray(vec["vocab"], dtype=np.int32)
+        lookup = build_lookup(vocab, lookup_offset(kind))
+        sections.append((vocab, lookup, Path(m["model_path"]).read_bytes()))
+
+    entries_offset = HEADER.size
+    offset = _align(entries_offset + ENTRY.size * len(models))
+
+    entries = []
+    layout = []
+    for m, (vocab, lookup, model_bytes) in zip(models, sections):
+        vec = m["vectorization"]
+        name = m["prediction_name"].encode("utf-8")
+        if len(name) > 96:
+            raise ValueError(f"prediction_name demasiado largo para el bundle: {m['prediction_name']}")
+
+        vocab_off = offset
+        offset = _align(vocab_off + vocab.nbytes)
+        lookup_off = offset
+        offset = _align(lookup_off + lookup.nbytes)
+        model_off = offset
+        offset = _align(model_off + len(model_bytes))
+
+        entries.append(ENTRY.pack(
+            name,
+            KINDS[vec["vectorization"]],
+            float(m.get("threshold", 0.5)),
+            int(vec.get("input_dim", len(vocab))),
+            int(vec.get("max_len", 0)),
+            vocab_off, len(vocab),
+            lookup_off, len(lookup),
+            model_off, len(model_bytes),
+        ))
+        layout.append((vocab_off, vocab.tobytes()))
+        layout.append((lookup_off, lookup.tobytes()))
+        layout.append((model_off, model_bytes))
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(models), entries_offset))
+        for e in entries:
+            f.write(e)
+        for off, data in layout:
+            f.seek(off)
+            f.write(data)
+        f.truncate(offset)
+    tmp.replace(path)
+
+    return {"path": str(path), "n_models": len(models), "bytes": offset}
+
+
+# ============================================================
+# Lectura (F07)
+# ============================================================
+
+class SystemBundle:
+    """Vista mmap de solo lectura sobre un bundle de sistema."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._f = open(self.path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_models, entries_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Fichero no es un bundle de sistema: {self.path}")
+        if version != VERSION:
+            raise ValueError(f"Versión de bundle no soportada: {version}")
+
+        buf = memoryview(self._mm)
+        self.models = []
+        for i in range(n_models):
+            (name, kind, threshold, input_dim, max_len,
+             vocab_off, vocab_n, lookup_off, lookup_n,
+             model_off, model_n) = ENTRY.unpack_from(self._mm, entries_offset + i * ENTRY.size)
+
+            self.models.append(BundleModel(
+                prediction_name=name.rstrip(b"\0").decode("utf-8"),
+                vectorization=KIND_NAMES[kind],
+                threshold=threshold,
+                input_dim=input_dim,
+                max_len=max_len,
+                vocab=np.frombuffer(self._mm, dtype=np.int32, count=vocab_n, offset=vocab_off),
+                lookup=np.frombuffer(self._mm, dtype=np.int32, count=lookup_n, offset=lookup_off),
+                model_bytes=buf[model_off:model_off + model_n],
+            ))
+
+    def close(self) -> None:
+        self.models = []
+        self._mm.close()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
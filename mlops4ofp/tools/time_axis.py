@@ -0,0 +1,130 @@
+# mlops4ofp/tools/time_axis.py
+"""
+Estadísticos del eje temporal (segs) de F01 en una pasada por bloques.
+
+En lugar de materializar segs_diff como columna (8 bytes por fila) y
+ordenarla para la mediana, se acumula un histograma exacto de las
+diferencias consecutivas. Con muestreo discreto (segundos enteros) hay
+muy pocos valores distintos, así que el histograma es diminuto y de él
+salen Tu (mediana), la moda y el resumen de huecos para cualquier umbral.
+
+compute_time_gaps_from_t_fast (informe F01) reutiliza el histograma: el
+resumen sale de él y solo se recorre t si hay huecos que listar.
+"""
+
+import numpy as np
+
+DIFF_CHUNK_ROWS = 1_000_000  # filas por bloque al recorrer segs
+TOP_DIFFS = 20               # valores del histograma guardados en metadata
+
+
+def iter_diffs(t: np.ndarray, chunk_rows: int = DIFF_CHUNK_ROWS):
+    """
+    Genera (posición inicial, diferencias) por bloques: np.diff(t) sin
+    reservar el vector completo. La posición es la de t[i] en dt[i].
+    """
+    n = len(t)
+    for start in range(0, max(n - 1, 0), chunk_rows):
+        stop = min(start + chunk_rows + 1, n)
+        yield start, np.diff(t[start:stop])
+
+
+class DiffHistogram:
+    """Histograma exacto de t[i+1] - t[i], acumulable por bloques."""
+
+    def __init__(self):
+        self._counts = {}
+        self._last = None
+        self.integer = True
+
+    def update(self, t: np.ndarray) -> "DiffHistogram":
+        """Añade un bloque de t (ordenado); enlaza con el bloque anterior."""
+        t = np.asarray(t)
+        if len(t) == 0:
+            return self
+        if self._last is not None:
+            t = np.concatenate(([self._last], t))
+        self._last = t[-1]
+
+        dt = np.diff(t)
+        if np.issubdtype(dt.dtype, np.floating):
+            dt = dt[~np.isnan(dt)]
+            if self.integer and not np.all(dt == np.rint(dt)):
+                self.integer = False
+            elif self.integer:
+                dt = dt.astype(np.int64)
+        values, counts = np.unique(dt, return_counts=True)
+        for v, c in zip(values.tolist(), counts.tolist()):
+            self._counts[v] = self._counts.get(v, 0) + c
+        return self
+
+    @classmethod
+    def from_array(cls, t: np.ndarray, chunk_rows: int = DIFF_CHUNK_ROWS) -> "DiffHistogram":
+        hist = cls()
+        for start in range(0, len(t), chunk_rows):
+            hist.update(t[start:start + chunk_rows])
+        return hist
+
+    # --------------------------------------------------------
+    # Consultas
+    # --------------------------------------------------------
+
+    def arrays(self):
+        """(valores ordenados, recuentos) como arrays numpy."""
+        values = np.array(sorted(self._counts), dtype=np.int64 if self.integer else np.float64)
+        counts = np.array([self._counts[v] for v in values.tolist()], dtype=np.int64)
+        return values, counts
+
+    @property
+    def n(self) -> int:
+        return int(sum(self._counts.values()))
+
+    def median(self) -> float:
+        """Misma definición que pandas: media de los dos centrales si n es par."""
+        n = self.n
+        if n == 0:
+            return float("nan")
+        values, counts = self.arrays()
+        cum = np.cumsum(counts)
+        lo = values[np.searchsorted(cum, (n - 1) // 2 + 1)]
+        hi = values[np.searchsorted(cum, n // 2 + 1)]
+        return (float(lo) + float(hi)) / 2.0
+
+    def mode(self) -> float:
+        if not self._counts:
+            return float("nan")
+        return float(max(self._counts.items(), key=lambda kv: (kv[1], -kv[0]))[0])
+
+    def gap_summary(self, period: float, threshold_factor: float = 1.0) -> dict:
+        """Resumen de huecos (dt > period * threshold_factor) sin recorrer t."""
+        values, counts = self.arrays()
+        gap = values > period * float(threshold_factor)
+        missing = np.clip(np.rint(values[gap] / period - 1.0).astype(np.int64), 0, None)
+        return {
+            "n_gaps": int(counts[gap].sum()),
+            "missing_samples_total": int((missing * counts[gap]).sum()),
+            "expected_period_seconds": float(period),
+            "max_gap_seconds": float(values[gap].max()) if gap.any() else 0.0,
+        }
+
+    def to_dict(self, period: float | None = None) -> dict:
+        """Resumen serializable para <phase>_metadata.json."""
+        values, counts = self.arrays()
+        out = {
+            "n_diffs": self.n,
+            "integer": self.integer,
+            "median": self.median(),
+            "mode": self.mode(),
+            "min": float(values[0]) if len(values) else None,
+            "max": float(values[-1]) if len(values) else None,
+            "n_duplicates": int(counts[values == 0].sum()),
+            "n_backwards": int(counts[values < 0].sum()),
+            "distinct": int(len(values)),
+            "top": [
+                {"diff": float(values[i]), "count": int(counts[i])}
+                for i in np.argsort(-counts, kind="stable")[:TOP_DIFFS]
+            ],
+        }
+        if period is not None and period > 0:
+            out["gaps"] = self.gap_summary(period)
+        return out
@@ -0,0 +1,153 @@
+# mlops4ofp/tools/vectorization.py
+"""
+Vectorización runtime de ventanas de eventos (F06/F07).
+
+Los códigos de evento son enteros (event_catalog de F02), por lo que el
+vocabulario de cada modelo se compila en una tabla densa id → columna.
+"""
+
+import hashlib
+from itertools import chain
+
+import numpy as np
+
+MISSING = -1
+
+
+def build_lookup(vocab, offset: int = 0) -> np.ndarray:
+    """
+    Tabla densa int32 de tamaño max(vocab)+1.
+    lookup[ev] = posición de ev en vocab + offset, MISSING si no está.
+
+    offset=0 → dense_bow (columna), offset=1 → sequence (0 = padding).
+    """
+    vocab = np.asarray(vocab, dtype=np.int64)
+    size = int(vocab.max()) + 1 if len(vocab) else 1
+    lookup = np.full(size, MISSING, dtype=np.int32)
+    lookup[vocab] = np.arange(len(vocab), dtype=np.int32) + offset
+    return lookup
+
+
+def lookup_offset(kind: str) -> int:
+    if kind == "dense_bow":
+        return 0
+    if kind == "sequence":
+        return 1
+    raise ValueError(f"Vectorization no soportada: {kind}")
+
+
+def flatten_windows(windows):
+    """
+    Aplana una lista de ventanas en (flat, lengths) sin bucles Python por evento.
+    Acepta listas, arrays NumPy o un array de objetos (columna pandas).
+    """
+    n = len(windows)
+    lengths = np.fromiter((len(w) for w in windows), dtype=np.int64, count=n)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64), lengths
+    flat = np.fromiter(chain.from_iterable(windows), dtype=np.int64, count=total)
+    return flat, lengths
+
+
+def hash_windows(flat: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Hash de 64 bits (blake2b) de cada ventana aplanada: misma secuencia de
+    eventos → mismo hash. Sirve de clave entera para deduplicar y cruzar
+    ventanas sin serializarlas a texto.
+    """
+    flat = np.ascontiguousarray(flat, dtype=np.int64)
+    ends = np.cumsum(lengths) * flat.itemsize
+    starts = ends - np.asarray(lengths) * flat.itemsize
+    buf = memoryview(flat).cast("B")
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(buf[a:b], digest_size=8).digest(), "little")
+            for a, b in zip(starts.tolist(), ends.tolist())
+        ),
+        dtype=np.uint64,
+        count=len(lengths),
+    )
+
+
+class CompiledVectorizer:
+    """
+    Vectorizador precompilado de un modelo: la tabla de lookup se construye
+    una sola vez al cargar el modelo y cada petición se resuelve con
+    flatten + lookup + scatter.
+    """
+
+    def __init__(self, kind: str, lookup: np.ndarray, input_dim: int = 0, max_len: int = 0):
+        self.kind = kind
+        self.lookup = np.asarray(lookup, dtype=np.int32)
+        self.input_dim = int(input_dim)
+        self.max_len = int(max_len)
+        lookup_offset(kind)  # valida kind
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CompiledVectorizer":
+        """config = bloque 'vectorization' de model_summary.json (o del bundle)."""
+        kind = config["vectorization"]
+        lookup = config.get("lookup")
+        if lookup is None:
+            lookup = build_lookup(config["vocab"], lookup_offset(kind))
+        return cls(
+            kind,
+            lookup,
+            input_dim=config.get("input_dim", 0),
+            max_len=config.get("max_len", 0),
+        )
+
+    @property
+    def vocab_ids(self) -> np.ndarray:
+        """Inverso de la tabla: código de evento de cada columna (dense_bow)."""
+        if getattr(self, "_vocab_ids", None) is None:
+            ids = np.flatnonzero(self.lookup != MISSING)
+            ids = ids[np.argsort(self.lookup[ids], kind="stable")]
+            self._vocab_ids = ids.astype(np.int64)
+        return self._vocab_ids
+
+    def _map(self, flat: np.ndarray) -> np.ndarray:
+        codes = np.full(len(flat), MISSING, dtype=np.int64)
+        inside = (flat >= 0) & (flat < len(self.lookup))
+        codes[inside] = self.lookup[flat[inside]]
+        return codes
+
+    def __call__(self, windows) -> np.ndarray:
+        flat, lengths = flatten_windows(windows)
+        return self.from_flat(flat, lengths)
+
+    def from_flat(self, flat: np.ndarray, lengths: np.ndarray, counts=None) -> np.ndarray:
+        """
+        counts (opcional, solo dense_bow): repeticiones de cada código de
+        flat. Permite recibir la ventana como bolsa (código, conteo) en
+        vez de como lista de eventos: coste O(códigos distintos).
+        """
+        n = len(lengths)
+        rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+        codes = self._map(flat)
+        keep = codes != MISSING
+        rows, codes = rows[keep], codes[keep]
+
+        if self.kind == "dense_bow":
+            weights = None
+            if counts is not None:
+                weights = np.asarray(counts, dtype=np.float64)[keep]
+            X = np.bincount(
+                rows * self.input_dim + codes,
+                weights=weights,
+                minlength=n * self.input_dim,
+            )
+            return X.reshape(n, self.input_dim).astype(np.float32)
+
+        if counts is not None:
+            raise ValueError("Ventanas como bolsa (counts) solo aplican a dense_bow")
+
+        # sequence: últimos max_len eventos válidos, alineados a la derecha
+        X = np.zeros((n, self.max_len), dtype=np.int32)
+        per_row = np.bincount(rows, minlength=n)
+        ends = np.cumsum(per_row)
+        rank_from_end = ends[rows] - 1 - np.arange(len(rows))
+        sel = rank_from_end < self.max_len
+        X[rows[sel], self.max_len - 1 - rank_from_end[sel]] = codes[sel]
+        return X
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
+import os
 import sys
 import json
-import shutil
+from datetime import datetime
 from pathlib import Path
 
 import yaml
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import matplotlib.pyplot as plt
 
 
@@ -38,35 +42,49 @@ from mlops4ofp.tools.run_context import (
 )
 from mlops4ofp.tools.params_manager import ParamsManager, validate_params
 from mlops4ofp.tools.artifacts import (
+    WRITE_CHUNK_ROWS,
     get_git_hash,
     save_numeric_dataset,
     save_params_and_metadata,
 )
+from mlops4ofp.tools.artifact_store import HashCache
+from mlops4ofp.tools.profiling import PhaseProfiler
+from mlops4ofp.tools.memo import memo_hit, phase_fingerprint, record_fingerprint
+from mlops4ofp.tools.parquet_parts import clear_parts, next_part_path, read_dataset_table
+from mlops4ofp.tools.raw_io import (
+    canonical_parquet,
+    detect_time_column,
+    expand_raw_inputs,
+    is_multi_raw,
+    read_raw_inputs,
+    read_raw_slice,
+    register_raw,
+    register_raw_inputs,
+    segs_from_time,
+    stream_raw_slice,
+)
+from mlops4ofp.tools.time_axis import DiffHistogram
 import mlops4ofp.tools.html_reports.html01 as explore_report
 
 execution_dir = detect_execution_dir()
 PROJECT_ROOT = detect_project_root(execution_dir)
 PHASE = "01_explore"
 
+DEFAULT_RAW_REGISTRATION = {"link": "auto", "canonical_parquet": False}
+
 # ============================================================
 # LÓGICA ESPECÍFICA FASE 01
 # ============================================================
 
-def prepare_time_axis(df: pd.DataFrame):
-    time_col = None
-    if "Timestamp" in df.columns:
-        time_col = "Timestamp"
-    else:
-        candidates = [
-            c for c in df.columns
-            if any(k in c.lower() for k in ["time", "timestamp", "fecha", "date"])
-        ]
-        if candidates:
-            time_col = candidates[0]
-
-    if time_col:
-        ts = pd.to_datetime(df[time_col])
-        df["segs"] = (ts - pd.Timestamp("1970-01-01")) // pd.Timedelta("1s")
+def prepare_time_axis(df: pd.DataFrame, segs: np.ndarray | None = None):
+    """segs: eje ya calculado (y ordenado) al unir varias entradas raw."""
+    time_col = detect_time_column(df.columns)
+
+    if segs is not None:
+        df["segs"] = segs
+        df = df.set_index("segs")
+    elif time_col:
+        df["segs"] = segs_from_time(df[time_col])
         df = df.set_index("segs").sort_index()
     elif "segs" in df.columns:
         df = df.set_index("segs").sort_index()
@@ -76,38 +94,350 @@ def prepare_time_axis(df: pd.DataFrame):
             "Fase 01 requiere una de ellas."
         )
 
-    df["segs_diff"] = df.index.to_series().diff()
-    Tu_value = float(df["segs_diff"].median())
-    return df, Tu_value
+    # Tu = mediana de las diferencias, desde un histograma por bloques
+    # (sin columna segs_diff ni ordenación adicional)
+    time_stats = DiffHistogram.from_array(df.index.to_numpy())
+    return df, time_stats.median(), time_stats
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return isinstance(series.dtype, np.dtype) and np.issubdtype(series.dtype, np.number)
 
 
 def apply_cleaning(df: pd.DataFrame, params: dict):
+    """
+    Limpieza vectorizada sobre una matriz float64 (df se modifica in place):
+      - las columnas numéricas con valores a limpiar se copian una sola vez
+        a X (orden Fortran: cada columna contigua)
+      - V[j, i] = j-ésimo valor de nan_values ∪ error_values_by_column[col_i]
+        (relleno con NaN, que nunca iguala); máscara = OR de X == V[j], con
+        V[j] en broadcast sobre las filas
+      - recuento de reemplazos = suma de la máscara (NaN previos no cuentan)
+      - full: filas totalmente NaN con una única reducción ~isnan(X).all(axis=1)
+    Solo se reescriben las columnas con algún reemplazo: los enteros sin
+    reemplazos conservan su tipo, como replace(). Quitar filas (full) sí
+    copia el DataFrame; en F01 se hace por lote (ver clean_batches_to_parquet).
+    """
     strategy = params.get("cleaning_strategy", "none")
     nan_values = params.get("nan_values", [])
     error_values_by_column = params.get("error_values_by_column", {})
 
-    df_clean = df.copy()
     nan_repl = 0
 
     if strategy == "none":
-        return df_clean, nan_repl
+        return df, nan_repl
+
+    global_vals = [v for v in (nan_values or []) if v is not None]
+    col_vals = {}
+    for col in df.columns:
+        vals = list(global_vals)
+        if strategy == "full":
+            vals += list(error_values_by_column.get(col, []))
+        if vals:
+            col_vals[col] = vals
+
+    cols = [c for c in col_vals if _is_numeric(df[c])]
+    num_vals = [[v for v in col_vals[c] if isinstance(v, (int, float))] for c in cols]
+
+    X = np.empty((len(df), len(cols)), dtype=np.float64, order="F")
+    for i, col in enumerate(cols):
+        X[:, i] = df[col].to_numpy()
+
+    V = np.full((max(map(len, num_vals), default=0), len(cols)), np.nan)
+    for i, vals in enumerate(num_vals):
+        V[:len(vals), i] = vals
+
+    mask = np.zeros(X.shape, dtype=bool)
+    for row in V:
+        mask |= X == row
+
+    nan_repl += int(np.count_nonzero(mask))
+    X[mask] = np.nan
+    for i in np.flatnonzero(mask.any(axis=0)):
+        df[cols[i]] = X[:, i]
+    del mask
+
+    # Columnas no numéricas (p.ej. texto): comparación por objeto
+    for col in col_vals:
+        if col in cols:
+            continue
+        m = df[col].isin(col_vals[col]).to_numpy() & df[col].notna().to_numpy()
+        n = int(np.count_nonzero(m))
+        if n:
+            df[col] = df[col].mask(m)
+            nan_repl += n
+
+    if strategy == "full":
+        any_valid = ~np.isnan(X).all(axis=1) if cols else np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            if any_valid.all():
+                break
+            if col not in cols:
+                any_valid |= df[col].notna().to_numpy()
+        if not any_valid.all():
+            df = df[any_valid]
+
+    return df, nan_repl
+
+
+# ============================================================
+# ESCRITURA POR LOTES
+# ============================================================
+
+DROP_COLUMNS = ["Timestamp", "segs_diff", "segs_dt"]
+
+
+class StreamFallback(Exception):
+    """El tramo no admite escritura por lotes: se limpia en memoria."""
 
-    if nan_values:
-        before = df_clean.isna().sum().sum()
-        df_clean.replace(nan_values, np.nan, inplace=True)
-        after = df_clean.isna().sum().sum()
-        nan_repl += int(after - before)
 
+def _cleanable_columns(names, params) -> set:
+    """Columnas que apply_cleaning puede tocar (las enteras pasan a float64)."""
+    strategy = params.get("cleaning_strategy", "none")
+    if strategy == "none":
+        return set()
+    if [v for v in (params.get("nan_values") or []) if v is not None]:
+        return set(names)
     if strategy == "full":
-        for col, vals in error_values_by_column.items():
-            if col in df_clean.columns:
-                before = df_clean[col].isna().sum()
-                df_clean[col].replace(vals, np.nan, inplace=True)
-                after = df_clean[col].isna().sum()
-                nan_repl += int(after - before)
-        df_clean.dropna(axis=0, how="all", inplace=True)
+        return set(params.get("error_values_by_column", {})) & set(names)
+    return set()
+
+
+def clean_batches_to_parquet(batches, output_path: Path, params: dict, segs=None) -> dict:
+    """
+    Eje temporal + limpieza + escritura de cada lote en un único
+    ParquetWriter: la memoria depende del lote, no del tramo. Los lotes
+    limpios se agrupan en row groups de WRITE_CHUNK_ROWS filas, como en
+    save_numeric_dataset.
+    segs: eje ya calculado (entrada múltiple), alineado con los lotes.
+
+    Las columnas enteras que la limpieza puede tocar se escriben como
+    float64 en todos los lotes (el tipo no puede depender de que un lote
+    tenga reemplazos). Lanza StreamFallback si el eje no llega ordenado o
+    si los tipos cambian entre lotes; el fichero temporal se elimina.
+    """
+    output_path = Path(output_path)
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    stats = {"n_rows": 0, "nan_repl": 0, "segs_min": None, "segs_max": None}
+    hist = DiffHistogram()
+    writer = None
+    numeric_cols = dtypes = cleanable = None
+    pending, pending_rows = [], 0
+    offset = 0
+    last = None
+
+    def flush():
+        nonlocal pending, pending_rows
+        if pending:
+            writer.write_table(pa.concat_tables(pending))
+        pending, pending_rows = [], 0
+
+    try:
+        for batch in batches:
+            df = batch.to_pandas()
+            time_col = detect_time_column(df.columns)
+            if segs is not None:
+                s = np.asarray(segs[offset:offset + len(df)])
+                offset += len(df)
+            elif time_col:
+                s = segs_from_time(df[time_col])
+            elif "segs" in df.columns:
+                s = df["segs"].to_numpy()
+            else:
+                raise RuntimeError(
+                    "No existe columna temporal ('Timestamp' o 'segs'). "
+                    "Fase 01 requiere una de ellas."
+                )
+            if not len(s):
+                continue
+            if (last is not None and s[0] < last) or np.any(np.diff(s) < 0):
+                raise StreamFallback("eje temporal no ordenado")
+            last = s[-1]
+            hist.update(s)
+
+            df.index = pd.Index(s, name="segs")
+            df = df.drop(columns=["segs"], errors="ignore")
+            df, n = apply_cleaning(df, params)
+            stats["nan_repl"] += n
+
+            out = df.reset_index().drop(columns=DROP_COLUMNS, errors="ignore")
+            cols = out.select_dtypes(include=[np.number]).columns.tolist()
+            if cleanable is None:
+                cleanable = _cleanable_columns(cols, params) - {"segs"}
+            for col in cols:
+                if col in cleanable and out[col].dtype.kind in "iu":
+                    out[col] = out[col].astype(np.float64)
+            out = out[cols]
+
+            if writer is None:
+                numeric_cols, dtypes = cols, list(out.dtypes)
+                schema = pa.Schema.from_pandas(out, preserve_index=False)
+                writer = pq.ParquetWriter(tmp, schema)
+            elif cols != numeric_cols or list(out.dtypes) != dtypes:
+                raise StreamFallback("tipos distintos entre lotes")
+
+            if len(out):
+                pending.append(pa.Table.from_pandas(out, schema=schema, preserve_index=False))
+                pending_rows += len(out)
+                if pending_rows >= WRITE_CHUNK_ROWS:
+                    flush()
+                stats["n_rows"] += len(out)
+                if stats["segs_min"] is None:
+                    stats["segs_min"] = int(out["segs"].iloc[0])
+                stats["segs_max"] = int(out["segs"].iloc[-1])
+
+        if writer is None:
+            raise StreamFallback("tramo vacío")
+        flush()
+        writer.close()
+        writer = None
+        os.replace(tmp, output_path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+
+    stats.update(numeric_cols=numeric_cols, time_stats=hist)
+    return stats
 
-    return df_clean, nan_repl
+
+# ============================================================
+# MODO APPEND (raw creciente)
+# ============================================================
+
+def append_new_rows(variant, ctx, params, raw_input, raw_copy, pm, prof):
+    """
+    Procesa solo las filas del raw posteriores a la última ejecución
+    (desde raw_rows_end y con segs > segs_max) y las añade como una nueva
+    parte del dataset explorado, con los mismos tipos que el fichero base.
+    Tu, columnas y formato se conservan de la ejecución completa.
+    """
+    outputs = ctx["outputs"]
+    if not outputs["metadata"].exists() or not outputs["dataset"].exists():
+        raise RuntimeError(
+            f"--append requiere una ejecución completa previa de {PHASE}/{variant}"
+        )
+    if params.get("max_lines") is not None:
+        raise RuntimeError(
+            "--append no es compatible con max_lines: la variante debe cubrir el raw hasta el final"
+        )
+
+    with open(outputs["metadata"], "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    with open(outputs["params"], "r", encoding="utf-8") as f:
+        gen_params = json.load(f)
+
+    last_segs = metadata.get("segs_max")
+    if last_segs is None:
+        last_segs = pc.max(read_dataset_table(outputs["dataset"], columns=["segs"])["segs"]).as_py()
+    raw_rows_end = metadata.get("raw_rows_end")
+    if raw_rows_end is None:
+        raw_rows_end = 0   # metadata anterior a --append: se filtra solo por segs
+
+    prof.begin("load")
+    registration = {**DEFAULT_RAW_REGISTRATION, **(params.get("raw_registration") or {})}
+    multi = is_multi_raw(raw_input)
+    segs = None
+
+    if multi:
+        # Entrada múltiple: solo se leen los ficheros nuevos o modificados
+        # (sha256 no registrado); raw_rows_end no aplica
+        known = {i["sha256"] for i in (metadata.get("raw_registration") or {}).get("inputs", [])}
+        hashes = HashCache(raw_copy.parent / ".hash_cache.json")
+        inputs = register_raw_inputs(
+            expand_raw_inputs(raw_input), raw_copy, hashes, link=registration["link"]
+        )
+        hashes.save()
+        raw_info = {"source": str(raw_input), "inputs": inputs}
+        pending = [i["path"] for i in inputs if i["sha256"] not in known]
+        if pending:
+            table, segs, raw_read = read_raw_inputs(pending, columns=params.get("columns"))
+            df = table.to_pandas()
+            del table
+        else:
+            df, raw_read = pd.DataFrame(), {"files": 0, "rows_read": 0}
+        print(f"[INFO] Raw nuevo: {len(pending)} ficheros nuevos o modificados, {raw_read['rows_read']} filas")
+    else:
+        # El raw ya está enlazado (hardlink/symlink): no se re-hashea (costaría
+        # leerlo entero); si no lo está se registra de nuevo.
+        if raw_copy.exists() and os.path.samefile(raw_input, raw_copy):
+            raw_info = {"source": str(raw_input), "path": str(raw_copy), "sha256": None,
+                        "link": "symlink" if raw_copy.is_symlink() else "hardlink"}
+        else:
+            hashes = HashCache(raw_copy.parent / ".hash_cache.json")
+            raw_info = register_raw(raw_input, raw_copy, hashes, link=registration["link"])
+            hashes.save()
+
+        table, raw_read = read_raw_slice(
+            raw_copy, first_line=raw_rows_end + 1, columns=params.get("columns")
+        )
+        df = table.to_pandas()
+        del table
+        print(f"[INFO] Raw nuevo: {raw_read['rows_read']} filas desde la fila {raw_rows_end + 1}")
+
+    entry = {
+        "generated_at": datetime.now().astimezone().isoformat(),
+        "raw_rows_read": int(raw_read["rows_read"]),
+        "rows": 0,
+    }
+
+    prof.begin("transform")
+    if len(df):
+        df, _, _ = prepare_time_axis(df, segs)
+        df = df[df.index > last_segs]
+
+    if len(df):
+        df_clean, nan_repl_value = apply_cleaning(df, params)
+        prof.begin("write")
+        base_dtypes = {
+            field.name: field.type.to_pandas_dtype()
+            for field in pq.read_schema(outputs["dataset"])
+        }
+        part_path = next_part_path(outputs["dataset"])
+        _, df_out = save_numeric_dataset(
+            df=df_clean,
+            output_path=part_path,
+            index_name="segs",
+            drop_columns=["Timestamp", "segs_diff", "segs_dt"],
+            storage=params.get("dataset_storage"),
+            dtypes=base_dtypes,
+        )
+        entry.update({
+            "rows": int(len(df_out)),
+            "segs_min": int(df_out["segs"].min()),
+            "segs_max": int(df_out["segs"].max()),
+            "part": str(part_path),
+            "nan_replacements": int(nan_repl_value),
+        })
+        metadata["n_rows"] = int(metadata.get("n_rows", 0)) + len(df_out)
+        metadata["nan_replacements_total"] = int(metadata.get("nan_replacements_total", 0)) + int(nan_repl_value)
+        metadata["segs_max"] = entry["segs_max"]
+        gen_params["n_rows"] = metadata["n_rows"]
+        gen_params["nan_replacements_total"] = metadata["nan_replacements_total"]
+        print(f"[OK] Parte añadida ({len(df_out)} filas): {part_path}")
+    else:
+        print("[INFO] Sin filas nuevas posteriores al último segs procesado")
+
+    if not multi:
+        metadata["raw_rows_end"] = int(raw_rows_end + raw_read["rows_read"])
+    metadata["raw_registration"] = raw_info
+    metadata["appends"] = metadata.get("appends", []) + [entry]
+
+    save_params_and_metadata(
+        phase=PHASE,
+        variant=variant,
+        variant_root=ctx["variant_root"],
+        raw_path=raw_copy,
+        gen_params=gen_params,
+        metadata_extra={
+            k: v for k, v in metadata.items()
+            if k not in ("phase", "variant", "git_commit", "generated_at", "raw_file")
+        },
+        pm=pm,
+        git_commit=get_git_hash(),
+    )
+    print("[INFO] Informe HTML no regenerado en modo append")
 
 
 # ============================================================
@@ -118,10 +448,21 @@ def main():
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--variant", required=True)
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="procesar solo las filas del raw posteriores al último segs ya explorado",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ejecutar aunque la huella (raw + params + código) no haya cambiado",
+    )
     args = parser.parse_args()
 
     variant = args.variant
-    print(f"\n===== INICIO FASE {PHASE} / {variant} =====")
+    print(f"\n===== INICIO FASE {PHASE} / {variant}{' (append)' if args.append else ''} =====")
+    prof = PhaseProfiler(PHASE)
 
     execution_dir = detect_execution_dir()
     project_root = detect_project_root(execution_dir)
@@ -153,37 +494,138 @@ def main():
     ctx["variant_params"] = params
 
 
-    # RAW (ruta en params.yaml relativa a project_root)
+    # RAW (ruta en params.yaml relativa a project_root): se registra por
+    # contenido y se enlaza en data/01-raw/ en lugar de copiarse.
+    # Con un directorio o glob, cada fichero se enlaza en data/01-raw/inputs/
     raw_input = (project_root / params["raw_dataset_path"]).expanduser().resolve()
     raw_dir = project_root / "data" / "01-raw"
     raw_dir.mkdir(parents=True, exist_ok=True)
-    raw_copy = raw_dir / f"{PHASE}_raw_{raw_input.name}"
-    if not raw_copy.exists():
-        shutil.copy2(raw_input, raw_copy)
-
-    if raw_copy.suffix.lower() == ".csv":
-        df = pd.read_csv(raw_copy)
-    else:
-        df = pd.read_parquet(raw_copy)
-
-    max_lines = params.get("max_lines")
-    first_line = params.get("first_line")
-    if max_lines is not None or first_line is not None:
-        start_idx = max(int(first_line or 1) - 1, 0)
-        end_idx = start_idx + int(max_lines) if max_lines is not None else None
-        df = df.iloc[start_idx:end_idx].reset_index(drop=True)
-
-    df, Tu_value = prepare_time_axis(df)
-    df_clean, nan_repl_value = apply_cleaning(df, params)
+    multi = is_multi_raw(raw_input)
+    raw_copy = raw_dir / "inputs" if multi else raw_dir / f"{PHASE}_raw_{raw_input.name}"
 
     outputs = build_phase_outputs(ctx["variant_root"], PHASE)
     ctx["outputs"] = outputs  # para que generate_figures_and_report use ctx["outputs"]["report"]
+    ctx["force"] = args.force
+
+    if args.append:
+        append_new_rows(variant, ctx, params, raw_input, raw_copy, pm, prof)
+        # La huella de la ejecución completa ya no describe los outputs
+        record_fingerprint(outputs["metadata"], None)
+        prof.write(outputs["metadata"])
+        print(f"\n===== FASE {PHASE} COMPLETADA (append) =====")
+        return
+
+    # Huella: si raw, params y código no han cambiado, no hay nada que hacer
+    fingerprint = phase_fingerprint(
+        SCRIPT_PATH, params, expand_raw_inputs(raw_input) if multi else [raw_input], project_root
+    )
+    if memo_hit(PHASE, outputs["metadata"], fingerprint,
+                [outputs["dataset"], outputs["report"]], args.force):
+        print(f"\n===== FASE {PHASE} COMPLETADA (cache hit) =====")
+        return
+
+    prof.begin("load")
+    registration = {**DEFAULT_RAW_REGISTRATION, **(params.get("raw_registration") or {})}
+    hashes = HashCache(raw_dir / ".hash_cache.json")
+    segs = None
+
+    # Tramo (first_line / max_lines) y columnas aplicados durante la lectura
+    slice_args = {
+        "first_line": params.get("first_line"),
+        "max_lines": params.get("max_lines"),
+        "columns": params.get("columns"),
+    }
 
-    numeric_cols, df_out = save_numeric_dataset(
-        df=df_clean,
-        output_path=outputs["dataset"],
-        index_name="segs",
-        drop_columns=["Timestamp", "segs_diff", "segs_dt"],
+    if multi:
+        inputs = register_raw_inputs(
+            expand_raw_inputs(raw_input), raw_copy, hashes, link=registration["link"]
+        )
+        hashes.save()
+        raw_info = {"source": str(raw_input), "inputs": inputs}
+        print(f"[INFO] Raw múltiple registrado: {len(inputs)} ficheros en {raw_copy}")
+
+        # Escaneo en paralelo + merge por tiempo; tramo sobre el resultado
+        table, segs, raw_read = read_raw_inputs([i["path"] for i in inputs], **slice_args)
+        print(f"[INFO] Entradas unidas por tiempo ({raw_read['merge']})")
+    else:
+        raw_info = register_raw(raw_input, raw_copy, hashes, link=registration["link"])
+        print(f"[INFO] Raw registrado ({raw_info['link']}): {raw_copy} sha256={raw_info['sha256'][:16]}")
+
+        raw_source = raw_copy
+        if registration["canonical_parquet"] and raw_copy.suffix.lower() == ".csv":
+            raw_source, reused = canonical_parquet(raw_copy, raw_info["sha256"], raw_dir / "canonical")
+            raw_info["canonical_parquet"] = str(raw_source)
+            raw_info["canonical_reused"] = reused
+            if reused:
+                print(f"[INFO] Reutilizando parquet canónico: {raw_source}")
+        hashes.save()
+
+    # Por lotes: cada lote se limpia y se añade a un único ParquetWriter.
+    # compact decide los tipos con el dataset completo: solo en memoria
+    storage_cfg = params.get("dataset_storage")
+    streamed = None
+    clear_parts(outputs["dataset"])
+    if not (storage_cfg or {}).get("compact", False):
+        prof.begin("stream")
+        try:
+            if multi:
+                streamed = clean_batches_to_parquet(
+                    table.to_batches(max_chunksize=WRITE_CHUNK_ROWS), outputs["dataset"], params, segs
+                )
+            else:
+                streamed, raw_read = stream_raw_slice(
+                    raw_source,
+                    lambda _schema, batches: clean_batches_to_parquet(batches, outputs["dataset"], params),
+                    **slice_args,
+                )
+        except StreamFallback as e:
+            print(f"[WARN] Escritura por lotes no aplicable ({e}): limpieza en memoria")
+
+    if streamed is not None:
+        print(f"[INFO] Dataset explorado escrito por lotes: {streamed['n_rows']} filas")
+        numeric_cols = streamed["numeric_cols"]
+        nan_repl_value = streamed["nan_repl"]
+        time_stats = streamed["time_stats"]
+        Tu_value = time_stats.median()
+
+        # El informe (describe, histogramas, correlación) necesita el dataset
+        # entero: se relee el ya limpio, solo con las columnas numéricas
+        prof.begin("reload")
+        df_out = pd.read_parquet(outputs["dataset"])
+    else:
+        prof.begin("load")
+        if not multi:
+            table, raw_read = read_raw_slice(raw_source, **slice_args)
+        df = table.to_pandas()
+        del table
+
+        prof.begin("transform")
+        df, Tu_value, time_stats = prepare_time_axis(df, segs)
+        df_clean, nan_repl_value = apply_cleaning(df, params)
+
+        prof.begin("write")
+        numeric_cols, df_out = save_numeric_dataset(
+            df=df_clean,
+            output_path=outputs["dataset"],
+            index_name="segs",
+            drop_columns=DROP_COLUMNS,
+            storage=storage_cfg,
+        )
+    print(
+        f"[INFO] Raw leído ({raw_read['format']}): {raw_read['rows_read']} filas, "
+        f"{raw_read['columns_read']} columnas desde la fila {raw_read['first_row'] + 1}"
+    )
+
+    storage_info = {
+        "compact": bool((storage_cfg or {}).get("compact", False)),
+        "streamed": streamed is not None,
+        "file_bytes": int(outputs["dataset"].stat().st_size),
+        "memory_bytes": int(df_out.memory_usage(index=False).sum()),
+        "dtypes": {c: str(t) for c, t in df_out.dtypes.items()},
+    }
+    print(
+        f"[INFO] Dataset explorado: {storage_info['file_bytes'] / 1e6:.2f} MB en disco, "
+        f"{storage_info['memory_bytes'] / 1e6:.2f} MB en memoria"
     )
 
     gen_params = {
@@ -203,6 +645,15 @@ def main():
         "cleaning_strategy": params.get("cleaning_strategy"),
         "nan_values": params.get("nan_values"),
         "error_values_by_column": params.get("error_values_by_column"),
+        "raw_registration": raw_info,
+        "raw_read": raw_read,
+        "dataset_storage": storage_info,
+        "time_axis": time_stats.to_dict(period=Tu_value),
+        # Estado para --append
+        "segs_min": int(df_out["segs"].min()) if len(df_out) else None,
+        "segs_max": int(df_out["segs"].max()) if len(df_out) else None,
+        "raw_rows_end": int(raw_read["first_row"] + raw_read["rows_read"]),
+        "appends": [],
     }
 
     save_params_and_metadata(
@@ -216,13 +667,19 @@ def main():
         git_commit=get_git_hash(),
     )
 
+    prof.begin("report")
     explore_report.generate_figures_and_report(
         variant=variant,
         ctx=ctx,
         df_out=df_out,
         numeric_cols=[c for c in numeric_cols if c != "segs"],
         Tu_value=Tu_value,
+        # El histograma describe el eje antes de limpiar: solo vale para el
+        # informe si la limpieza no ha eliminado filas (estrategia full)
+        time_stats=time_stats if time_stats.n == max(len(df_out) - 1, 0) else None,
     )
+    record_fingerprint(outputs["metadata"], fingerprint)
+    prof.write(outputs["metadata"])
 
     print(f"\n===== FASE {PHASE} COMPLETADA =====")
 
@@ -21,6 +21,7 @@ import re
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import matplotlib.pyplot as plt
 
 import sys
@@ -57,18 +58,33 @@ from mlops4ofp.tools.artifacts import (
     save_numeric_dataset,
     save_params_and_metadata,
 )
+from mlops4ofp.tools.parquet_parts import clear_parts, dataset_files, read_dataset_table, write_part
+from mlops4ofp.tools.profiling import PhaseProfiler
+from mlops4ofp.tools.memo import memo_hit, phase_fingerprint, record_fingerprint
 import mlops4ofp.tools.html_reports.html02 as prepareevents_report02
 
 execution_dir = detect_execution_dir()
 PROJECT_ROOT = detect_project_root(execution_dir)
 
 PHASE = "02_prepareeventsds"
+prof = PhaseProfiler(PHASE)
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--variant", required=True)
+parser.add_argument(
+    "--append",
+    action="store_true",
+    help="generar eventos solo para las filas F01 nuevas (bandas y estado persistidos)",
+)
+parser.add_argument(
+    "--force",
+    action="store_true",
+    help="ejecutar aunque la huella (dataset F01 + params + código) no haya cambiado",
+)
 args = parser.parse_args()
 
 ACTIVE_VARIANT = args.variant
+APPEND = args.append
 
 variant_root = (
     PROJECT_ROOT
@@ -126,6 +142,7 @@ print(f"[prepareeventsds] nan_handling = {nan_handling}")
 
 outputs = build_phase_outputs(ctx["variant_root"], PHASE)
 ctx["outputs"] = outputs  # para que generate_figures_and_report use ctx["outputs"]["report"]
+ctx["force"] = args.force
 
 # ============================================================
 # 3. Resolver Tu (prioridad: F02 -> F01)
@@ -184,8 +201,37 @@ if not parent_dataset_path.exists():
 
 print(f"[prepareeventsds] Dataset padre (F01): {parent_dataset_path}")
 
-# --- Cargar dataset ---
-df_explored = pd.read_parquet(parent_dataset_path)
+# --- Huella: dataset F01 (base + partes) + params (con Tu resuelto) + código ---
+fingerprint = None
+if not APPEND:
+    fingerprint = phase_fingerprint(
+        SCRIPT_PATH, params_f02, dataset_files(parent_dataset_path), PROJECT_ROOT
+    )
+    if memo_hit(PHASE, outputs["metadata"], fingerprint,
+                [outputs["dataset"], outputs["report"]], args.force):
+        raise SystemExit(0)
+
+# --- Estado de la ejecución anterior (solo --append) ---
+state_path = VARIANT_DIR / f"{PHASE}_state.json"
+bands_path = VARIANT_DIR / f"{PHASE}_bands.json"
+event_catalog_path = VARIANT_DIR / f"{PHASE}_event_catalog.json"
+
+append_state = None
+if APPEND:
+    if not state_path.exists():
+        raise RuntimeError(
+            f"--append requiere una ejecución completa previa de F02 con estado:\n{state_path}"
+        )
+    with open(state_path, "r", encoding="utf-8") as f:
+        append_state = json.load(f)
+    print(f"[prepareeventsds] Append: filas F01 con segs > {append_state['last_segs']}")
+
+# --- Cargar dataset (base + partes; en append solo lo nuevo) ---
+prof.begin("load")
+df_explored = read_dataset_table(
+    parent_dataset_path,
+    filters=[("segs", ">", append_state["last_segs"])] if APPEND else None,
+).to_pandas()
 
 # --- Detectar columna temporal ---
 if "segs" in df_explored.columns:
@@ -209,6 +255,7 @@ if not measurement_cols:
 print(f"[prepareeventsds] Filas: {len(df_explored)}")
 print(f"[prepareeventsds] Columna temporal: {epoch_col}")
 print(f"[prepareeventsds] Nº de medidas: {len(measurement_cols)}")
+prof.begin("transform")
 
 
 # ============================================================
@@ -228,9 +275,9 @@ def compute_minmax(df: pd.DataFrame, measure_cols):
         for col in measure_cols
     }
 
-minmax_stats = compute_minmax(df_explored, measurement_cols)
-
-print("[prepareeventsds] Min/max por medida calculado.")
+if not APPEND:
+    minmax_stats = compute_minmax(df_explored, measurement_cols)
+    print("[prepareeventsds] Min/max por medida calculado.")
 
 # ------------------------------------------------------------
 # Cálculo de cortes y etiquetas de bandas
@@ -259,12 +306,25 @@ def compute_cuts_and_labels(minmax_stats, pct_thresholds):
     return out
 
 
-bands = compute_cuts_and_labels(
-    minmax_stats=minmax_stats,
-    pct_thresholds=band_thresholds_pct,
-)
-
-print("[prepareeventsds] Bandas calculadas.")
+if APPEND:
+    # Bandas congeladas: recalcularlas cambiaría los eventos ya generados.
+    # Valores nuevos fuera de [min, max] quedan como "none" (sin evento).
+    with open(bands_path, "r", encoding="utf-8") as f:
+        bands = {
+            col: {"cuts": np.asarray(b["cuts"], dtype=np.float64), "labels": b["labels"]}
+            for col, b in json.load(f).items()
+        }
+    missing = [c for c in bands if c not in df_explored.columns]
+    if missing:
+        raise RuntimeError(f"Medidas de F02 ausentes en las filas nuevas de F01: {missing}")
+    measurement_cols = list(bands)
+    print("[prepareeventsds] Bandas cargadas de la ejecución anterior.")
+else:
+    bands = compute_cuts_and_labels(
+        minmax_stats=minmax_stats,
+        pct_thresholds=band_thresholds_pct,
+    )
+    print("[prepareeventsds] Bandas calculadas.")
 
 # ------------------------------------------------------------
 # Catálogo de eventos
@@ -305,11 +365,15 @@ def build_event_catalog(bands, event_strategy, nan_handling):
     return event_to_id
 
 
-event_to_id = build_event_catalog(
-    bands=bands,
-    event_strategy=event_strategy,
-    nan_handling=nan_handling,
-)
+if APPEND:
+    with open(event_catalog_path, "r", encoding="utf-8") as f:
+        event_to_id = json.load(f)
+else:
+    event_to_id = build_event_catalog(
+        bands=bands,
+        event_strategy=event_strategy,
+        nan_handling=nan_handling,
+    )
 
 print(f"[prepareeventsds] Catálogo de eventos: {len(event_to_id)} tipos.")
 
@@ -347,7 +411,13 @@ def fast_generate_events(
     event_strategy,
     nan_handling,
     Tu,
+    state=None,
 ):
+    """
+    state (modo append): última fila procesada, {"last_segs", "prev_kind",
+    "prev_label"}; permite generar las transiciones de la primera fila
+    nueva. Devuelve (df_events, estado tras la última fila).
+    """
     N = len(df)
     epochs = df[epoch_col].values.astype(np.int64)
 
@@ -361,6 +431,14 @@ def fast_generate_events(
 
     prev_kind = {col: None for col in measure_cols}
     prev_label = {col: None for col in measure_cols}
+    last_segs = None
+
+    if state is not None:
+        prev_kind.update(state["prev_kind"])
+        prev_label.update(state["prev_label"])
+        last_segs = state["last_segs"]
+        if N and last_segs is not None:
+            is_consecutive[0] = (epochs[0] - last_segs == Tu)
 
     col_kind = {}
     col_label = {}
@@ -385,7 +463,7 @@ def fast_generate_events(
             curr_lbl = col_label[col][i]
 
             # Transiciones
-            if i > 0 and is_consecutive[i] and strat in ("transitions", "both"):
+            if is_consecutive[i] and strat in ("transitions", "both"):
                 pk = prev_kind[col]
                 pl = prev_label[col]
 
@@ -417,10 +495,16 @@ def fast_generate_events(
         }
     )
 
-    return df_events
+    new_state = {
+        "last_segs": int(epochs[-1]) if N else last_segs,
+        "prev_kind": prev_kind,
+        "prev_label": prev_label,
+    }
+
+    return df_events, new_state
 
 
-df_events = fast_generate_events(
+df_events, events_state = fast_generate_events(
     df=df_explored,
     epoch_col=epoch_col,
     measure_cols=measurement_cols,
@@ -429,6 +513,7 @@ df_events = fast_generate_events(
     event_strategy=event_strategy,
     nan_handling=nan_handling,
     Tu=Tu,
+    state=append_state,
 )
 
 print("[prepareeventsds] Dataset de eventos generado.")
@@ -450,10 +535,25 @@ import json
 # 6.1 Guardar dataset de eventos
 # ------------------------------------------------------------
 
+prof.begin("write")
 events_dataset_path = VARIANT_DIR / "02_prepareeventsds_dataset.parquet"
-df_events.to_parquet(events_dataset_path, index=False)
+if APPEND:
+    part_path = None
+    if len(df_events):
+        part_path = write_part(
+            pa.Table.from_pandas(df_events, preserve_index=False), events_dataset_path
+        )
+        print(f"[prepareeventsds] Parte de eventos añadida en:\n{part_path}")
+    else:
+        print("[prepareeventsds] Sin filas F01 nuevas.")
+else:
+    clear_parts(events_dataset_path)
+    df_events.to_parquet(events_dataset_path, index=False)
+    print(f"[prepareeventsds] Dataset de eventos guardado en:\n{events_dataset_path}")
 
-print(f"[prepareeventsds] Dataset de eventos guardado en:\n{events_dataset_path}")
+# Estado para --append: última fila y bandas/etiquetas previas por medida
+with open(state_path, "w", encoding="utf-8") as f:
+    json.dump(events_state, f, indent=2)
 # IDs de eventos NaN (nivel)
 nan_event_ids = {
     eid for name, eid in event_to_id.items()
@@ -522,8 +622,23 @@ metadata_extra = {
     "n_rows_events": int(len(df_events)),
     "n_event_types": int(len(event_to_id)),
     "n_measures": int(len(measurement_cols)),
+    "appends": [],
 }
 
+if APPEND:
+    # Recuentos acumulados sobre la ejecución completa + appends previos
+    with open(ctx["outputs"]["metadata"], "r", encoding="utf-8") as f:
+        previous_metadata = json.load(f)
+    for key in ("n_rows_input", "n_rows_events"):
+        metadata_extra[key] += int(previous_metadata.get(key, 0))
+        gen_params[key] = metadata_extra[key]
+    metadata_extra["appends"] = previous_metadata.get("appends", []) + [{
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "rows": int(len(df_events)),
+        "last_segs": events_state["last_segs"],
+        "part": str(part_path) if part_path else None,
+    }]
+
 # ------------------------------------------------------------
 # 6.5 Guardar params + metadata + trazabilidad
 # ------------------------------------------------------------
@@ -551,11 +666,19 @@ print("[STATS DEBUG] filas con NaN:",
 # 7. Tablas, figuras e informe HTML (Fase 02)
 # ============================================================
 
-prepareevents_report02.generate_figures_and_report(
-    ctx=ctx,
-    event_to_id=event_to_id,
-    df_events=df_events,
-)
+if APPEND:
+    print("[prepareeventsds] Informe HTML no regenerado en modo append.")
+else:
+    prof.begin("report")
+    prepareevents_report02.generate_figures_and_report(
+        ctx=ctx,
+        event_to_id=event_to_id,
+        df_events=df_events,
+    )
+
+# En append la huella de la ejecución completa deja de valer
+record_fingerprint(VARIANT_DIR / f"{PHASE}_metadata.json", fingerprint)
+prof.write(VARIANT_DIR / f"{PHASE}_metadata.json")
 
 
 print("[prepareeventsds] Fase 02 completada correctamente.")
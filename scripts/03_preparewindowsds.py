@@ -64,6 +64,10 @@ from mlops4ofp.tools.artifacts import (
     save_numeric_dataset,
     save_params_and_metadata,
 )
+from mlops4ofp.tools.online_windows import WindowGeometry
+from mlops4ofp.tools.parquet_parts import clear_parts, dataset_files, next_part_path, read_dataset_table
+from mlops4ofp.tools.profiling import PhaseProfiler
+from mlops4ofp.tools.memo import memo_hit, phase_fingerprint, record_fingerprint
 import mlops4ofp.tools.html_reports.html03 as preparewindows_report03
 
 execution_dir = detect_execution_dir()
@@ -89,6 +93,16 @@ def flush_rows(writer, rows, schema):
         rows.clear()
 
 
+def first_pending_bin(t_origin, Tu, total_span, last_time):
+    """Primer bin b (asynOW) cuya ventana aún no cabe: t0 + total_span > last_time."""
+    b = max(int((last_time - total_span - t_origin) // Tu), 0)
+    while t_origin + b * Tu + total_span <= last_time:
+        b += 1
+    while b > 0 and t_origin + (b - 1) * Tu + total_span > last_time:
+        b -= 1
+    return b
+
+
 # =====================================================================
 # CLI
 # =====================================================================
@@ -96,6 +110,16 @@ def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--variant", required=True)
     p.add_argument("--execution-dir", type=Path, default=None)
+    p.add_argument(
+        "--append",
+        action="store_true",
+        help="generar solo las ventanas que completan los eventos F02 nuevos",
+    )
+    p.add_argument(
+        "--force",
+        action="store_true",
+        help="ejecutar aunque la huella (eventos F02 + params + código) no haya cambiado",
+    )
     return p.parse_args()
 
 
@@ -104,6 +128,7 @@ def parse_args():
 # =====================================================================
 def main():
     args = parse_args()
+    prof = PhaseProfiler(PHASE)
 
     execution_dir = detect_execution_dir()
     project_root = detect_project_root(execution_dir)
@@ -126,6 +151,7 @@ def main():
     )
 
     ctx["outputs"] = OUTPUTS
+    ctx["force"] = args.force
 
     # -----------------------------------------------------------------
     # Params
@@ -162,8 +188,43 @@ def main():
         project_root / "executions" / parent_phase / parent_variant /
         f"{parent_phase}_dataset.parquet"
     )
+    catalog_path = (
+        project_root / "executions" / parent_phase / parent_variant /
+        f"{parent_phase}_event_catalog.json"
+    )
 
-    table = pq.read_table(input_dataset, columns=["segs", "events"])
+    # Huella: eventos F02 (base + partes) + catálogo + params (con Tu) + código
+    fingerprint = None
+    if not args.append:
+        fingerprint = phase_fingerprint(
+            SCRIPT_PATH, params, dataset_files(input_dataset) + [catalog_path], project_root
+        )
+        if memo_hit(PHASE, OUTPUTS["metadata"], fingerprint,
+                    [OUTPUTS["dataset"], OUTPUTS["report"]], args.force):
+            return
+
+    # --append: se continúa desde la primera ventana que no cabía en la
+    # ejecución anterior. Solo hacen falta los eventos desde su t0 (el
+    # solape de total_span con la cola ya procesada).
+    state_path = variant_root / f"{PHASE}_state.json"
+    state = None
+    filters = None
+    if args.append:
+        if not state_path.exists():
+            raise RuntimeError(
+                f"--append requiere una ejecución completa previa de F03 con estado:\n{state_path}"
+            )
+        with open(state_path) as f:
+            state = json.load(f)
+        if window_strategy == "asynOW":
+            resume_from = state["t_origin"] + state["next_bin"] * Tu
+        else:
+            resume_from = state["next_t0"]
+        filters = [("segs", ">=", resume_from)]
+        print(f"[F03] Append: eventos con segs >= {resume_from}", flush=True)
+
+    prof.begin("load")
+    table = read_dataset_table(input_dataset, columns=["segs", "events"], filters=filters)
     df = table.to_pandas(split_blocks=True, self_destruct=True)
 
     if not df["segs"].is_monotonic_increasing:
@@ -172,10 +233,7 @@ def main():
     # -----------------------------------------------------------------
     # NaN catalog
     # -----------------------------------------------------------------
-    with open(
-        project_root / "executions" / parent_phase / parent_variant /
-        f"{parent_phase}_event_catalog.json"
-    ) as f:
+    with open(catalog_path) as f:
         catalog = json.load(f)
 
     nan_codes = {c for n, c in catalog.items() if n.endswith("_NaN_NaN")}
@@ -216,15 +274,20 @@ def main():
     # -----------------------------------------------------------------
     # Geometry
     # -----------------------------------------------------------------
-    OW_span = OW * Tu
-    PW_start = (OW + LT) * Tu
-    PW_span = PW * Tu
-    total_span = PW_start + PW_span
+    geometry = WindowGeometry(OW, LT, PW, Tu, window_strategy, nan_strategy)
+    OW_span = geometry.ow_span
+    PW_start = geometry.pw_start
+    PW_span = geometry.pw_span
+    total_span = geometry.total_span
 
     # -----------------------------------------------------------------
     # Output
     # -----------------------------------------------------------------
     output_path = variant_root / f"{PHASE}_dataset.parquet"
+    if args.append:
+        output_path = next_part_path(output_path)
+    else:
+        clear_parts(output_path)
     schema = pa.schema([
         ("OW_events", pa.list_(pa.int32())),
         ("PW_events", pa.list_(pa.int32())),
@@ -235,14 +298,36 @@ def main():
     windows_total = 0
     windows_written = 0
 
+    # Bucle de ventanas (escritura en streaming incluida)
+    prof.begin("transform")
     t_loop = perf_counter()
 
+    # Origen de la rejilla de t0 y primera ventana pendiente
+    if state is not None:
+        t_origin = state["t_origin"]
+        t_start = state["next_t0"]
+        next_bin = state["next_bin"]
+    else:
+        t_origin = float(times[0]) if len(times) else 0.0
+        t_start = t_origin
+        next_bin = 0
+    t0 = t_start
+
+    if len(times) == 0:
+        # Sin eventos (p.ej. append sin filas nuevas): no hay ventanas
+        window_strategy_run = None
+    else:
+        window_strategy_run = window_strategy
+
     # =================================================================
     # FAST PATH: SYNCHRO
     # =================================================================
-    if window_strategy == "synchro":
+    if window_strategy_run is None:
+        pass
+
+    elif window_strategy == "synchro":
         n = len(times)
-        t0 = times[0]
+        t0 = t_start
 
         i_ow_0 = bisect_left(times, t0)
         i_ow_1 = bisect_left(times, t0 + OW_span)
@@ -294,10 +379,11 @@ def main():
     # ASYNOW
     # =================================================================
     elif window_strategy == "asynOW":
-        active_bins = np.unique(((times[lengths > 0] - times[0]) // Tu).astype(np.int64))
+        active_bins = np.unique(((times[lengths > 0] - t_origin) // Tu).astype(np.int64))
+        active_bins = active_bins[active_bins >= next_bin]
 
         for b in active_bins:
-            t0 = times[0] + b * Tu
+            t0 = t_origin + b * Tu
             if t0 + total_span > times[-1]:
                 continue
 
@@ -335,7 +421,7 @@ def main():
     # =================================================================
     elif window_strategy == "withinPW":
         n = len(times)
-        t0 = times[0]
+        t0 = t_start
 
         i_ow_0 = bisect_left(times, t0)
         i_ow_1 = bisect_left(times, t0 + OW_span)
@@ -389,7 +475,7 @@ def main():
     # =================================================================
     elif window_strategy == "asynPW":
         n = len(times)
-        t0 = times[0]
+        t0 = t_start
 
         i_ow_0 = bisect_left(times, t0)
         i_ow_1 = bisect_left(times, t0 + OW_span)
@@ -450,6 +536,21 @@ def main():
 
     elapsed = perf_counter() - t_loop
 
+    prof.begin("write")
+    last_time = float(times[-1]) if len(times) else (state or {}).get("last_time", 0.0)
+    new_state = {
+        "t_origin": float(t_origin),
+        "next_t0": float(t0) if window_strategy != "asynOW" else None,
+        "next_bin": first_pending_bin(t_origin, Tu, total_span, last_time),
+        "last_time": last_time,
+    }
+    with open(state_path, "w") as f:
+        json.dump(new_state, f, indent=2)
+
+    if args.append and windows_written == 0:
+        output_path.unlink(missing_ok=True)
+        output_path = None
+
     # -----------------------------------------------------------------
     # Metadata
     # -----------------------------------------------------------------
@@ -465,9 +566,24 @@ def main():
         "windows_written": windows_written,
         "elapsed_seconds": round(elapsed, 3),
         "generated_at": datetime.now(timezone.utc).isoformat(),
+        "appends": [],
     }
 
-    with open(variant_root / f"{PHASE}_metadata.json", "w") as f:
+    metadata_path = variant_root / f"{PHASE}_metadata.json"
+    if args.append:
+        # Recuentos acumulados (ejecución completa + appends)
+        with open(metadata_path) as f:
+            previous = json.load(f)
+        metadata["windows_total"] += int(previous.get("windows_total", 0))
+        metadata["windows_written"] += int(previous.get("windows_written", 0))
+        metadata["appends"] = previous.get("appends", []) + [{
+            "generated_at": metadata["generated_at"],
+            "windows_total": windows_total,
+            "windows_written": windows_written,
+            "part": str(output_path) if output_path else None,
+        }]
+
+    with open(metadata_path, "w") as f:
         json.dump(metadata, f, indent=2)
 
     print("✔ F03 FINAL generado")
@@ -475,10 +591,18 @@ def main():
     print(f"  Ventanas: {windows_written:,}")
     print(f"  Tiempo  : {elapsed:,.1f}s")
 
+    if args.append:
+        print("[F03] Informe HTML no regenerado en modo append")
+        # La huella de la ejecución completa deja de valer
+        record_fingerprint(metadata_path, None)
+        prof.write(metadata_path)
+        return
+
     # ============================================================
     # Tablas, figuras e informe HTML (Fase 03)
     # ============================================================
 
+    prof.begin("report")
     df_windows = pd.read_parquet(ctx["outputs"]["dataset"])
 
     preparewindows_report03.generate_html_report(
@@ -486,6 +610,8 @@ def main():
         df_windows=df_windows,
         catalog=catalog,
     )
+    record_fingerprint(metadata_path, fingerprint)
+    prof.write(metadata_path)
 
 
 
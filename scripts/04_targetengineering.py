@@ -52,15 +52,19 @@ from mlops4ofp.tools.run_context import (
 )
 from mlops4ofp.tools.params_manager import ParamsManager
 from mlops4ofp.tools.traceability import write_metadata
+from mlops4ofp.tools.parquet_parts import dataset_files, read_dataset_table
+from mlops4ofp.tools.profiling import PhaseProfiler
+from mlops4ofp.tools.memo import memo_hit, phase_fingerprint, record_fingerprint
 
 
 # ============================================================
 # Lógica principal
 # ============================================================
 
-def main(variant: str):
+def main(variant: str, force: bool = False):
 
     PHASE = "04_targetengineering"
+    prof = PhaseProfiler(PHASE)
 
     # --------------------------------------------------
     # Contexto de ejecución
@@ -146,7 +150,29 @@ def main(variant: str):
     if not input_dataset_path.exists():
         raise FileNotFoundError(f"No existe dataset F03: {input_dataset_path}")
 
-    table = pq.read_table(input_dataset_path)
+    event_catalog_path = (
+        project_root
+        / "executions"
+        / "02_prepareeventsds"
+        / parent_variant_f02
+        / "02_prepareeventsds_event_catalog.json"
+    )
+
+    if not event_catalog_path.exists():
+        raise FileNotFoundError(f"No existe event_catalog de F02: {event_catalog_path}")
+
+    # --------------------------------------------------
+    # Huella: ventanas F03 (base + partes) + catálogo + params + código
+    # --------------------------------------------------
+    outputs = build_phase_outputs(variant_root, PHASE)
+    fingerprint = phase_fingerprint(
+        SCRIPT_PATH, params, dataset_files(input_dataset_path) + [event_catalog_path], project_root
+    )
+    if memo_hit(PHASE, outputs["metadata"], fingerprint, [outputs["dataset"]], force):
+        return
+
+    prof.begin("load")
+    table = read_dataset_table(input_dataset_path)   # base + partes de --append
     df = table.to_pandas()
 
     print(f"[INFO] Nº ventanas F03: {len(df)}")
@@ -157,6 +183,7 @@ def main(variant: str):
     # --------------------------------------------------
     # Resolver objetivo de predicción
     # --------------------------------------------------
+    prof.begin("transform")
     operator = prediction_objective.get("operator")
     event_names = prediction_objective.get("events")
 
@@ -173,17 +200,6 @@ def main(variant: str):
     # --------------------------------------------------
     # Cargar event_catalog correcto (F02)
     # --------------------------------------------------
-    event_catalog_path = (
-        project_root
-        / "executions"
-        / "02_prepareeventsds"
-        / parent_variant_f02
-        / "02_prepareeventsds_event_catalog.json"
-    )
-
-    if not event_catalog_path.exists():
-        raise FileNotFoundError(f"No existe event_catalog de F02: {event_catalog_path}")
-
     with open(event_catalog_path, "r", encoding="utf-8") as f:
         event_catalog = json.load(f)
 
@@ -289,7 +305,7 @@ def main(variant: str):
     # --------------------------------------------------
     # Guardar artefactos
     # --------------------------------------------------
-    outputs = build_phase_outputs(variant_root, PHASE)
+    prof.begin("write")
 
     schema = pa.schema([
         ("OW_events", pa.list_(pa.int32())),
@@ -325,6 +341,8 @@ def main(variant: str):
         json.dump(summary, f, indent=2)
 
     print(f"[OK] Summary guardado: {summary_path}")
+    record_fingerprint(outputs["metadata"], fingerprint)
+    prof.write(outputs["metadata"])
 
     print("[DONE] Fase 04 completada correctamente")
 
@@ -336,6 +354,11 @@ def main(variant: str):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fase 04 — Target Engineering")
     parser.add_argument("--variant", required=True, help="Variante F04 (vNNN)")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ejecutar aunque la huella (ventanas F03 + params + código) no haya cambiado",
+    )
     args = parser.parse_args()
 
-    main(args.variant)
+    main(args.variant, force=args.force)
@@ -22,6 +22,8 @@ import os
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
 
 # ============================================================
@@ -61,6 +63,8 @@ from mlops4ofp.tools.run_context import (
 from mlops4ofp.tools.params_manager import ParamsManager
 from mlops4ofp.tools.traceability import write_metadata
 from mlops4ofp.tools.artifacts import get_git_hash
+from mlops4ofp.tools.profiling import PhaseProfiler
+from mlops4ofp.tools.memo import memo_hit, phase_fingerprint, record_fingerprint
 
 
 # ============================================================
@@ -89,41 +93,88 @@ def convert_to_native_types(obj):
         return obj
 
 
-def apply_rare_events(df, imbalance_cfg, seed):
+def apply_rare_events(labels, imbalance_cfg, seed):
+    """
+    Selecciona las filas a usar trabajando solo sobre el array de labels.
+
+    Devuelve (indices, info). indices=None significa "todas las filas".
+    Los índices vienen barajados, como hacía el muestreo sobre DataFrame.
+    """
     strategy = imbalance_cfg.get("strategy", "none")
 
     if strategy != "rare_events":
-        return df, {"strategy": "none"}
+        return None, {"strategy": "none"}
 
     max_majority = imbalance_cfg.get("max_majority_samples")
 
     if max_majority is None:
-        return df, {
+        return None, {
             "strategy": "rare_events",
             "note": "max_majority_samples=None → no reducción aplicada"
         }
 
-    df_pos = df[df["label"] == 1]
-    df_neg = df[df["label"] == 0]
+    rng = np.random.default_rng(seed)
+
+    pos_idx = np.flatnonzero(labels == 1)
+    neg_idx = np.flatnonzero(labels == 0)
 
-    n_pos_before = len(df_pos)
-    n_neg_before = len(df_neg)
+    n_pos_before = len(pos_idx)
+    n_neg_before = len(neg_idx)
 
     n_neg_sample = min(max_majority, n_neg_before)
-    df_neg_sample = df_neg.sample(n=n_neg_sample, random_state=seed)
+    neg_sample = rng.choice(neg_idx, size=n_neg_sample, replace=False)
 
-    df_new = pd.concat([df_pos, df_neg_sample])
-    df_new = df_new.sample(frac=1.0, random_state=seed)
+    idx = np.concatenate([pos_idx, neg_sample])
+    rng.shuffle(idx)
 
     info = {
         "strategy": "rare_events",
         "n_pos_before": int(n_pos_before),
         "n_neg_before": int(n_neg_before),
-        "n_pos_after": int(len(df_pos)),
+        "n_pos_after": int(n_pos_before),
         "n_neg_after": int(n_neg_sample),
     }
 
-    return df_new, info
+    return idx, info
+
+
+def read_parquet_rows(path, indices=None, columns=None):
+    """
+    Lee del parquet solo las filas indicadas (en ese orden).
+
+    Los row groups sin ninguna fila seleccionada no se leen, y las filas
+    descartadas nunca llegan a convertirse a pandas.
+    """
+    if indices is None:
+        return pd.read_parquet(path, columns=columns)
+
+    pf = pq.ParquetFile(path)
+    indices = np.asarray(indices, dtype=np.int64)
+    order = np.argsort(indices, kind="stable")
+    sorted_idx = indices[order]
+
+    rg_sizes = [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)]
+    offsets = np.concatenate([[0], np.cumsum(rg_sizes)])
+
+    tables = []
+    for rg in range(pf.num_row_groups):
+        lo, hi = np.searchsorted(sorted_idx, offsets[rg:rg + 2])
+        if lo == hi:
+            continue
+        t = pf.read_row_group(rg, columns=columns)
+        tables.append(t.take(pa.array(sorted_idx[lo:hi] - offsets[rg])))
+
+    if not tables:
+        return pf.schema_arrow.empty_table().select(columns or pf.schema_arrow.names).to_pandas()
+
+    table = pa.concat_tables(tables)
+
+    # Restaurar el orden solicitado (barajado)
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    table = table.take(pa.array(inverse))
+
+    return table.to_pandas().reset_index(drop=True)
 
 
 def pad_sequences(seqs, max_len, pad_value=0):
@@ -248,10 +299,11 @@ MODEL_FAMILIES = {
 # MAIN
 # ============================================================
 
-def main(variant: str):
+def main(variant: str, force: bool = False):
 
     PHASE = "05_modeling"
     t_start = perf_counter()
+    prof = PhaseProfiler(PHASE)
 
     execution_dir = detect_execution_dir()
     project_root = detect_project_root(execution_dir)
@@ -306,16 +358,34 @@ def main(variant: str):
         / "04_targetengineering_dataset.parquet"
     )
 
-    df = pd.read_parquet(dataset_path)
+    # Huella: dataset F04 + params (con el prediction_name de F04) + código.
+    # Si coincide, no se reentrena.
+    model_dir = variant_root / "models" / prediction_name.lower().replace(" ", "_")
+    fingerprint = phase_fingerprint(
+        SCRIPT_PATH, {**params, "prediction_name": prediction_name}, [dataset_path], project_root
+    )
+    if memo_hit(
+        PHASE, variant_root / f"{PHASE}_metadata.json", fingerprint,
+        [model_dir / "model.h5", model_dir / "model_summary.json"], force,
+    ):
+        return
+
+    # Primero solo las labels: el muestreo decide qué filas se cargan
+    prof.begin("load")
+    labels = pd.read_parquet(dataset_path, columns=["label"])["label"].to_numpy()
 
     imbalance_cfg = params.get("imbalance", {})
-    df, sampler_info = apply_rare_events(df, imbalance_cfg, seed)
+    row_idx, sampler_info = apply_rare_events(labels, imbalance_cfg, seed)
 
     max_samples = params["training"].get("max_samples")
     if imbalance_cfg.get("strategy") != "rare_events":
-        if max_samples is not None and len(df) > max_samples:
-            df = df.sample(n=max_samples, random_state=seed)
+        if max_samples is not None and len(labels) > max_samples:
+            rng = np.random.default_rng(seed)
+            row_idx = rng.choice(len(labels), size=max_samples, replace=False)
+
+    df = read_parquet_rows(dataset_path, row_idx, columns=["OW_events", "label"])
 
+    prof.begin("transform")
     X, y, aux = vectorize_fn(df)
 
     idx = np.arange(len(X))
@@ -354,6 +424,7 @@ def main(variant: str):
     best_hp = None
     trials_summary = []
 
+    prof.begin("train")
     for trial in range(params["automl"]["max_trials"]):
 
         hp = {k: random.choice(v) for k, v in full_space.items()}
@@ -399,6 +470,7 @@ def main(variant: str):
     # --------------------------------------------------
     # Guardar modelo oficial en carpeta estructurada
     # --------------------------------------------------
+    prof.begin("write")
     safe_name = prediction_name.lower().replace(" ", "_")
 
     models_root = variant_root / "models"
@@ -411,6 +483,7 @@ def main(variant: str):
     # --------------------------------------------------
     # Evaluación en test
     # --------------------------------------------------
+    prof.begin("evaluate")
     from sklearn.metrics import confusion_matrix, precision_score, f1_score, recall_score
 
     y_pred_prob = best_model.predict(X_test, verbose=0)
@@ -424,6 +497,7 @@ def main(variant: str):
     # --------------------------------------------------
     # Paths metadata
     # --------------------------------------------------
+    prof.begin("write")
     trace_metadata_path = variant_root / f"{PHASE}_metadata.json"
     functional_metadata_path = model_dir / "model_summary.json"
 
@@ -513,7 +587,8 @@ def main(variant: str):
         params=params,
         metadata_path=trace_metadata_path,
     )
-
+    record_fingerprint(trace_metadata_path, fingerprint)
+    prof.write(trace_metadata_path)
 
     print(f"[DONE] Fase 05 completada en {perf_counter()-t_start:.1f}s")
 
@@ -521,5 +596,10 @@ def main(variant: str):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--variant", required=True)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="reentrenar aunque la huella (dataset F04 + params + código) no haya cambiado",
+    )
     args = parser.parse_args()
-    main(args.variant)
+    main(args.variant, force=args.force)
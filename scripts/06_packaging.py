@@ -51,16 +51,21 @@ from mlops4ofp.tools.run_context import (
 from mlops4ofp.tools.params_manager import ParamsManager
 from mlops4ofp.tools.traceability import write_metadata
 from mlops4ofp.tools.artifacts import get_git_hash
+from mlops4ofp.tools.artifact_store import ArtifactStore
+from mlops4ofp.tools.system_bundle import write_bundle
+from mlops4ofp.tools.profiling import PhaseProfiler
+from mlops4ofp.tools.memo import memo_hit, phase_fingerprint, record_fingerprint
 
 
 # ============================================================
 # Lógica principal
 # ============================================================
 
-def main(variant: str):
+def main(variant: str, force: bool = False):
 
     PHASE = "06_packaging"
     t_start = perf_counter()
+    prof = PhaseProfiler(PHASE)
 
     # --------------------------------------------------
     # Contexto de ejecución
@@ -83,6 +88,10 @@ def main(variant: str):
 
     parent_variants_f05 = params["parent_variants_f05"]
     temporal = params.get("temporal", {})
+    artifact_mode = params.get("artifact_mode", "store")
+
+    if artifact_mode not in ("copy", "store"):
+        raise ValueError(f"artifact_mode no soportado: {artifact_mode}")
 
     if not parent_variants_f05:
         raise ValueError("parent_variants_f05 no puede estar vacío")
@@ -105,6 +114,7 @@ def main(variant: str):
     # --------------------------------------------------
     # Resolver linaje
     # --------------------------------------------------
+    prof.begin("load")
     lineage = {
         "f05": set(parent_variants_f05),
         "f04": set(),
@@ -240,9 +250,31 @@ def main(variant: str):
     print("[INFO] Linaje resuelto:")
     print(json.dumps({k: sorted(v) for k, v in lineage.items()}, indent=2))
 
+    # Huella: modelos F05 + datasets F04 del linaje + params + código.
+    # Si coincide, el paquete existente sigue siendo válido.
+    memo_inputs = []
+    for v05 in sorted(parent_variants_f05):
+        model_root = project_root / "executions" / "05_modeling" / v05 / "models"
+        if model_root.exists():
+            memo_inputs += sorted(f for f in model_root.rglob("*") if f.is_file())
+    for v04 in sorted(lineage["f04"]):
+        memo_inputs.append(
+            project_root / "executions" / "04_targetengineering" / v04
+            / "04_targetengineering_dataset.parquet"
+        )
+    fingerprint = phase_fingerprint(SCRIPT_PATH, params, memo_inputs, project_root)
+    memo_outputs = [variant_root / "models", variant_root / "datasets", variant_root / "objectives.json"]
+    bundle_cfg = params.get("bundle") or {}
+    if bundle_cfg.get("enabled", False):
+        # F07 abre el bundle desde la metadata F06: sin él no hay cache hit
+        memo_outputs.append(variant_root / bundle_cfg.get("file", "system.bundle"))
+    if memo_hit(PHASE, variant_root / f"{PHASE}_metadata.json", fingerprint, memo_outputs, force):
+        return
+
     # --------------------------------------------------
     # Materializar objetivos (F04)
     # --------------------------------------------------
+    prof.begin("transform")
     objectives = {}
 
     for v04 in lineage["f04"]:
@@ -275,6 +307,17 @@ def main(variant: str):
     objectives_path.write_text(json.dumps(objectives, indent=2), encoding="utf-8")
     print(f"[OK] Objetivos materializados")
 
+    # --------------------------------------------------
+    # Store direccionado por contenido (artifact_mode=store)
+    # --------------------------------------------------
+    prof.begin("write")
+    store = None
+    if artifact_mode == "store":
+        store = ArtifactStore(project_root / "executions" / ".store")
+        print(f"[INFO] Artifact store: {store.root}")
+
+    artifacts = []
+
     # --------------------------------------------------
     # Copiar datasets F04 (in/out ya preparados)
     # --------------------------------------------------
@@ -296,7 +339,13 @@ def main(variant: str):
             raise FileNotFoundError(f"No existe dataset F04: {src}")
 
         dst = datasets_dir / f"{v04}__dataset.parquet"
-        shutil.copyfile(src, dst)
+        if store is not None:
+            artifacts.append(store.materialize(src, dst))
+        else:
+            # dst puede ser un hardlink a un blob del store (ejecución previa
+            # con artifact_mode=store): copiar encima escribiría en el blob
+            dst.unlink(missing_ok=True)
+            shutil.copyfile(src, dst)
 
         dataset_paths.append(str(dst))
 
@@ -330,10 +379,12 @@ def main(variant: str):
 
         dst = models_dir / f"{prediction_name}__{src.name}"
 
-        if dst.exists():
-            shutil.rmtree(dst)
-
-        shutil.copytree(src, dst)
+        if store is not None:
+            artifacts.extend(store.materialize_tree(src, dst))
+        else:
+            if dst.exists():
+                shutil.rmtree(dst)
+            shutil.copytree(src, dst)
 
         selected_models.append({
             "source_f05": v05,
@@ -343,9 +394,39 @@ def main(variant: str):
 
     print(f"[OK] {len(selected_models)} modelos copiados")
 
+    if store is not None:
+        store.save()
+        links = {}
+        for a in artifacts:
+            links[a["link"]] = links.get(a["link"], 0) + 1
+        print(f"[OK] Artefactos enlazados desde store: {links}")
+
+    # --------------------------------------------------
+    # Bundle de sistema mmap-able (opcional)
+    # --------------------------------------------------
+    prof.begin("bundle")
+    bundle_info = None
+
+    if bundle_cfg.get("enabled", False):
+        bundle_models = []
+        for sm in selected_models:
+            model_dst = models_dir / f"{sm['prediction_name']}__{sm['model_id']}"
+            summary = json.loads((model_dst / "model_summary.json").read_text())
+            bundle_models.append({
+                "prediction_name": summary["prediction_name"],
+                "vectorization": summary["vectorization"],
+                "threshold": summary.get("threshold", 0.5),
+                "model_path": model_dst / "model.h5",
+            })
+
+        bundle_path = variant_root / bundle_cfg.get("file", "system.bundle")
+        bundle_info = write_bundle(bundle_path, bundle_models)
+        print(f"[OK] Bundle de sistema generado: {bundle_path} ({bundle_info['bytes']} bytes)")
+
     # --------------------------------------------------
     # Metadata F06 + Trazabilidad (ESCRITURA ÚNICA)
     # --------------------------------------------------
+    prof.begin("write")
 
     metadata_path = variant_root / f"{PHASE}_metadata.json"
 
@@ -355,6 +436,9 @@ def main(variant: str):
         "models": selected_models,
         "objectives": list(objectives.keys()),
         "datasets": dataset_paths,
+        "artifact_mode": artifact_mode,
+        "artifacts": artifacts,
+        "system_bundle": bundle_info,
     }
 
     write_metadata(
@@ -367,12 +451,14 @@ def main(variant: str):
             str(models_dir),
             str(datasets_dir),
             str(objectives_path),
-        ],
+        ] + ([bundle_info["path"]] if bundle_info else []),
         params=enriched_params,
         metadata_path=metadata_path,
     )
 
     print("[OK] Metadata completa guardada (incluye models)")
+    record_fingerprint(metadata_path, fingerprint)
+    prof.write(metadata_path)
     print(f"[DONE] F06 completada en {perf_counter() - t_start:.1f}s")
 
 
@@ -383,5 +469,10 @@ def main(variant: str):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fase 06 — Packaging")
     parser.add_argument("--variant", required=True, help="Variante F06 (vNNN)")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="reempaquetar aunque la huella (modelos F05 + datasets F04 + params + código) no haya cambiado",
+    )
     args = parser.parse_args()
-    main(args.variant)
+    main(args.variant, force=args.force)
@@ -7,6 +7,7 @@ Modos:
   --mode prepare   → genera manifest.json
   --mode run       → ejecuta server + cliente + métricas + informe
   --mode server    → arranca servidor Flask
+  --mode replay    → reproduce el stream de eventos F02 tick a tick (Tu)
 """
 
 import argparse
@@ -21,12 +22,12 @@ from datetime import datetime, timezone
 
 import numpy as np
 import pandas as pd
-import requests
 import pyarrow as pa
+import pyarrow.compute
 import pyarrow.parquet as pq
-from flask import Flask, request, jsonify
-import tensorflow as tf
-import matplotlib.pyplot as plt
+
+# TensorFlow, Flask, requests y matplotlib se importan solo en los modos
+# que los usan: prepare y el proceso orquestador no pagan el import de TF.
 
 # ============================================================
 # Bootstrap proyecto
@@ -46,6 +47,13 @@ sys.path.insert(0, str(ROOT))
 from mlops4ofp.tools.params_manager import ParamsManager
 from mlops4ofp.tools.traceability import write_metadata
 from mlops4ofp.tools.run_context import detect_execution_dir, detect_project_root
+from mlops4ofp.tools.vectorization import CompiledVectorizer, flatten_windows, hash_windows
+from mlops4ofp.tools.microbatch import MicroBatcher
+from mlops4ofp.tools.prediction_cache import PredictionCache, hash_rows
+from mlops4ofp.tools.artifact_store import sha256_file
+from mlops4ofp.tools.online_windows import OnlineWindow, WindowGeometry
+from mlops4ofp.tools.parquet_parts import read_dataset_table
+from mlops4ofp.tools.profiling import PhaseProfiler
 
 # ============================================================
 # Utilidades
@@ -56,14 +64,77 @@ def ensure_clean_dir(path: Path):
         shutil.rmtree(path)
     path.mkdir(parents=True, exist_ok=True)
 
-def to_json_safe_window(window):
-    if hasattr(window, "tolist"):
-        return window.tolist()
-    if isinstance(window, (list, tuple)):
-        return list(window)
-    if hasattr(window, "item"):
-        return [window.item()]
-    return [window]
+# ============================================================
+# Transporte Arrow IPC (/infer_batch_arrow)
+# ============================================================
+
+ARROW_STREAM_MIME = "application/vnd.apache.arrow.stream"
+TIMING_HEADER = "X-F07-Timing"
+
+
+def _ipc_bytes(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="lz4")
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_windows_ipc(windows, counts=None) -> bytes:
+    """
+    windows: lista de ventanas o pa.ListArray ya construido.
+    counts: conteo de cada código (ventanas como bolsa, solo dense_bow).
+    """
+    if not isinstance(windows, (pa.Array, pa.ChunkedArray)):
+        windows = pa.array(windows, type=pa.list_(pa.int32()))
+    columns = {"window": windows}
+    if counts is not None:
+        columns["count"] = pa.array(counts, type=pa.list_(pa.int32()))
+    return _ipc_bytes(pa.table(columns))
+
+
+def _flat_list_column(column):
+    """list<int> (Array) → valores aplanados int64."""
+    return column.flatten().to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
+
+
+def decode_windows_ipc(body: bytes):
+    """Devuelve (flat, lengths, counts | None) sin pasar por objetos Python."""
+    table = pa.ipc.open_stream(body).read_all()
+    windows = table.column("window").combine_chunks()
+    flat = _flat_list_column(windows)
+    lengths = (
+        pa.compute.list_value_length(windows)
+        .fill_null(0)
+        .to_numpy(zero_copy_only=False)
+        .astype(np.int64, copy=False)
+    )
+    counts = None
+    if "count" in table.column_names:
+        counts = _flat_list_column(table.column("count").combine_chunks())
+    return flat, lengths, counts
+
+
+SCORE_SUFFIX = ":score"
+
+
+def encode_predictions_ipc(preds: dict, scores: dict) -> bytes:
+    """Por modelo: columna int8 '<name>' y float16 '<name>:score'."""
+    columns = {}
+    for name, y in preds.items():
+        columns[name] = pa.array(np.asarray(y, dtype=np.int8), type=pa.int8())
+        columns[name + SCORE_SUFFIX] = pa.array(
+            np.asarray(scores[name], dtype=np.float16), type=pa.float16()
+        )
+    return _ipc_bytes(pa.table(columns))
+
+
+def decode_predictions_ipc(body: bytes):
+    """Devuelve (nombres de modelo, tabla Arrow)."""
+    table = pa.ipc.open_stream(body).read_all()
+    names = [c for c in table.column_names if not c.endswith(SCORE_SUFFIX)]
+    return names, table
+
 
 def load_manifest(variant_root: Path):
     manifest_path = variant_root / "manifest.json"
@@ -138,23 +209,19 @@ def prepare_variant(variant: str):
         "datasets": datasets,
     }
 
+    bundle_info = f06_metadata.get("params", {}).get("system_bundle")
+    if bundle_info and Path(bundle_info["path"]).exists():
+        manifest["bundle_path"] = bundle_info["path"]
+
     (variant_root / "manifest.json").write_text(json.dumps(manifest, indent=2))
     print("[OK] manifest.json generado")
 
 # ============================================================
-# SERVER MODE (sin cambios)
+# SERVER MODE
 # ============================================================
 
-def run_server(variant: str):
-
-    execution_dir = detect_execution_dir()
-    project_root = detect_project_root(execution_dir)
-
-    pm = ParamsManager("07_deployrun", project_root)
-    pm.set_current(variant)
-    variant_root = pm.current_variant_dir()
-
-    manifest = load_manifest(variant_root)
+def load_models_from_dirs(manifest):
+    import tensorflow as tf
 
     loaded_models = []
 
@@ -166,67 +233,707 @@ def run_server(variant: str):
         loaded_models.append({
             "prediction_name": summary["prediction_name"],
             "model": model,
+            "model_sha256": sha256_file(model_dir / m["model_h5"]),
             "vectorization": summary["vectorization"],
             "threshold": summary.get("threshold", 0.5),
         })
 
-    app = Flask(__name__)
+    return loaded_models
+
+
+def load_models_from_bundle(bundle_path: Path):
+    """
+    Carga los modelos desde el bundle F06 (mmap). El vocabulario llega
+    como vista NumPy; solo el .h5 se deserializa (h5py sobre memoria).
+    """
+    import hashlib
+    import io
+    import h5py
+    import tensorflow as tf
+    from mlops4ofp.tools.system_bundle import SystemBundle
+
+    t0 = time.perf_counter()
+    bundle = SystemBundle(bundle_path)
+    t_mmap = time.perf_counter() - t0
+
+    loaded_models = []
+
+    for bm in bundle.models:
+        with h5py.File(io.BytesIO(bm.model_bytes), "r") as h5:
+            model = tf.keras.models.load_model(h5)
+
+        vectorization = {
+            "vectorization": bm.vectorization,
+            "vocab": bm.vocab,
+            "lookup": bm.lookup,
+            "input_dim": bm.input_dim,
+            "max_len": bm.max_len,
+        }
+
+        loaded_models.append({
+            "prediction_name": bm.prediction_name,
+            "model": model,
+            "model_sha256": hashlib.sha256(bm.model_bytes).hexdigest(),
+            "vectorization": vectorization,
+            "threshold": bm.threshold,
+        })
+
+    print(
+        f"[SERVER] Bundle cargado: {bundle_path} "
+        f"(mmap {t_mmap * 1000:.2f} ms, total {(time.perf_counter() - t0) * 1000:.1f} ms)",
+        flush=True,
+    )
+    return loaded_models
 
-    def vectorize_batch(windows, config):
-
-        if config["vectorization"] == "dense_bow":
-            vocab = config["vocab"]
-            index = {ev: i for i, ev in enumerate(vocab)}
-            X = np.zeros((len(windows), config["input_dim"]), dtype=np.float32)
-            for i, window in enumerate(windows):
-                for ev in window:
-                    if ev in index:
-                        X[i, index[ev]] += 1.0
-            return X
-
-        if config["vectorization"] == "sequence":
-            vocab = config["vocab"]
-            index = {ev: i + 1 for i, ev in enumerate(vocab)}
-            max_len = config["max_len"]
-            X = np.zeros((len(windows), max_len), dtype=np.int32)
-            for i, window in enumerate(windows):
-                seq = [index[e] for e in window if e in index]
-                seq = seq[-max_len:]
-                if len(seq) > 0:
-                    X[i, -len(seq):] = seq
-            return X
-
-        raise ValueError("Vectorization no soportada")
+def load_server_models(variant: str, runtime: dict):
+
+    execution_dir = detect_execution_dir()
+    project_root = detect_project_root(execution_dir)
+
+    pm = ParamsManager("07_deployrun", project_root)
+    pm.set_current(variant)
+    variant_root = pm.current_variant_dir()
+
+    manifest = load_manifest(variant_root)
+
+    # Evitar sobresuscripción de cores con varios workers
+    intra_op = runtime.get("intra_op_threads")
+    if intra_op:
+        import tensorflow as tf
+
+        tf.config.threading.set_intra_op_parallelism_threads(int(intra_op))
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    if manifest.get("bundle_path"):
+        loaded_models = load_models_from_bundle(Path(manifest["bundle_path"]))
+    else:
+        loaded_models = load_models_from_dirs(manifest)
+
+    # Vectorización precompilada (lookup id → columna) una vez por modelo
+    for m in loaded_models:
+        m["vectorizer"] = CompiledVectorizer.from_config(m["vectorization"])
+        m["model_id"] = f"{m['prediction_name']}@{m['model_sha256'][:16]}"
+
+    return loaded_models
+
+
+def load_runtime_params(variant: str) -> dict:
+    import yaml
+
+    execution_dir = detect_execution_dir()
+    project_root = detect_project_root(execution_dir)
+
+    pm = ParamsManager("07_deployrun", project_root)
+    pm.set_current(variant)
+    params = yaml.safe_load((pm.current_variant_dir() / "params.yaml").read_text())
+    return params
+
+
+def create_app(variant: str, runtime: dict):
+    """
+    Crea la app Flask. Los modelos se cargan en un hilo de fondo y
+    /health informa del estado (loading | ready | error).
+    """
+    import os
+    import threading
+    from flask import Flask, Response, request, jsonify
+
+    loaded_models = []
+    state = {
+        "status": "loading",
+        "pid": os.getpid(),
+        "models": [],
+        "error": None,
+        "load_seconds": None,
+    }
+
+    def _load():
+        t0 = time.perf_counter()
+        try:
+            loaded_models.extend(load_server_models(variant, runtime))
+            state["models"] = [m["prediction_name"] for m in loaded_models]
+            state["status"] = "ready"
+        except Exception as e:
+            traceback.print_exc()
+            state["status"] = "error"
+            state["error"] = repr(e)
+        state["load_seconds"] = round(time.perf_counter() - t0, 3)
+        print(f"[SERVER] pid={state['pid']} estado={state['status']} "
+              f"({state['load_seconds']}s)", flush=True)
+
+    threading.Thread(target=_load, daemon=True).start()
+
+    # Caché LRU de predicciones (por proceso worker)
+    cache_cfg = runtime.get("prediction_cache") or {}
+    cache = None
+    cache_path = None
+    if cache_cfg.get("enabled", False):
+        import atexit
+
+        cache = PredictionCache(max_entries=cache_cfg.get("max_entries", 100_000))
+        if cache_cfg.get("persist", False):
+            execution_dir = detect_execution_dir()
+            pm = ParamsManager("07_deployrun", detect_project_root(execution_dir))
+            pm.set_current(variant)
+            cache_path = pm.current_variant_dir() / "prediction_cache.npz"
+            n = cache.load(cache_path)
+            print(f"[SERVER] Caché de predicciones: {n} entradas cargadas", flush=True)
+            atexit.register(cache.save, cache_path)
+
+    def predict_model(m, X_batch, timing):
+        """predict de un modelo; con caché solo para filas no vistas (y únicas)."""
+        name = m["prediction_name"]
+        if cache is None:
+            t0 = time.perf_counter()
+            y_probs = m["model"].predict(X_batch, verbose=0).flatten()
+            timing["predict_ms"][name] = (time.perf_counter() - t0) * 1000.0
+            return y_probs
+
+        t0 = time.perf_counter()
+        keys = hash_rows(X_batch)
+        y_probs, hit = cache.lookup(m["model_id"], keys)
+        miss = np.flatnonzero(~hit)
+        t1 = time.perf_counter()
+
+        if len(miss):
+            miss_keys, first, inverse = np.unique(
+                keys[miss], return_index=True, return_inverse=True
+            )
+            probs = m["model"].predict(X_batch[miss[first]], verbose=0).flatten()
+            y_probs[miss] = probs[inverse]
+            cache.store(m["model_id"], miss_keys, probs)
+
+        timing["cache_ms"][name] = (t1 - t0) * 1000.0
+        timing["cache_hits"][name] = int(len(keys) - len(miss))
+        timing["predict_ms"][name] = (time.perf_counter() - t1) * 1000.0
+        return y_probs
+
+    def predict_all(flat, lengths, counts=None):
+        """
+        Una vectorización + predict por modelo para todo el lote.
+        Devuelve probabilidades; el umbral se aplica al responder.
+        Con counts, cada ventana llega como bolsa (código, conteo).
+        """
+        probs = {}
+        timing = {"vectorize_ms": {}, "predict_ms": {}}
+        if cache is not None:
+            timing.update({"cache_ms": {}, "cache_hits": {}})
+        for m in loaded_models:
+            name = m["prediction_name"]
+            t0 = time.perf_counter()
+            X_batch = m["vectorizer"].from_flat(flat, lengths, counts)
+            timing["vectorize_ms"][name] = (time.perf_counter() - t0) * 1000.0
+            probs[name] = predict_model(m, X_batch, timing)
+        return probs, timing
+
+    mb_cfg = runtime.get("micro_batching") or {}
+    batcher = None
+    if mb_cfg.get("enabled", False):
+        batcher = MicroBatcher(
+            predict_all,
+            max_batch_size=mb_cfg.get("max_batch_size", 512),
+            max_wait_ms=mb_cfg.get("max_wait_ms", 5.0),
+        )
+
+    def predict_flat(flat, lengths, counts=None):
+        """Devuelve (y_pred int8, score, timing) por modelo."""
+        if batcher is not None:
+            probs, timing = batcher.submit(flat, lengths, counts)
+        else:
+            probs, timing = predict_all(flat, lengths, counts)
+            timing = {**timing, "queue_ms": 0.0, "batch_windows": len(lengths)}
+        preds = {
+            m["prediction_name"]: (probs[m["prediction_name"]] >= m["threshold"]).astype(np.int8)
+            for m in loaded_models
+        }
+        return preds, probs, timing
+
+    def with_timing(resp, timing, t_request, t_serialize):
+        t_end = time.perf_counter()
+        timing["serialize_ms"] = (t_end - t_serialize) * 1000.0
+        timing["server_ms"] = (t_end - t_request) * 1000.0
+        resp.headers[TIMING_HEADER] = json.dumps(timing, separators=(",", ":"))
+        return resp
+
+    def bag_error():
+        """Ventanas como bolsa: todos los modelos deben ser dense_bow."""
+        kinds = {m["vectorizer"].kind for m in loaded_models}
+        if kinds - {"dense_bow"}:
+            return jsonify({"error": f"counts requiere modelos dense_bow: {sorted(kinds)}"}), 400
+        return None
+
+    app = Flask(__name__)
 
     @app.route("/", methods=["GET"])
+    def root():
+        info = {"status": state["status"], "models": len(loaded_models)}
+        if batcher is not None:
+            info["micro_batching"] = batcher.stats()
+        if cache is not None:
+            info["prediction_cache"] = cache.stats()
+        return jsonify(info)
+
+    @app.route("/health", methods=["GET"])
     def health():
-        return jsonify({"status": "ready", "models": len(loaded_models)})
+        code = 200 if state["status"] == "ready" else 503
+        return jsonify(state), code
 
     @app.route("/infer_batch", methods=["POST"])
     def infer_batch():
 
+        if state["status"] != "ready":
+            return jsonify({"error": f"server {state['status']}"}), 503
+
+        t_request = time.perf_counter()
         windows = request.json["windows"]
-        batch_results = []
+        counts = request.json.get("counts")
+        if counts is not None:
+            error = bag_error()
+            if error:
+                return error
+            counts = flatten_windows(counts)[0]
+        preds, scores, timing = predict_flat(*flatten_windows(windows), counts)
+
+        t_serialize = time.perf_counter()
+        batch_results = [{"window": window, "results": []} for window in windows]
 
         for m in loaded_models:
+            name = m["prediction_name"]
+            y_preds = preds[name].tolist()
+            y_scores = scores[name].tolist()
+            for i in range(len(windows)):
+                batch_results[i]["results"].append({
+                    "prediction_name": name,
+                    "y_pred": y_preds[i],
+                    "score": y_scores[i],
+                })
 
-            X_batch = vectorize_batch(windows, m["vectorization"])
-            y_probs = m["model"].predict(X_batch, verbose=0).flatten()
-            y_preds = (y_probs >= m["threshold"]).astype(int)
+        return with_timing(jsonify({"results": batch_results}), timing, t_request, t_serialize)
+
+    @app.route("/infer_batch_arrow", methods=["POST"])
+    def infer_batch_arrow():
+        """
+        Entrada: stream Arrow IPC con columna 'window' list<int32> y,
+        opcionalmente, 'count' list<int32> (ventanas como bolsa).
+        Salida: stream Arrow IPC con, por modelo, una columna int8 (clase)
+        y otra float16 '<name>:score' (probabilidad), sin eco.
+        """
+        if state["status"] != "ready":
+            return jsonify({"error": f"server {state['status']}"}), 503
+
+        t_request = time.perf_counter()
+        flat, lengths, counts = decode_windows_ipc(request.get_data())
+        if counts is not None:
+            error = bag_error()
+            if error:
+                return error
+        preds, scores, timing = predict_flat(flat, lengths, counts)
+
+        t_serialize = time.perf_counter()
+        body = encode_predictions_ipc(preds, scores)
+        return with_timing(
+            Response(body, mimetype=ARROW_STREAM_MIME), timing, t_request, t_serialize
+        )
 
-            for i, window in enumerate(windows):
+    return app
 
-                if len(batch_results) <= i:
-                    batch_results.append({"window": window, "results": []})
 
-                batch_results[i]["results"].append({
-                    "prediction_name": m["prediction_name"],
-                    "y_pred": int(y_preds[i]),
-                })
+def serve_gunicorn(variant: str, runtime: dict, host: str, port: int):
+    """
+    Servidor de producción: N procesos worker (cada uno con sus modelos
+    cargados) y M hilos por worker.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class F07Application(BaseApplication):
+
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Se ejecuta en cada worker (preload_app=False)
+            return create_app(variant, runtime)
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": int(runtime.get("workers", 1)),
+        "threads": int(runtime.get("threads", 1)),
+        "timeout": int(runtime.get("timeout", 120)),
+        "preload_app": False,
+        "accesslog": None,
+    }
+    print(f"[SERVER] gunicorn {options}", flush=True)
+    F07Application(options).run()
+
+
+def run_server(variant: str):
+
+    params = load_runtime_params(variant)
+    runtime = params.get("runtime") or {}
+
+    host = runtime.get("host", "127.0.0.1")
+    port = int(runtime.get("port", 5005))
+    server = runtime.get("server", "flask")
+
+    if server == "gunicorn":
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("[WARN] gunicorn no disponible; se usa el servidor Flask", flush=True)
+            server = "flask"
+
+    if server == "gunicorn":
+        serve_gunicorn(variant, runtime, host, port)
+    elif server == "flask":
+        import signal
+
+        # SIGTERM del orquestador → salida ordenada (atexit: caché persistente)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        app = create_app(variant, runtime)
+        app.run(host=host, port=port, threaded=True)
+    else:
+        raise ValueError(f"runtime.server no soportado: {server}")
+
+# ============================================================
+# CLIENTE (lotes concurrentes, escritura en orden)
+# ============================================================
+
+def start_server(variant: str, runtime: dict):
+    """
+    Lanza el servidor en un subproceso y espera a /health (modelos cargados).
+    Devuelve (proceso, base_url).
+    """
+    import requests
+
+    server_proc = subprocess.Popen(
+        [sys.executable, __file__, "--variant", variant, "--mode", "server"]
+    )
+
+    host = runtime.get("host", "127.0.0.1")
+    port = int(runtime.get("port", 5005))
+    base_url = f"http://{host}:{port}"
+
+    # Esperar servidor (readiness: modelos cargados)
+    startup_timeout = float(runtime.get("startup_timeout", 120))
+    t_wait = time.perf_counter()
+    while True:
+        try:
+            resp = requests.get(f"{base_url}/health", timeout=5)
+            if resp.status_code == 200:
+                break
+            # 503 con status=error: la carga de modelos falló, no esperar más
+            health = resp.json()
+            if health.get("status") == "error":
+                server_proc.terminate()
+                server_proc.wait()
+                raise RuntimeError(
+                    f"El servidor no pudo cargar los modelos: {health.get('error')}"
+                )
+        except (requests.RequestException, ValueError):
+            pass
+        if server_proc.poll() is not None:
+            raise RuntimeError("El servidor terminó durante el arranque")
+        if time.perf_counter() - t_wait > startup_timeout:
+            server_proc.terminate()
+            raise RuntimeError("Servidor no respondió")
+        time.sleep(0.5)
+
+    return server_proc, base_url
+
+
+def make_session_factory(pool_size: int):
+    """Una requests.Session con pool de conexiones por hilo del cliente."""
+    import threading
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    local = threading.local()
+
+    def get_session():
+        session = getattr(local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            local.session = session
+        return session
+
+    return get_session
+
+
+def infer_remote(session, base_url: str, transport: str, flat, lengths):
+    """
+    Envía un lote de ventanas aplanadas (flat, lengths).
+    Las respuestas llegan en el orden del lote (alineación por posición).
+    Devuelve ({modelo: y_pred}, {modelo: score}, tiempos cliente + servidor en ms).
+    """
+    t0 = time.perf_counter()
+
+    if transport == "arrow":
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+        windows = pa.ListArray.from_arrays(
+            pa.array(offsets), pa.array(flat.astype(np.int32, copy=False))
+        )
+        body = encode_windows_ipc(windows)
+        t1 = time.perf_counter()
+        resp = session.post(
+            f"{base_url}/infer_batch_arrow",
+            data=body,
+            headers={"Content-Type": ARROW_STREAM_MIME},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        t2 = time.perf_counter()
+
+        names, table = decode_predictions_ipc(resp.content)
+        preds = {n: table.column(n).to_numpy() for n in names}
+        scores = {n: table.column(n + SCORE_SUFFIX).to_numpy() for n in names}
+
+    else:
+        windows = [w.tolist() for w in np.split(flat, np.cumsum(lengths)[:-1])] if len(lengths) else []
+        body = json.dumps({"windows": windows}, separators=(",", ":"))
+        t1 = time.perf_counter()
+        resp = session.post(
+            f"{base_url}/infer_batch",
+            data=body,
+            headers={"Content-Type": "application/json"},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        t2 = time.perf_counter()
+
+        results = resp.json()["results"]
+        names = [r["prediction_name"] for r in results[0]["results"]] if results else []
+        preds, scores = {}, {}
+        for k, name in enumerate(names):
+            preds[name] = np.fromiter(
+                (item["results"][k]["y_pred"] for item in results), dtype=np.int8, count=len(results)
+            )
+            scores[name] = np.fromiter(
+                (item["results"][k]["score"] for item in results), dtype=np.float32, count=len(results)
+            )
+
+    t3 = time.perf_counter()
+
+    timing = {
+        "client_ms": (t3 - t0) * 1000.0,
+        "encode_ms": (t1 - t0) * 1000.0,
+        "roundtrip_ms": (t2 - t1) * 1000.0,
+        "decode_ms": (t3 - t2) * 1000.0,
+        "server": json.loads(resp.headers.get(TIMING_HEADER, "{}")),
+    }
+    return preds, scores, timing
+
+
+# ============================================================
+# Log de predicciones (columnar) y métricas incrementales
+# ============================================================
+
+PREDICTION_LOG_SCHEMA = pa.schema([
+    ("window_id", pa.int32()),
+    ("prediction_name", pa.dictionary(pa.int16(), pa.string())),
+    ("y_pred", pa.int8()),
+    ("score", pa.float16()),
+])
+
+
+def prediction_log_table(window_ids, preds: dict, scores: dict) -> pa.Table:
+    """Filas largas (window_id, modelo, y_pred, score) de un lote."""
+    names = list(preds)
+    n = len(window_ids)
+    model = pa.DictionaryArray.from_arrays(
+        pa.array(np.repeat(np.arange(len(names), dtype=np.int16), n)),
+        pa.array(names, type=pa.string()),
+    )
+    return pa.table({
+        "window_id": pa.array(np.tile(np.asarray(window_ids, dtype=np.int32), len(names))),
+        "prediction_name": model,
+        "y_pred": pa.array(np.concatenate([preds[m] for m in names]).astype(np.int8)) if names
+        else pa.array([], type=pa.int8()),
+        "score": pa.array(np.concatenate([scores[m] for m in names]).astype(np.float16)) if names
+        else pa.array([], type=pa.float16()),
+    }, schema=PREDICTION_LOG_SCHEMA)
+
+
+def export_prediction_log_csv(parquet_path: Path, csv_path: Path):
+    """raw_predictions.parquet → CSV sin cargarlo entero en memoria."""
+    pf = pq.ParquetFile(parquet_path)
+    for k in range(pf.num_row_groups):
+        df = pf.read_row_group(k).to_pandas()
+        df.to_csv(csv_path, mode="w" if k == 0 else "a", header=(k == 0), index=False)
+    print(f"[OK] Log exportado a CSV: {csv_path}")
+
+
+class StreamingConfusion:
+    """
+    Matriz de confusión por modelo acumulada lote a lote.
+
+    Cada dataset se resume antes de enviar nada como conteos de etiquetas
+    por window_id (neg[w], pos[w]); al llegar un lote basta con sumar esos
+    conteos según y_pred, sin releer el log ni los datasets.
+    """
+
+    def __init__(self):
+        self._labels = {}    # modelo → (neg, pos) por window_id
+        self.counts = {}     # modelo → [TN, FP, FN, TP]
+
+    @staticmethod
+    def label_counts(window_ids, labels, n_windows: int):
+        ok = window_ids >= 0
+        pos = np.bincount(window_ids[ok], weights=labels[ok], minlength=n_windows)
+        total = np.bincount(window_ids[ok], minlength=n_windows)
+        return (total - pos).astype(np.int64), pos.astype(np.int64)
+
+    def add_model(self, name: str, neg: np.ndarray, pos: np.ndarray) -> None:
+        self._labels[name] = (neg, pos)
+        self.counts[name] = np.zeros(4, dtype=np.int64)
+
+    def update(self, name: str, window_ids, y_pred) -> None:
+        if name not in self._labels:
+            return
+        neg, pos = self._labels[name]
+        y1 = np.asarray(y_pred) == 1
+        n, p = neg[window_ids], pos[window_ids]
+        self.counts[name] += [n[~y1].sum(), n[y1].sum(), p[~y1].sum(), p[y1].sum()]
+
+    def rows(self) -> list:
+        out = []
+        for name, (tn, fp, fn, tp) in self.counts.items():
+            tn, fp, fn, tp = int(tn), int(fp), int(fn), int(tp)
+            precision = tp / (tp + fp) if (tp + fp) else 0
+            recall = tp / (tp + fn) if (tp + fn) else 0
+            f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0
+            out.append({
+                "prediction_name": name,
+                "tp": tp,
+                "tn": tn,
+                "fp": fp,
+                "fn": fn,
+                "precision": precision,
+                "recall": recall,
+                "f1": f1,
+            })
+        return out
+
+
+def load_windows_dataset(path, sample_size=None, windows: bool = True):
+    """
+    Lee OW_events/label de un dataset F04 como (flat, lengths, labels)
+    sin objetos Python por ventana. windows=False solo lee las etiquetas.
+    """
+    columns = ["OW_events", "label"] if windows else ["label"]
+    table = pq.read_table(path, columns=columns)
+    if sample_size:
+        table = table.slice(0, int(sample_size))
+
+    labels = table.column("label").to_numpy().astype(np.int64)
+    if not windows:
+        return None, None, labels
+
+    ow = table.column("OW_events").combine_chunks()
+    flat = ow.flatten().to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
+    lengths = (
+        pa.compute.list_value_length(ow).fill_null(0)
+        .to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
+    )
+    return flat, lengths, labels
+
 
-        return jsonify({"results": batch_results})
+def take_windows(flat, lengths, rows):
+    """Subconjunto de ventanas aplanadas (en el orden de rows)."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    sel_lengths = lengths[rows]
+    sel_starts = np.repeat(offsets[rows] - np.cumsum(sel_lengths) + sel_lengths, sel_lengths)
+    return flat[sel_starts + np.arange(int(sel_lengths.sum()))], sel_lengths
+
+
+def lookup_window_ids(u_hashes, hashes):
+    """window_id de cada hash en u_hashes (ordenado); -1 si no está."""
+    pos = np.searchsorted(u_hashes, hashes)
+    pos_c = np.minimum(pos, len(u_hashes) - 1)
+    found = (len(u_hashes) > 0) & (u_hashes[pos_c] == hashes)
+    return np.where(found, pos_c, -1)
+
+
+def latency_rows(batch_idx: int, n_windows: int, t_start: float, t_end: float, timing: dict):
+    """Filas largas (stage, model, ms) de un lote para latency.parquet."""
+    base = {
+        "batch_idx": batch_idx,
+        "n_windows": n_windows,
+        "t_start_s": t_start,
+        "t_end_s": t_end,
+    }
+    rows = [
+        {**base, "side": "client", "stage": "total", "model": None, "ms": timing["client_ms"]},
+        {**base, "side": "client", "stage": "encode", "model": None, "ms": timing["encode_ms"]},
+        {**base, "side": "client", "stage": "roundtrip", "model": None, "ms": timing["roundtrip_ms"]},
+        {**base, "side": "client", "stage": "decode", "model": None, "ms": timing["decode_ms"]},
+    ]
+
+    server = timing.get("server") or {}
+    for stage in ("server_ms", "queue_ms", "serialize_ms"):
+        if stage in server:
+            rows.append({
+                **base, "side": "server", "stage": stage.replace("_ms", "").replace("server", "total"),
+                "model": None, "ms": server[stage],
+            })
+    for stage in ("vectorize_ms", "cache_ms", "predict_ms"):
+        for model, ms in (server.get(stage) or {}).items():
+            rows.append({
+                **base, "side": "server", "stage": stage.replace("_ms", ""),
+                "model": model, "ms": ms,
+            })
+    return rows
+
+
+def summarize_latency(lat_df: pd.DataFrame) -> pd.DataFrame:
+    """Percentiles p50/p95/p99/max por (side, stage, model)."""
+    keys = ["side", "stage", "model"]
+    grouped = lat_df.fillna({"model": "-"}).groupby(keys, sort=False)["ms"]
+    summary = grouped.agg(
+        count="count",
+        mean="mean",
+        p50=lambda x: x.quantile(0.50),
+        p95=lambda x: x.quantile(0.95),
+        p99=lambda x: x.quantile(0.99),
+        max="max",
+    )
+    return summary.reset_index()
+
+
+def run_in_flight(send, write, n_batches: int, max_in_flight: int):
+    """
+    Mantiene hasta max_in_flight lotes en vuelo con un pool de hilos.
+    Las respuestas llegan desordenadas; write(idx, result) se llama en orden.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    next_to_send = 0
+    next_to_write = 0
+    pending = {}
+    done_buf = {}
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while next_to_write < n_batches:
+            while next_to_send < n_batches and len(pending) < max_in_flight:
+                pending[pool.submit(send, next_to_send)] = next_to_send
+                next_to_send += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                done_buf[pending.pop(fut)] = fut.result()
+
+            while next_to_write in done_buf:
+                write(next_to_write, done_buf.pop(next_to_write))
+                next_to_write += 1
 
-    app.run(host="127.0.0.1", port=5005)
 
 # ============================================================
 # RUN MODE (OPTIMIZADO)
@@ -234,6 +941,7 @@ def run_server(variant: str):
 
 def run_orchestrator(variant: str):
 
+    prof = PhaseProfiler("07_deployrun")
     execution_dir = detect_execution_dir()
     project_root = detect_project_root(execution_dir)
 
@@ -261,25 +969,17 @@ def run_orchestrator(variant: str):
     ensure_clean_dir(report_dir)
     figures_dir.mkdir(parents=True, exist_ok=True)
 
-    # Lanzar servidor
-    server_proc = subprocess.Popen(
-        [sys.executable, __file__, "--variant", variant, "--mode", "server"]
-    )
+    runtime = params.get("runtime") or {}
+    transport = runtime.get("transport", "json")
+    if transport not in ("json", "arrow"):
+        raise ValueError(f"runtime.transport no soportado: {transport}")
+    max_in_flight = max(1, int(runtime.get("max_in_flight", 4)))
+    client_session = make_session_factory(max_in_flight)
 
-    base_url = "http://127.0.0.1:5005"
-
-    # Esperar servidor
-    for _ in range(60):
-        try:
-            if requests.get(f"{base_url}/").status_code == 200:
-                break
-        except:
-            time.sleep(0.5)
-    else:
-        raise RuntimeError("Servidor no respondió")
+    prof.begin("startup")
+    server_proc, base_url = start_server(variant, runtime)
 
     raw_path_parquet = logs_dir / "raw_predictions.parquet"
-    raw_path_csv = logs_dir / "raw_predictions.csv"
 
     parquet_writer = None
 
@@ -288,127 +988,154 @@ def run_orchestrator(variant: str):
         # NUEVO: UNA SOLA PASADA CON VENTANAS ÚNICAS
         # ============================================================
 
+        prof.begin("load")
         base_dataset = manifest["datasets"][0]
-        df = pd.read_parquet(base_dataset["dataset_path"])
+        flat, lengths, base_labels = load_windows_dataset(base_dataset["dataset_path"], sample_size)
 
-        if sample_size:
-            df = df.head(sample_size)
+        print(f"[INFO] Dataset base: {len(lengths)} filas")
 
-        print(f"[INFO] Dataset base: {len(df)} filas")
-
-        df["window"] = df["OW_events"].apply(
-            lambda w: json.dumps(
-                to_json_safe_window(w),
-                separators=(",", ":"),
-                ensure_ascii=False,
-            )
+        # Clave entera por ventana (hash de 64 bits, calculado una vez):
+        # window_id = posición en u_hashes (ordenado → join por searchsorted)
+        u_hashes, first, base_window_ids = np.unique(
+            hash_windows(flat, lengths), return_index=True, return_inverse=True
         )
+        u_flat, u_lengths = take_windows(flat, lengths, first)
+        u_offsets = np.zeros(len(u_lengths) + 1, dtype=np.int64)
+        np.cumsum(u_lengths, out=u_offsets[1:])
+        n_unique = len(u_lengths)
+        print(f"[INFO] Ventanas únicas detectadas: {n_unique}")
+
+        pd.DataFrame({
+            "window_id": np.arange(n_unique, dtype=np.int32),
+            "window_hash": u_hashes,
+            "first_row": first,
+        }).to_parquet(logs_dir / "window_index.parquet", index=False)
+
+        # ------------------------------------------------------------
+        # Métricas incrementales: etiquetas por window_id de cada dataset
+        # (dataset base: alineación directa; resto: join entero por hash)
+        # ------------------------------------------------------------
+        confusion = StreamingConfusion()
+        label_counts = {}
+        for m in manifest["models"]:
+            dataset_path = m["dataset_path"]
+            if dataset_path not in label_counts:
+                if dataset_path == base_dataset["dataset_path"]:
+                    window_ids, labels = base_window_ids, base_labels
+                else:
+                    d_flat, d_lengths, labels = load_windows_dataset(dataset_path, sample_size)
+                    window_ids = lookup_window_ids(u_hashes, hash_windows(d_flat, d_lengths))
+                label_counts[dataset_path] = StreamingConfusion.label_counts(
+                    window_ids, labels, n_unique
+                )
+            confusion.add_model(m["prediction_name"], *label_counts[dataset_path])
 
-        unique_windows = df["window"].unique()
-        print(f"[INFO] Ventanas únicas detectadas: {len(unique_windows)}")
-
-        for i in range(0, len(unique_windows), batch_size):
+        n_batches = (n_unique + batch_size - 1) // batch_size
 
-            batch_json = unique_windows[i:i + batch_size]
-            batch_windows = [json.loads(w) for w in batch_json]
+        latency = []
+        cache_hits = []
 
-            resp = requests.post(
-                f"{base_url}/infer_batch",
-                json={"windows": batch_windows},
-                timeout=120,
+        def send(batch_idx):
+            i = batch_idx * batch_size
+            j = min(i + batch_size, n_unique)
+            t_start = time.perf_counter() - t_client
+            preds, scores, timing = infer_remote(
+                client_session(), base_url, transport,
+                u_flat[u_offsets[i]:u_offsets[j]], u_lengths[i:j],
             )
-            resp.raise_for_status()
+            t_end = time.perf_counter() - t_client
+            latency.extend(latency_rows(batch_idx, j - i, t_start, t_end, timing))
+            cache_hits.extend((timing["server"].get("cache_hits") or {}).items())
+            return preds, scores
 
-            data = resp.json()
+        def write(batch_idx, result):
+            nonlocal parquet_writer
 
-            rows = []
+            preds, scores = result
+            i = batch_idx * batch_size
+            window_ids = np.arange(i, min(i + batch_size, n_unique))
 
-            for item in data["results"]:
-                window_json = json.dumps(
-                    item["window"], separators=(",", ":"), ensure_ascii=False
-                )
-                for r in item["results"]:
-                    rows.append({
-                        "window": window_json,
-                        "prediction_name": r["prediction_name"],
-                        "y_pred": r["y_pred"],
-                    })
-
-            batch_df = pd.DataFrame(rows)
-
-            table = pa.Table.from_pandas(batch_df, preserve_index=False)
             if parquet_writer is None:
-                parquet_writer = pq.ParquetWriter(raw_path_parquet, table.schema)
-            parquet_writer.write_table(table)
+                parquet_writer = pq.ParquetWriter(
+                    raw_path_parquet, PREDICTION_LOG_SCHEMA, compression="zstd"
+                )
+            parquet_writer.write_table(prediction_log_table(window_ids, preds, scores))
 
-            if not raw_path_csv.exists():
-                batch_df.to_csv(raw_path_csv, index=False)
-            else:
-                batch_df.to_csv(raw_path_csv, mode="a", header=False, index=False)
+            for name, y in preds.items():
+                confusion.update(name, window_ids, y)
 
             if i % (batch_size * 10) == 0:
-                print(f"[RUN] Ventanas únicas procesadas: {i}/{len(unique_windows)}")
+                print(f"[RUN] Ventanas únicas procesadas: {i}/{n_unique}")
+
+        prof.begin("inference")
+        t_client = time.perf_counter()
+        run_in_flight(send, write, n_batches, max_in_flight)
+        client_seconds = time.perf_counter() - t_client
+        print(
+            f"[RUN] {n_batches} lotes en {client_seconds:.1f}s "
+            f"(max_in_flight={max_in_flight})"
+        )
 
-        if parquet_writer:
-            parquet_writer.close()
+        prof.begin("write")
+        lat_df = pd.DataFrame(latency)
+        lat_df.to_parquet(metrics_dir / "latency.parquet", index=False)
 
-        raw_df = pd.read_parquet(raw_path_parquet)
+        cache_summary = None
+        if cache_hits:
+            hits = pd.DataFrame(cache_hits, columns=["model", "hits"]).groupby("model")["hits"].sum()
+            cache_summary = {
+                model: f"{int(h)}/{n_unique}" for model, h in hits.items()
+            }
+            print(f"[INFO] Aciertos caché servidor por modelo: {cache_summary}", flush=True)
 
     finally:
+        if parquet_writer:
+            parquet_writer.close()
         server_proc.terminate()
         server_proc.wait()
 
     # ============================================================
-    # MÉTRICAS (sin cambios)
+    # MÉTRICAS (acumuladas lote a lote, sin releer el log)
     # ============================================================
 
-    metrics = []
-
-    for m in manifest["models"]:
-
-        pred_name = m["prediction_name"]
-        dataset_path = m["dataset_path"]
-
-        df = pd.read_parquet(dataset_path)
-        if sample_size:
-            df = df.head(sample_size)
-
-        df["window"] = df["OW_events"].apply(
-            lambda w: json.dumps(
-                to_json_safe_window(w),
-                separators=(",", ":"),
-                ensure_ascii=False,
-            )
-        )
-
-        model_log = raw_df[raw_df["prediction_name"] == pred_name][["window", "y_pred"]]
-        merged = df.merge(model_log, on="window", how="left")
-
-        valid = merged[merged["y_pred"].notna()].copy()
-        valid["y_pred"] = valid["y_pred"].astype(int)
+    metrics_df = pd.DataFrame(confusion.rows())
+    metrics_df.to_csv(metrics_dir / "metrics_per_model.csv", index=False)
 
-        tp = ((valid["label"] == 1) & (valid["y_pred"] == 1)).sum()
-        tn = ((valid["label"] == 0) & (valid["y_pred"] == 0)).sum()
-        fp = ((valid["label"] == 0) & (valid["y_pred"] == 1)).sum()
-        fn = ((valid["label"] == 1) & (valid["y_pred"] == 0)).sum()
+    # Exportación CSV opcional (post-proceso, en streaming por row group)
+    if (params.get("prediction_log") or {}).get("export_csv", False):
+        export_prediction_log_csv(raw_path_parquet, logs_dir / "raw_predictions.csv")
 
-        precision = tp / (tp + fp) if (tp + fp) else 0
-        recall = tp / (tp + fn) if (tp + fn) else 0
-        f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0
+    # ============================================================
+    # LATENCIA Y THROUGHPUT
+    # ============================================================
 
-        metrics.append({
-            "prediction_name": pred_name,
-            "tp": tp,
-            "tn": tn,
-            "fp": fp,
-            "fn": fn,
-            "precision": precision,
-            "recall": recall,
-            "f1": f1,
+    client_total = pd.DataFrame(columns=["n_windows", "t_end_s", "ms"])
+    latency_summary = pd.DataFrame()
+    if not lat_df.empty:
+        latency_summary = summarize_latency(lat_df)
+        client_total = lat_df[(lat_df["side"] == "client") & (lat_df["stage"] == "total")]
+    latency_summary.to_csv(metrics_dir / "latency_summary.csv", index=False)
+
+    windows_total = int(client_total["n_windows"].sum())
+    throughput_wps = windows_total / client_seconds if client_seconds > 0 else 0.0
+    print(f"[INFO] Throughput cliente: {throughput_wps:.1f} ventanas/s", flush=True)
+
+    # SLO sobre la latencia extremo a extremo por lote (cliente)
+    slo_checks = []
+    for pct, limit in (runtime.get("slo_ms") or {}).items():
+        if limit is None or client_total.empty:
+            continue
+        observed = float(client_total["ms"].quantile(float(str(pct).lstrip("p")) / 100.0))
+        slo_checks.append({
+            "percentile": pct,
+            "limit_ms": float(limit),
+            "observed_ms": observed,
+            "pass": observed <= float(limit),
         })
-
-    metrics_df = pd.DataFrame(metrics)
-    metrics_df.to_csv(metrics_dir / "metrics_per_model.csv", index=False)
+    for chk in slo_checks:
+        status = "OK" if chk["pass"] else "FAIL"
+        print(f"[SLO] {chk['percentile']}: {chk['observed_ms']:.1f} ms "
+              f"(límite {chk['limit_ms']:.1f} ms) → {status}", flush=True)
 
     write_metadata(
         stage="07_deployrun",
@@ -426,6 +1153,9 @@ def run_orchestrator(variant: str):
     # ============================================================
 
     print("\n[INFO] Generando informe visual HTML...", flush=True)
+    prof.begin("figures")
+
+    import matplotlib.pyplot as plt
 
     metrics_csv_path = metrics_dir / "metrics_per_model.csv"
     metrics_df = pd.read_csv(metrics_csv_path)
@@ -457,9 +1187,72 @@ def run_orchestrator(variant: str):
 
     print(f"[FIG] Guardado gráfico comparativo: {metrics_bar_path}", flush=True)
 
+    # ------------------------------------------------------------
+    # 1b. Latencia (percentiles, histograma log) y throughput
+    # ------------------------------------------------------------
+
+    latency_figs = []
+
+    if not latency_summary.empty:
+        stages = latency_summary.copy()
+        stages["label"] = stages["side"] + ":" + stages["stage"] + np.where(
+            stages["model"] == "-", "", " [" + stages["model"] + "]"
+        )
+
+        plt.figure(figsize=(10, max(4, 0.35 * len(stages))))
+        y = np.arange(len(stages))
+        h = 0.25
+        plt.barh(y - h, stages["p50"], h, label="p50")
+        plt.barh(y, stages["p95"], h, label="p95")
+        plt.barh(y + h, stages["p99"], h, label="p99")
+        plt.yticks(y, stages["label"], fontsize=8)
+        plt.xscale("log")
+        plt.xlabel("ms")
+        plt.legend()
+        plt.tight_layout()
+        path = figures_dir / "latency_percentiles.png"
+        plt.savefig(path)
+        plt.close()
+        latency_figs.append(("Percentiles de latencia por etapa", path))
+
+        # Histograma con bins logarítmicos (estilo HDR)
+        ms = client_total["ms"].to_numpy(dtype=float)
+        ms = ms[ms > 0]
+        if len(ms):
+            plt.figure(figsize=(10, 4))
+            bins = np.logspace(np.log10(ms.min()), np.log10(ms.max()) + 1e-9, 50)
+            plt.hist(ms, bins=bins)
+            for q, ls in ((50, "-"), (95, "--"), (99, ":")):
+                plt.axvline(np.percentile(ms, q), color="k", linestyle=ls, label=f"p{q}")
+            for chk in slo_checks:
+                plt.axvline(chk["limit_ms"], color="r", label=f"SLO {chk['percentile']}")
+            plt.xscale("log")
+            plt.xlabel("Latencia por lote (cliente, ms)")
+            plt.ylabel("Lotes")
+            plt.legend()
+            plt.tight_layout()
+            path = figures_dir / "latency_histogram.png"
+            plt.savefig(path)
+            plt.close()
+            latency_figs.append(("Histograma de latencia extremo a extremo", path))
+
+        # Throughput en el tiempo (ventanas completadas por segundo)
+        t_bins = np.floor(client_total["t_end_s"].to_numpy(dtype=float)).astype(int)
+        per_sec = np.bincount(t_bins, weights=client_total["n_windows"].to_numpy(dtype=float))
+        plt.figure(figsize=(10, 4))
+        plt.plot(np.arange(len(per_sec)), per_sec)
+        plt.xlabel("Segundos desde el inicio")
+        plt.ylabel("Ventanas / s")
+        plt.tight_layout()
+        path = figures_dir / "throughput.png"
+        plt.savefig(path)
+        plt.close()
+        latency_figs.append(("Throughput en el tiempo", path))
+
     # ------------------------------------------------------------
     # 2. HTML dinámico
     # ------------------------------------------------------------
+    prof.begin("report")
 
     html = []
     html.append("<html><head><title>F07 Report</title></head><body>")
@@ -471,6 +1264,22 @@ def run_orchestrator(variant: str):
     html.append("<h2>Comparativa Precision / Recall / F1</h2>")
     html.append(f'<img src="figures/{metrics_bar_path.name}" width="800">')
 
+    html.append("<h2>Latencia y Throughput</h2>")
+    html.append(
+        f"<p>Ventanas: {windows_total} — Tiempo cliente: {client_seconds:.2f} s — "
+        f"Throughput: {throughput_wps:.1f} ventanas/s — "
+        f"Transporte: {transport} — Lotes en vuelo: {max_in_flight}</p>"
+    )
+    if cache_summary:
+        html.append(f"<p>Aciertos de la caché de predicciones (servidor): {cache_summary}</p>")
+    if slo_checks:
+        html.append(pd.DataFrame(slo_checks).to_html(index=False, float_format=lambda x: f"{x:.2f}"))
+    if not latency_summary.empty:
+        html.append(latency_summary.to_html(index=False, float_format=lambda x: f"{x:.3f}"))
+    for title, path in latency_figs:
+        html.append(f"<h3>{title}</h3>")
+        html.append(f'<img src="figures/{path.name}" width="800">')
+
     html.append("<h2>Detalle por Modelo</h2>")
 
     for _, row in metrics_df.iterrows():
@@ -494,11 +1303,382 @@ def run_orchestrator(variant: str):
     report_path.write_text("\n".join(html), encoding="utf-8")
 
     print(f"[OK] Reporte HTML generado: {report_path}", flush=True)
-
+    prof.write(variant_root / "07_deployrun_metadata.json")
 
 
     print("[DONE] F07 completada correctamente")
 
+# ============================================================
+# REPLAY MODE (stream F02 reproducido según timestamps)
+# ============================================================
+
+def resolve_stream_source(project_root: Path, manifest: dict) -> dict:
+    """
+    Cadena F04 → F03 → F02 del dataset base del manifest.
+    Devuelve el stream de eventos de F02 y la geometría de ventana de F03.
+    """
+    import yaml
+
+    def read_params(phase, v):
+        return yaml.safe_load(
+            (project_root / "executions" / phase / v / "params.yaml").read_text()
+        )
+
+    v04 = manifest["datasets"][0]["source_f04"]
+    v03 = read_params("04_targetengineering", v04)["parent_variant"]
+    p03 = read_params("03_preparewindowsds", v03)
+    v02 = p03["parent_variant"]
+    f02_root = project_root / "executions" / "02_prepareeventsds" / v02
+
+    other = {m["source_f04"] for m in manifest["models"]} - {v04}
+    for v in sorted(other):
+        if read_params("04_targetengineering", v)["parent_variant"] != v03:
+            print(f"[WARN] {v} no comparte la variante F03 {v03}; se usa la geometría de {v03}")
+
+    Tu = float(p03.get("Tu") or 0)
+    if Tu == 0:
+        Tu = float(json.loads(
+            (f02_root / "02_prepareeventsds_metadata.json").read_text()
+        )["Tu"])
+
+    return {
+        "f02_variant": v02,
+        "f03_variant": v03,
+        "events_path": f02_root / "02_prepareeventsds_dataset.parquet",
+        "catalog_path": f02_root / "02_prepareeventsds_event_catalog.json",
+        "geometry": WindowGeometry.from_params(p03, Tu),
+    }
+
+
+def load_event_stream(source: dict):
+    """(times, events_flat, offsets, nan_codes) del dataset de eventos de F02."""
+    table = read_dataset_table(source["events_path"], columns=["segs", "events"])
+    times = table.column("segs").to_numpy().astype(np.int64)
+    order = np.argsort(times, kind="stable")
+    if not np.array_equal(order, np.arange(len(times))):
+        table = table.take(pa.array(order))
+        times = times[order]
+
+    events = table.column("events").combine_chunks()
+    events_flat = events.flatten().to_numpy(zero_copy_only=False).astype(np.int64)
+    lengths = (
+        pa.compute.list_value_length(events).fill_null(0)
+        .to_numpy(zero_copy_only=False).astype(np.int64)
+    )
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    nan_codes = []
+    if source["geometry"].nan_strategy == "discard":
+        catalog = json.loads(Path(source["catalog_path"]).read_text())
+        nan_codes = [c for n, c in catalog.items() if n.endswith("_NaN_NaN")]
+
+    return times, events_flat, offsets, nan_codes
+
+
+def replay_bag_mode(manifest: dict) -> bool:
+    """
+    True si todos los modelos son dense_bow: el replay puede enviar cada
+    ventana como bolsa (código, conteo) en vez de la lista de eventos.
+    """
+    for m in manifest["models"]:
+        summary = json.loads((Path(m["model_dir"]) / m["model_summary"]).read_text())
+        if summary["vectorization"]["vectorization"] != "dense_bow":
+            return False
+    return True
+
+
+def replay_ticks(times, events_flat, offsets, nan_codes, geometry, bag: bool = False):
+    """
+    Un tick por Tu: al cerrar cada paso, la ventana OW contiene los eventos
+    en [t - OW*Tu, t). La ventana se mantiene incrementalmente (buffer
+    circular); genera (tick, t, n_eventos, ventana) solo si
+    OnlineWindow.emittable(). Con bag=True la ventana es
+    OnlineWindow.bag(): (códigos, conteos) del conteo acumulado, cuyo coste
+    por tick no depende de OW, o (eventos, None) si la ventana es corta.
+    """
+    n = len(times)
+    if n == 0:
+        return
+
+    window = OnlineWindow(geometry, nan_codes=nan_codes)
+    i = 0
+    tick = 0
+    t = times[0] + geometry.ow_span
+    while t <= times[-1]:
+        j = i
+        while j < n and times[j] < t:
+            j += 1
+        if j > i:
+            window.push(
+                np.repeat(times[i:j], np.diff(offsets[i:j + 1])),
+                events_flat[offsets[i]:offsets[j]],
+            )
+            i = j
+        window.advance(t)
+
+        if window.emittable():
+            if bag:
+                codes, counts = window.bag()
+                yield tick, t, len(window), (
+                    codes.tolist(), counts.tolist() if counts is not None else None
+                )
+            else:
+                yield tick, t, len(window), window.events().tolist()
+
+        tick += 1
+        t = times[0] + geometry.ow_span + tick * geometry.Tu
+
+
+def parse_replay_speed(speed):
+    """'realtime' → 1.0, número N → N×, 'max' → None (sin esperas)."""
+    if speed is None or speed == "max":
+        return None
+    if speed == "realtime":
+        return 1.0
+    speed = float(speed)
+    if speed <= 0:
+        raise ValueError(f"replay.speed debe ser > 0: {speed}")
+    return speed
+
+
+def post_windows(session, base_url: str, transport: str, windows, counts=None) -> dict:
+    """
+    Envía ventanas ya construidas; devuelve {prediction_name: y_pred}.
+    Con counts, windows son los códigos de cada bolsa (solo dense_bow).
+    """
+    if transport == "arrow":
+        resp = session.post(
+            f"{base_url}/infer_batch_arrow",
+            data=encode_windows_ipc(windows, counts),
+            headers={"Content-Type": ARROW_STREAM_MIME},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        names, preds = decode_predictions_ipc(resp.content)
+        return {n: preds.column(n).to_numpy() for n in names}
+
+    resp = session.post(
+        f"{base_url}/infer_batch",
+        data=json.dumps(
+            {"windows": windows, **({"counts": counts} if counts is not None else {})},
+            separators=(",", ":"),
+        ),
+        headers={"Content-Type": "application/json"},
+        timeout=120,
+    )
+    resp.raise_for_status()
+    preds = {}
+    for item in resp.json()["results"]:
+        for r in item["results"]:
+            preds.setdefault(r["prediction_name"], []).append(r["y_pred"])
+    return {n: np.asarray(y, dtype=np.int8) for n, y in preds.items()}
+
+
+def run_replay(variant: str):
+
+    execution_dir = detect_execution_dir()
+    project_root = detect_project_root(execution_dir)
+
+    pm = ParamsManager("07_deployrun", project_root)
+    pm.set_current(variant)
+    variant_root = pm.current_variant_dir()
+
+    manifest = load_manifest(variant_root)
+
+    import yaml
+    params = yaml.safe_load((variant_root / "params.yaml").read_text())
+
+    runtime = params.get("runtime") or {}
+    transport = runtime.get("transport", "json")
+    if transport not in ("json", "arrow"):
+        raise ValueError(f"runtime.transport no soportado: {transport}")
+
+    replay_cfg = params.get("replay") or {}
+    speed = parse_replay_speed(replay_cfg.get("speed", "max"))
+    max_ticks = replay_cfg.get("max_ticks")
+    max_batch = max(1, int(replay_cfg.get("max_batch", 64)))
+
+    replay_dir = variant_root / "replay"
+    ensure_clean_dir(replay_dir)
+
+    source = resolve_stream_source(project_root, manifest)
+    times, events_flat, offsets, nan_codes = load_event_stream(source)
+    geometry = source["geometry"]
+    Tu = geometry.Tu
+    print(
+        f"[REPLAY] Stream F02 {source['f02_variant']}: {len(times)} instantes | "
+        f"geometría F03 {source['f03_variant']} OW={geometry.OW} Tu={Tu} "
+        f"strategy={geometry.window_strategy} | speed={replay_cfg.get('speed', 'max')}",
+        flush=True,
+    )
+
+    bag = replay_bag_mode(manifest)
+    print(f"[REPLAY] Ventanas enviadas como {'bolsa (código, conteo)' if bag else 'lista de eventos'}",
+          flush=True)
+
+    ticks = replay_ticks(times, events_flat, offsets, nan_codes, geometry, bag=bag)
+    if max_ticks:
+        from itertools import islice
+        ticks = islice(ticks, int(max_ticks))
+
+    session = make_session_factory(1)()
+    server_proc, base_url = start_server(variant, runtime)
+
+    tick_rows = []
+    pred_parts = []
+
+    try:
+        # Reloj de replay: el tick con instante t vence en
+        # clock0 + (t - t_first) / speed. A velocidad máxima vence al admitirse.
+        from collections import deque
+
+        pending = deque()
+        nxt = next(ticks, None)
+        t_first = nxt[1] if nxt else 0.0
+        clock0 = time.perf_counter()
+
+        while nxt is not None or pending:
+            now = time.perf_counter() - clock0
+
+            while nxt is not None:
+                if speed is None:
+                    if len(pending) >= max_batch:
+                        break
+                    due = now
+                else:
+                    due = (nxt[1] - t_first) / speed
+                    if due > now:
+                        break
+                pending.append((*nxt, due))
+                nxt = next(ticks, None)
+
+            if not pending:
+                time.sleep(max(0.0, (nxt[1] - t_first) / speed - now))
+                continue
+
+            batch = [pending.popleft() for _ in range(min(max_batch, len(pending)))]
+            backlog = len(pending)
+
+            t_sent = time.perf_counter() - clock0
+            windows = [w for _, _, _, w, _ in batch]
+            if bag and any(counts is not None for _, counts in windows):
+                # Ventanas cortas (sin conteos) viajan como bolsa de conteos 1
+                preds = post_windows(
+                    session, base_url, transport,
+                    [codes for codes, _ in windows],
+                    [counts if counts is not None else [1] * len(codes) for codes, counts in windows],
+                )
+            elif bag:
+                preds = post_windows(session, base_url, transport, [codes for codes, _ in windows])
+            else:
+                preds = post_windows(session, base_url, transport, windows)
+            t_done = time.perf_counter() - clock0
+
+            for tick, t_event, n_events, _, due in batch:
+                tick_rows.append({
+                    "tick": tick,
+                    "t_event": t_event,
+                    "n_events": n_events,
+                    "due_s": due,
+                    "sent_s": t_sent,
+                    "done_s": t_done,
+                    "lag_ms": (t_done - due) * 1000.0,
+                    "backlog": backlog,
+                    "batch_ticks": len(batch),
+                })
+            pred_parts.append(pd.DataFrame({
+                "tick": [b[0] for b in batch],
+                "t_event": [b[1] for b in batch],
+                **preds,
+            }))
+
+            if len(tick_rows) % (max_batch * 50) < len(batch):
+                print(
+                    f"[REPLAY] ticks={len(tick_rows)} backlog={backlog} "
+                    f"lag={(t_done - batch[-1][4]) * 1000.0:.1f} ms",
+                    flush=True,
+                )
+
+        wall_seconds = time.perf_counter() - clock0
+
+    finally:
+        server_proc.terminate()
+        server_proc.wait()
+
+    ticks_df = pd.DataFrame(tick_rows)
+    ticks_df.to_parquet(replay_dir / "ticks.parquet", index=False)
+    if pred_parts:
+        pd.concat(pred_parts, ignore_index=True).to_parquet(
+            replay_dir / "predictions.parquet", index=False
+        )
+
+    # ------------------------------------------------------------
+    # Resumen: lag extremo a extremo y backlog
+    # ------------------------------------------------------------
+
+    summary = {
+        "speed": replay_cfg.get("speed", "max"),
+        "transport": transport,
+        "max_batch": max_batch,
+        "ticks": len(ticks_df),
+        "wall_s": wall_seconds,
+    }
+    if not ticks_df.empty:
+        lag = ticks_df["lag_ms"]
+        event_span = float(ticks_df["t_event"].iloc[-1] - ticks_df["t_event"].iloc[0])
+        summary.update({
+            "event_span_s": event_span,
+            "achieved_speed": event_span / wall_seconds if wall_seconds > 0 else None,
+            "ticks_per_s": len(ticks_df) / wall_seconds if wall_seconds > 0 else None,
+            "lag_ms_p50": float(lag.quantile(0.50)),
+            "lag_ms_p95": float(lag.quantile(0.95)),
+            "lag_ms_p99": float(lag.quantile(0.99)),
+            "lag_ms_max": float(lag.max()),
+            "backlog_mean": float(ticks_df["backlog"].mean()),
+            "backlog_max": int(ticks_df["backlog"].max()),
+        })
+        if speed is not None:
+            # Se va por detrás si la predicción llega después del siguiente tick
+            tick_ms = Tu / speed * 1000.0
+            summary["tick_period_ms"] = tick_ms
+            summary["late_ticks"] = int((lag > tick_ms).sum())
+
+    pd.DataFrame([summary]).to_csv(replay_dir / "summary.csv", index=False)
+    for k, v in summary.items():
+        print(f"[REPLAY] {k}: {v}", flush=True)
+
+    # ------------------------------------------------------------
+    # Informe
+    # ------------------------------------------------------------
+
+    html = ["<html><head><title>F07 Replay</title></head><body>",
+            "<h1>F07 — Replay del stream de eventos</h1>",
+            f"<p>Stream F02 {source['f02_variant']} — geometría F03 {source['f03_variant']} "
+            f"(OW={geometry.OW}, Tu={Tu}, {geometry.window_strategy})</p>",
+            pd.DataFrame([summary]).T.rename(columns={0: "valor"}).to_html()]
+
+    if not ticks_df.empty:
+        import matplotlib.pyplot as plt
+
+        fig, ax1 = plt.subplots(figsize=(10, 4))
+        ax1.plot(ticks_df["t_event"], ticks_df["lag_ms"], lw=0.8)
+        ax1.set_xlabel("Tiempo de evento")
+        ax1.set_ylabel("Lag (ms)")
+        ax1.set_yscale("log")
+        ax2 = ax1.twinx()
+        ax2.plot(ticks_df["t_event"], ticks_df["backlog"], color="tab:red", lw=0.8)
+        ax2.set_ylabel("Backlog (ticks)", color="tab:red")
+        fig.tight_layout()
+        fig.savefig(replay_dir / "replay_lag.png")
+        plt.close(fig)
+        html.append('<img src="replay_lag.png" width="800">')
+
+    html.append("</body></html>")
+    (replay_dir / "replay.html").write_text("\n".join(html), encoding="utf-8")
+
+    print(f"[DONE] Replay completado: {replay_dir}")
+
 # ============================================================
 # MAIN
 # ============================================================
@@ -507,7 +1687,7 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--variant", required=True)
-    parser.add_argument("--mode", required=True, choices=["prepare", "run", "server"])
+    parser.add_argument("--mode", required=True, choices=["prepare", "run", "server", "replay"])
     args = parser.parse_args()
 
     if args.mode == "prepare":
@@ -516,3 +1696,5 @@ if __name__ == "__main__":
         run_orchestrator(args.variant)
     elif args.mode == "server":
         run_server(args.variant)
+    elif args.mode == "replay":
+        run_replay(args.variant)
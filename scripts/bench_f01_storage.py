@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del formato del dataset explorado (F01 → F02).
+
+Escribe el mismo dataset con la configuración por defecto y con
+dataset_storage.compact=True, y compara tamaño en disco, tiempo de lectura
+(pd.read_parquet, como hace F02) y el efecto de float32 sobre las bandas
+de F02 (valores que cambian de banda con umbrales cada 10%).
+
+Uso:
+  python scripts/bench_f01_storage.py [--dataset executions/01_explore/v001/01_explore_dataset.parquet]
+         [--rows 2000000] [--cols 20] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from mlops4ofp.tools.artifacts import save_numeric_dataset
+
+
+def make_dataset(rows, cols, rng):
+    """Sintético tipo BEMS: segs a 1 s, medidas con 1-2 decimales, huecos NaN."""
+    data = {"segs": 1_700_000_000 + np.arange(rows, dtype=np.int64)}
+    for j in range(cols):
+        level = rng.uniform(-500, 500)
+        walk = np.cumsum(rng.normal(0, 0.5, rows))
+        values = np.round(level + walk, 1 + j % 2)
+        values[rng.random(rows) < 0.01] = np.nan
+        data[f"m{j:02d}"] = values
+    data["state"] = rng.integers(0, 4, rows).astype(np.float64)
+    return pd.DataFrame(data)
+
+
+def read_time(path, repeat):
+    runs = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        pd.read_parquet(path)
+        runs.append(perf_counter() - t0)
+    return statistics.median(runs)
+
+
+def band_flips(ref: pd.DataFrame, other: pd.DataFrame, pct=range(10, 100, 10)) -> int:
+    """Valores cuya banda F02 (cortes sobre min/max de ref) cambia."""
+    flips = 0
+    for col in ref.columns:
+        if col == "segs":
+            continue
+        a = ref[col].to_numpy(dtype=np.float64)
+        b = other[col].to_numpy(dtype=np.float64)
+        mn, mx = np.nanmin(a), np.nanmax(a)
+        cuts = mn + np.array(list(pct)) / 100 * (mx - mn)
+        ok = ~np.isnan(a)
+        flips += int((np.searchsorted(cuts, a[ok], side="right")
+                      != np.searchsorted(cuts, b[ok], side="right")).sum())
+    return flips
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Formato compacto del dataset F01")
+    parser.add_argument("--dataset", type=Path, default=None)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.dataset:
+        df = pd.read_parquet(args.dataset)
+        print(f"[BENCH] dataset={args.dataset} filas={len(df)} columnas={df.shape[1]}")
+    else:
+        df = make_dataset(args.rows, args.cols, np.random.default_rng(args.seed))
+        print(f"[BENCH] sintético filas={len(df)} columnas={df.shape[1]}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        default_path = Path(tmp) / "default.parquet"
+        compact_path = Path(tmp) / "compact.parquet"
+
+        t0 = perf_counter()
+        save_numeric_dataset(df, default_path)
+        write_default = perf_counter() - t0
+
+        t0 = perf_counter()
+        _, df_compact = save_numeric_dataset(
+            df, compact_path, storage={"compact": True, "float32_tolerance": args.tolerance}
+        )
+        write_compact = perf_counter() - t0
+
+        size_default = default_path.stat().st_size
+        size_compact = compact_path.stat().st_size
+        read_default = read_time(default_path, args.repeat)
+        read_compact = read_time(compact_path, args.repeat)
+
+    n_f32 = int((df_compact.dtypes == np.float32).sum())
+    mem_default = df.memory_usage(index=False).sum()
+    mem_compact = df_compact.memory_usage(index=False).sum()
+
+    print(f"[BENCH] columnas float32: {n_f32}/{df.shape[1] - 1}")
+    print(
+        f"[BENCH] disco   default={size_default / 1e6:9.2f} MB  compact={size_compact / 1e6:9.2f} MB  "
+        f"ahorro={100 * (1 - size_compact / size_default):5.1f}%"
+    )
+    print(
+        f"[BENCH] memoria default={mem_default / 1e6:9.2f} MB  compact={mem_compact / 1e6:9.2f} MB  "
+        f"ahorro={100 * (1 - mem_compact / mem_default):5.1f}%"
+    )
+    print(
+        f"[BENCH] lectura default={read_default * 1000:9.1f} ms  compact={read_compact * 1000:9.1f} ms  "
+        f"speedup={read_default / read_compact:5.2f}x"
+    )
+    print(f"[BENCH] escritura default={write_default * 1000:9.1f} ms  compact={write_compact * 1000:9.1f} ms")
+    print(f"[BENCH] valores que cambian de banda F02: {band_flips(df, df_compact)}")
+
+
+if __name__ == "__main__":
+    main()
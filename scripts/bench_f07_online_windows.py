@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark del payload por tick del replay F07 (modelos dense_bow).
+
+Ambos casos mantienen la ventana con OnlineWindow (buffer circular) y
+miden lo que hace el replay en producción por tick: construir el payload,
+serializarlo (JSON), decodificarlo en el servidor y vectorizarlo:
+
+  eventos → window.events().tolist(); el servidor vectoriza la ventana
+            completa: O(eventos en OW)
+  bolsa   → window.bag() (código, conteo) del conteo incremental;
+            from_flat(counts=): O(catálogo). Con menos eventos que
+            códigos en el catálogo bag() devuelve la lista de eventos
+
+Uso:
+  python scripts/bench_f07_online_windows.py [--ow 60 600 6000] [--rate 2.0]
+         [--ticks 5000] [--vocab 200] [--repeat 3]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from mlops4ofp.tools.online_windows import OnlineWindow, WindowGeometry
+from mlops4ofp.tools.vectorization import CompiledVectorizer, flatten_windows
+
+
+def make_stream(n_ticks, rate, vocab_size, rng):
+    """Stream sintético: un instante por Tu=1 con Poisson(rate) eventos."""
+    lengths = rng.poisson(rate, n_ticks)
+    times = np.arange(n_ticks, dtype=np.int64)
+    offsets = np.zeros(n_ticks + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = rng.integers(0, vocab_size * 2, int(offsets[-1]))
+    return times, flat, offsets
+
+
+def run_ticks(times, flat, offsets, OW, per_tick):
+    """push/advance de OnlineWindow + per_tick(window) en cada tick."""
+    window = OnlineWindow(WindowGeometry(OW=OW, LT=0, PW=0, Tu=1.0), capacity=OW * 4)
+    n = len(times)
+    for t in range(OW):
+        window.push(times[t], flat[offsets[t]:offsets[t + 1]])
+
+    t0 = perf_counter()
+    ticks = 0
+    for t in range(OW, n):
+        window.advance(t)
+        per_tick(window)
+        window.push(times[t], flat[offsets[t]:offsets[t + 1]])
+        ticks += 1
+    return ticks / (perf_counter() - t0)
+
+
+def events_payload(vec):
+    """Lista de eventos: el servidor vectoriza la ventana completa."""
+    def per_tick(window):
+        body = json.dumps({"windows": [window.events().tolist()]})
+        windows = json.loads(body)["windows"]
+        vec.from_flat(*flatten_windows(windows))
+    return per_tick
+
+
+def bag_payload(vec):
+    """Bolsa (código, conteo): el servidor solo reparte conteos."""
+    def per_tick(window):
+        codes, counts = window.bag()
+        if counts is None:
+            # Ventana corta: la lista de eventos es más barata (como el replay)
+            body = json.dumps({"windows": [codes.tolist()]})
+        else:
+            body = json.dumps({"windows": [codes.tolist()], "counts": [counts.tolist()]})
+        request = json.loads(body)
+        flat, lengths = flatten_windows(request["windows"])
+        counts = request.get("counts")
+        vec.from_flat(flat, lengths, flatten_windows(counts)[0] if counts else None)
+    return per_tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark ventanas online F07")
+    parser.add_argument("--ow", type=int, nargs="+", default=[60, 600, 6000])
+    parser.add_argument("--rate", type=float, default=2.0)
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--vocab", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vocab = sorted(rng.choice(args.vocab * 2, args.vocab, replace=False).tolist())
+    vec = CompiledVectorizer.from_config(
+        {"vectorization": "dense_bow", "vocab": vocab, "input_dim": len(vocab)}
+    )
+
+    print(f"[BENCH] ticks={args.ticks} rate={args.rate} eventos/Tu vocab={args.vocab}")
+
+    for OW in args.ow:
+        times, flat, offsets = make_stream(OW + args.ticks, args.rate, args.vocab, rng)
+
+        # Mejor de --repeat pasadas alternas (menos ruido del sistema)
+        before = after = 0.0
+        for _ in range(args.repeat):
+            before = max(before, run_ticks(times, flat, offsets, OW, events_payload(vec)))
+            after = max(after, run_ticks(times, flat, offsets, OW, bag_payload(vec)))
+
+        print(
+            f"[BENCH] OW={OW:6d}  eventos={before:10.1f} ticks/s  "
+            f"bolsa={after:10.1f} ticks/s  speedup={after / before:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark de la vectorización del servidor F07.
+
+Compara la vectorización anterior (dict construido en cada petición +
+bucles Python por ventana/evento) con la vectorización precompilada
+(lookup NumPy + scatter). Mide peticiones/segundo por familia.
+
+Uso:
+  python scripts/bench_f07_vectorization.py [--batch-size 512] [--vocab 200]
+         [--mean-len 40] [--seconds 2]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from mlops4ofp.tools.vectorization import CompiledVectorizer, flatten_windows
+
+
+def legacy_vectorize_batch(windows, config):
+    """Copia literal de la vectorización previa del servidor F07."""
+    if config["vectorization"] == "dense_bow":
+        vocab = config["vocab"]
+        index = {ev: i for i, ev in enumerate(vocab)}
+        X = np.zeros((len(windows), config["input_dim"]), dtype=np.float32)
+        for i, window in enumerate(windows):
+            for ev in window:
+                if ev in index:
+                    X[i, index[ev]] += 1.0
+        return X
+
+    vocab = config["vocab"]
+    index = {ev: i + 1 for i, ev in enumerate(vocab)}
+    max_len = config["max_len"]
+    X = np.zeros((len(windows), max_len), dtype=np.int32)
+    for i, window in enumerate(windows):
+        seq = [index[e] for e in window if e in index]
+        seq = seq[-max_len:]
+        if len(seq) > 0:
+            X[i, -len(seq):] = seq
+    return X
+
+
+def requests_per_second(fn, seconds):
+    n = 0
+    t0 = perf_counter()
+    while perf_counter() - t0 < seconds:
+        fn()
+        n += 1
+    return n / (perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark vectorización F07")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--vocab", type=int, default=200)
+    parser.add_argument("--mean-len", type=int, default=40)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vocab = sorted(rng.choice(args.vocab * 5, args.vocab, replace=False).tolist())
+    windows = [
+        rng.choice(vocab, rng.poisson(args.mean_len)).tolist()
+        for _ in range(args.batch_size)
+    ]
+
+    configs = {
+        "dense_bow": {"vectorization": "dense_bow", "vocab": vocab, "input_dim": len(vocab)},
+        "sequence": {"vectorization": "sequence", "vocab": vocab, "max_len": args.mean_len},
+    }
+
+    print(f"[BENCH] batch_size={args.batch_size} vocab={args.vocab} mean_len={args.mean_len}")
+
+    for name, cfg in configs.items():
+        vec = CompiledVectorizer.from_config(cfg)
+
+        ref = legacy_vectorize_batch(windows, cfg)
+        if not np.array_equal(ref, vec(windows)):
+            raise RuntimeError(f"Resultado distinto entre implementaciones ({name})")
+
+        before = requests_per_second(lambda: legacy_vectorize_batch(windows, cfg), args.seconds)
+
+        def compiled():
+            flat, lengths = flatten_windows(windows)
+            vec.from_flat(flat, lengths)
+
+        after = requests_per_second(compiled, args.seconds)
+
+        print(
+            f"[BENCH] {name:10s} antes={before:9.1f} req/s  "
+            f"después={after:9.1f} req/s  speedup={after / before:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
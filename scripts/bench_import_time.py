@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de arranque (imports) de los scripts de fase.
+
+Cada script se ejecuta tal cual con `python -X importtime scripts/0N_*.py
+--help`: argparse termina tras el arranque, así que se mide lo que paga
+cualquier modo antes de hacer trabajo (bootstrap de sys.path, imports de
+nivel de módulo y código que corre antes de parse_args). Los imports
+posteriores a parse_args (o dentro de funciones) no cuentan: solo los paga
+el modo que los usa. Se informa del tiempo de imports, del tiempo de pared
+del proceso y de los paquetes de primer nivel más costosos.
+
+Uso:
+  python scripts/bench_import_time.py [--scripts 07_deployrun ...] [--repeat 3]
+         [--top 5] [--output import_times.json]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = ROOT / "scripts"
+
+# import time: self [us] | cumulative | imported package
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(path: Path) -> tuple:
+    """
+    (lista de (paquete de primer nivel, cumulative_us), tiempo de pared ms)
+    de `python -X importtime <script> --help` en un intérprete limpio.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(path), "--help"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    top = []
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m and len(m.group(3)) == 1:
+            top.append((m.group(4), int(m.group(2))))
+    return top, wall_ms
+
+
+def bench_script(path: Path, repeat: int) -> dict:
+    runs = []
+    walls = []
+    last = []
+    for _ in range(repeat):
+        try:
+            last, wall_ms = run_importtime(path)
+        except RuntimeError as e:
+            return {"script": path.stem, "error": str(e)}
+        runs.append(sum(us for _, us in last) / 1000.0)
+        walls.append(wall_ms)
+
+    return {
+        "script": path.stem,
+        "import_ms": statistics.median(runs),
+        "import_ms_runs": runs,
+        "wall_ms": statistics.median(walls),
+        "top": sorted(
+            ({"module": mod, "ms": us / 1000.0} for mod, us in last),
+            key=lambda r: r["ms"],
+            reverse=True,
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de imports por script de fase")
+    parser.add_argument("--scripts", nargs="+", default=None,
+                        help="nombres sin .py (por defecto, todos los 0N_*.py)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.scripts:
+        paths = [SCRIPTS_DIR / f"{name}.py" for name in args.scripts]
+    else:
+        paths = sorted(SCRIPTS_DIR.glob("0[0-9]_*.py"))
+
+    results = []
+    for path in paths:
+        r = bench_script(path, args.repeat)
+        results.append(r)
+        if "error" in r:
+            print(f"[BENCH] {r['script']:22s} ERROR: {r['error']}")
+            continue
+        heaviest = ", ".join(f"{t['module']}={t['ms']:.0f}ms" for t in r["top"][:args.top])
+        print(
+            f"[BENCH] {r['script']:22s} imports={r['import_ms']:8.1f} ms  "
+            f"pared={r['wall_ms']:8.1f} ms  [{heaviest}]"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"[OK] Resultados: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
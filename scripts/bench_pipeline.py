@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de extremo a extremo del pipeline (F01 → F07) sobre datos
+sintéticos tipo BEMS (mlops4ofp.tools.synthetic).
+
+Para cada tamaño (tier) se genera un raw determinista y se ejecutan las
+fases como lo haría make, en un proyecto aislado en un directorio
+temporal (copia de mlops4ofp/, scripts/ y los base_params.yaml), sin
+tocar executions/ ni data/ del repositorio. Todo en local y en CPU.
+
+Por fase se registra:
+  wall_seconds → tiempo de pared del proceso (incluye arranque e imports)
+  seconds      → total_seconds del bloque "profile" de <phase>_metadata.json
+  peak_rss_mb  → pico de RSS del proceso de la fase
+  rows_per_s   → filas raw del tier / seconds
+
+Los resultados se añaden al histórico (JSONL completo + CSV plano) con el
+commit del repositorio. Con --baseline se comparan con una línea base
+guardada (--save-baseline) y se marcan como regresión los tiempos o picos
+de memoria que la superen en más de --threshold; el código de salida es 1
+si hay alguna, para poder usarlo en CI.
+
+Si una fase falla (p.ej. F05 sin TensorFlow), se registra el error y las
+fases siguientes del mismo tier quedan como "skipped".
+
+Uso:
+  python scripts/bench_pipeline.py [--tiers small medium] [--phases 01 02 03]
+         [--measures 8] [--nan-rate 0.01] [--gap-rate 0.001] [--tu 1]
+         [--repeat 1] [--history-dir benchmarks]
+         [--baseline benchmarks/pipeline_baseline.json] [--threshold 0.15]
+         [--save-baseline benchmarks/pipeline_baseline.json] [--keep]
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from mlops4ofp.tools.params_manager import ParamsManager
+from mlops4ofp.tools.synthetic import write_bems_raw
+
+TIERS = {
+    "small": 20_000,
+    "medium": 200_000,
+    "large": 2_000_000,
+}
+
+PHASES = [
+    "01_explore",
+    "02_prepareeventsds",
+    "03_preparewindowsds",
+    "04_targetengineering",
+    "05_modeling",
+    "06_packaging",
+    "07_deployrun",
+]
+
+VARIANT = "v001"  # misma variante en todas las fases del sandbox
+MIN_SECONDS = 0.5  # por debajo, el ruido domina: no se compara el tiempo
+
+CSV_FIELDS = [
+    "timestamp", "git_commit", "tier", "rows", "measures", "phase", "status",
+    "wall_seconds", "seconds", "peak_rss_mb", "rows_per_s",
+]
+
+
+# ============================================================
+# Sandbox
+# ============================================================
+
+def make_sandbox(base: Path) -> Path:
+    """Proyecto mínimo: código, scripts y base_params de cada fase."""
+    ignore = shutil.ignore_patterns("__pycache__", "*.pyc")
+    shutil.copytree(ROOT / "mlops4ofp", base / "mlops4ofp", ignore=ignore)
+    shutil.copytree(ROOT / "scripts", base / "scripts", ignore=ignore)
+    for phase in PHASES:
+        (base / "executions" / phase).mkdir(parents=True)
+        shutil.copy2(
+            ROOT / "executions" / phase / "base_params.yaml",
+            base / "executions" / phase / "base_params.yaml",
+        )
+    return base
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def target_events(sandbox: Path) -> list:
+    """
+    Objetivo F04: entrada de la primera medida del catálogo F02 en su
+    banda superior (transiciones "<medida>_<lo>_<hi>-to-<lo>_<hi>").
+    """
+    catalog_path = (
+        sandbox / "executions" / "02_prepareeventsds" / VARIANT
+        / "02_prepareeventsds_event_catalog.json"
+    )
+    catalog = json.loads(catalog_path.read_text(encoding="utf-8"))
+    transitions = [name for name in catalog if "-to-" in name]
+    if not transitions:
+        return list(catalog)[:1]
+    first = transitions[0].split("-to-")[0].rsplit("_", 2)[0]
+    own = [n for n in transitions if n.startswith(first + "_")]
+    top = max((n.split("-to-")[1] for n in own), key=lambda band: float(band.split("_")[0]))
+    return [n for n in own if n.endswith("-to-" + top)]
+
+
+def phase_params(phase: str, sandbox: Path, raw_path: Path) -> dict:
+    """--set de cada fase: configuración ligera y representativa."""
+    if phase == "01_explore":
+        return {
+            "raw_dataset_path": str(raw_path),
+            "cleaning_strategy": "basic",
+        }
+    if phase == "02_prepareeventsds":
+        return {"parent_variant": VARIANT}
+    if phase == "03_preparewindowsds":
+        return {
+            "variant_id": VARIANT,
+            "parent_variant": VARIANT,
+            "OW": 60, "LT": 10, "PW": 30,
+            "window_strategy": "synchro",
+            # F02 conserva los eventos NaN (nan_handling: keep): con discard
+            # y --nan-rate > 0 casi toda ventana de 60 Tu tendría un NaN
+            "nan_strategy": "preserve",
+        }
+    if phase == "04_targetengineering":
+        return {
+            "parent_variant": VARIANT,
+            "prediction_name": "bench",
+            "prediction_objective": {"operator": "OR", "events": target_events(sandbox)},
+        }
+    if phase == "05_modeling":
+        return {
+            "parent_variant": VARIANT,
+            "model_family": "dense_bow",
+            "automl": {"max_trials": 1},
+            "training": {"epochs": 1},
+        }
+    if phase == "06_packaging":
+        return {"parent_variants_f05": [VARIANT]}
+    if phase == "07_deployrun":
+        return {
+            "parent_variant_f06": VARIANT,
+            "runtime": {"port": free_port()},
+        }
+    raise ValueError(phase)
+
+
+def create_variant(phase: str, sandbox: Path, raw_path: Path) -> None:
+    """Variante VARIANT de la fase; los dict se fusionan con los de base_params."""
+    pm = ParamsManager(phase, sandbox)
+    base = pm.load_base_params()
+    extra = []
+    for key, value in phase_params(phase, sandbox, raw_path).items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            value = {**base[key], **value}
+        extra.append(f"{key}={json.dumps(value)}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        pm.create_named_variant(VARIANT, extra_params=extra)
+
+
+# ============================================================
+# Ejecución de fases
+# ============================================================
+
+def run_process(cmd: list, cwd: Path, log_path: Path, env: dict):
+    """(returncode, segundos de pared, pico RSS MB del proceso)."""
+    with open(log_path, "ab") as log:
+        t0 = perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=log, stderr=subprocess.STDOUT, env=env)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:  # Windows
+            proc.wait()
+            rss = None
+        return proc.returncode, perf_counter() - t0, rss
+
+
+def run_phase(phase: str, sandbox: Path, raw_path: Path, env: dict) -> dict:
+    try:
+        create_variant(phase, sandbox, raw_path)
+    except (OSError, ValueError, RuntimeError) as e:
+        return {"status": "error", "wall_seconds": 0.0, "error": f"variante: {e}"}
+    script = ["scripts/" + f"{phase}.py", "--variant", VARIANT]
+    modes = [["--mode", "prepare"], ["--mode", "run"]] if phase == "07_deployrun" else [[]]
+
+    log_path = sandbox / f"bench_{phase}.log"
+    wall = 0.0
+    peak = None
+    for mode in modes:
+        code, seconds, rss = run_process([sys.executable] + script + mode, sandbox, log_path, env)
+        wall += seconds
+        if rss is not None:
+            peak = max(peak or 0.0, rss)
+        if code != 0:
+            tail = log_path.read_text(encoding="utf-8", errors="replace").strip().splitlines()
+            return {"status": "error", "wall_seconds": wall, "error": "\n".join(tail[-5:])}
+
+    metadata_path = sandbox / "executions" / phase / VARIANT / f"{phase}_metadata.json"
+    metadata = {}
+    if metadata_path.exists():
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    profile = metadata.get("profile", {})
+
+    if phase == "03_preparewindowsds" and metadata.get("windows_written", 0) == 0:
+        return {
+            "status": "error",
+            "wall_seconds": wall,
+            "error": (
+                f"F03 no generó ventanas ({metadata.get('windows_total', 0)} candidatas); "
+                "revisa --nan-rate, --gap-rate o nan_strategy"
+            ),
+        }
+
+    return {
+        "status": "ok",
+        "wall_seconds": wall,
+        "seconds": profile.get("total_seconds", wall),
+        "peak_rss_mb": peak if peak is not None else profile.get("peak_rss_mb"),
+        "stages": profile.get("stages", {}),
+    }
+
+
+def run_tier(tier: str, rows: int, phases: list, args, env: dict) -> list:
+    """Pipeline completo hasta la última fase pedida; registra solo las pedidas."""
+    last = max(PHASES.index(p) for p in phases)
+    base = Path(tempfile.mkdtemp(prefix=f"mlops4ofp_bench_{tier}_"))
+    try:
+        sandbox = make_sandbox(base)
+        raw_path = sandbox / "data" / "raw.csv"
+        raw_info = write_bems_raw(
+            raw_path, rows,
+            measures=args.measures, nan_rate=args.nan_rate,
+            gap_rate=args.gap_rate, tu=args.tu, seed=args.seed,
+        )
+        print(f"[INFO] Tier {tier}: {rows} filas × {raw_info['measures']} medidas "
+              f"({raw_info['bytes'] / 1e6:.1f} MB) en {sandbox}")
+
+        results = []
+        failed = None
+        for phase in PHASES[:last + 1]:
+            if failed:
+                r = {"status": "skipped", "error": f"falla {failed}"}
+            else:
+                r = run_phase(phase, sandbox, raw_path, env)
+                if r["status"] == "error":
+                    failed = phase
+            if phase not in phases:
+                continue
+            r.update({"tier": tier, "rows": rows, "measures": args.measures, "phase": phase})
+            if r.get("seconds"):
+                r["rows_per_s"] = round(rows / r["seconds"], 1)
+            for key in ("wall_seconds", "seconds", "peak_rss_mb"):
+                if r.get(key) is not None:
+                    r[key] = round(r[key], 3)
+            results.append(r)
+            print_result(r)
+        return results
+    finally:
+        if args.keep:
+            print(f"[INFO] Sandbox conservado: {base}")
+        else:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+def merge_repeats(runs: list) -> list:
+    """Mediana de tiempos y máximo de RSS entre repeticiones."""
+    merged = []
+    for group in zip(*runs):
+        r = dict(group[0])
+        ok = [g for g in group if g["status"] == "ok"]
+        if len(ok) == len(group) and len(group) > 1:
+            for key in ("wall_seconds", "seconds", "rows_per_s"):
+                r[key] = statistics.median(g[key] for g in ok)
+            rss = [g["peak_rss_mb"] for g in ok if g.get("peak_rss_mb") is not None]
+            r["peak_rss_mb"] = max(rss) if rss else None
+            r["repeat"] = len(group)
+        merged.append(r)
+    return merged
+
+
+def print_result(r: dict) -> None:
+    name = f"{r['tier']:6s} {r['phase']:22s}"
+    if r["status"] != "ok":
+        print(f"[BENCH] {name} {r['status'].upper()}: {r.get('error', '').splitlines()[-1:]}")
+        return
+    rss = f"{r['peak_rss_mb']:8.0f} MB" if r.get("peak_rss_mb") is not None else "       - MB"
+    print(f"[BENCH] {name} {r['seconds']:8.2f} s  (pared {r['wall_seconds']:7.2f} s)  "
+          f"{r['rows_per_s']:12.0f} filas/s  pico {rss}")
+
+
+# ============================================================
+# Histórico y línea base
+# ============================================================
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def append_history(history_dir: Path, results: list, run_info: dict) -> None:
+    history_dir.mkdir(parents=True, exist_ok=True)
+    jsonl_path = history_dir / "pipeline_history.jsonl"
+    csv_path = history_dir / "pipeline_history.csv"
+
+    with open(jsonl_path, "a", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps({**run_info, **r}) + "\n")
+
+    new_csv = not csv_path.exists()
+    with open(csv_path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        if new_csv:
+            writer.writeheader()
+        for r in results:
+            writer.writerow({**run_info, **r})
+
+    print(f"[OK] Histórico: {jsonl_path} / {csv_path.name}")
+
+
+def save_baseline(path: Path, results: list, run_info: dict) -> None:
+    baseline = {**run_info, "results": {}}
+    for r in results:
+        if r["status"] == "ok":
+            baseline["results"].setdefault(r["tier"], {})[r["phase"]] = {
+                "rows": r["rows"],
+                "seconds": r["seconds"],
+                "peak_rss_mb": r.get("peak_rss_mb"),
+                "rows_per_s": r["rows_per_s"],
+            }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+    print(f"[OK] Línea base: {path}")
+
+
+def compare_baseline(path: Path, results: list, run_info: dict, threshold: float) -> list:
+    """Lista de regresiones (tiempo o memoria) por encima de threshold."""
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    if baseline.get("config") != run_info["config"]:
+        print(f"[WARN] La línea base usa otra configuración: {baseline.get('config')}")
+
+    print(f"[INFO] Comparando con {path} (commit {str(baseline.get('git_commit'))[:10]}, "
+          f"umbral {threshold:.0%})")
+    regressions = []
+    for r in results:
+        base = baseline.get("results", {}).get(r["tier"], {}).get(r["phase"])
+        if base is None or r["status"] != "ok":
+            continue
+        for key, label in (("seconds", "tiempo"), ("peak_rss_mb", "memoria")):
+            old, new = base.get(key), r.get(key)
+            if not old or new is None:
+                continue
+            if key == "seconds" and max(old, new) < MIN_SECONDS:
+                continue
+            change = new / old - 1.0
+            tag = "[WARN] REGRESIÓN" if change > threshold else "[BENCH]"
+            print(f"{tag} {r['tier']:6s} {r['phase']:22s} {label:8s} "
+                  f"{old:10.2f} → {new:10.2f} ({change:+.1%})")
+            if change > threshold:
+                regressions.append({"tier": r["tier"], "phase": r["phase"],
+                                    "metric": key, "baseline": old, "current": new,
+                                    "change": change})
+    return regressions
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def parse_phases(values: list) -> list:
+    """Acepta '01', '1' o '01_explore'."""
+    out = []
+    for v in values:
+        match = [p for p in PHASES if p == v or p[:2] == f"{int(v.split('_')[0]):02d}"]
+        if not match:
+            raise SystemExit(f"[ERROR] Fase desconocida: {v}")
+        out.append(match[0])
+    return sorted(set(out), key=PHASES.index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark F01→F07 sobre datos sintéticos")
+    parser.add_argument("--tiers", nargs="+", default=["small"], choices=list(TIERS))
+    parser.add_argument("--rows", type=int, default=None,
+                        help="tier 'custom' con este número de filas (sustituye a --tiers)")
+    parser.add_argument("--phases", nargs="+", default=[p[:2] for p in PHASES])
+    parser.add_argument("--measures", type=int, default=8)
+    parser.add_argument("--nan-rate", type=float, default=0.01)
+    parser.add_argument("--gap-rate", type=float, default=0.001)
+    parser.add_argument("--tu", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--history-dir", type=Path, default=ROOT / "benchmarks")
+    parser.add_argument("--no-history", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--save-baseline", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="aumento relativo tolerado frente a la línea base (0.15 = 15%%)")
+    parser.add_argument("--keep", action="store_true", help="no borrar los sandboxes")
+    args = parser.parse_args()
+
+    phases = parse_phases(args.phases)
+    tiers = {"custom": args.rows} if args.rows else {t: TIERS[t] for t in args.tiers}
+
+    # Solo CPU y sin ruido de TensorFlow
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="", TF_CPP_MIN_LOG_LEVEL="2")
+    env.pop("MLOPS4OFP_PROFILE", None)
+
+    run_info = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            "measures": args.measures, "nan_rate": args.nan_rate,
+            "gap_rate": args.gap_rate, "tu": args.tu, "seed": args.seed,
+        },
+    }
+
+    results = []
+    for tier, rows in tiers.items():
+        runs = [run_tier(tier, rows, phases, args, env) for _ in range(args.repeat)]
+        results.extend(merge_repeats(runs))
+
+    if not args.no_history:
+        append_history(args.history_dir, results, run_info)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, run_info)
+
+    if args.baseline:
+        regressions = compare_baseline(args.baseline, results, run_info, args.threshold)
+        if regressions:
+            print(f"[WARN] {len(regressions)} regresiones por encima del {args.threshold:.0%}")
+            sys.exit(1)
+        print("[OK] Sin regresiones frente a la línea base")
+
+
+if __name__ == "__main__":
+    main()